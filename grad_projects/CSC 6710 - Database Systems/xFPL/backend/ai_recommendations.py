@@ -169,7 +169,7 @@ def get_transfer_recommendations(
                 cur.execute(
                     """
                     SELECT fl.player_id, p.team_code, p.position, p.cost
-                    FROM fantasy_lineup fl
+                    FROM v_lineup_slot fl
                     JOIN player p ON p.id = fl.player_id
                     WHERE fl.ft_id = %s AND fl.gw_code = %s AND fl.slot BETWEEN 1 AND 11
                     """,
@@ -372,7 +372,7 @@ def get_players_to_sell(ft_id: int, gw_code: str, limit: int = 5) -> List[Dict]:
                         p.position,
                         p.cost,
                         COALESCE(SUM(pp.points), 0) as total_points
-                    FROM fantasy_lineup fl
+                    FROM v_lineup_slot fl
                     JOIN player p ON p.id = fl.player_id
                     LEFT JOIN player_points pp ON pp.player_id = fl.player_id
                     WHERE fl.ft_id = %s AND fl.gw_code = %s AND fl.slot BETWEEN 1 AND 11
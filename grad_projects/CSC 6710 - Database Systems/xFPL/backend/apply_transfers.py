@@ -22,13 +22,12 @@ def apply_transfers_for_team(cur, ft_id: int, from_gw: str, to_gw: str):
     """
     # 1) get old lineup
     cur.execute("""
-        SELECT player_id, slot, captain, vice_captain
+        SELECT player_ids, captain_slot, vice_captain_slot
         FROM fantasy_lineup
         WHERE ft_id = %s AND gw_code = %s
-        ORDER BY slot
     """, (ft_id, from_gw))
-    prev_lineup = cur.fetchall()
-    if len(prev_lineup) != 11:
+    prev_lineup = cur.fetchone()
+    if not prev_lineup or len(prev_lineup["player_ids"]) != 11:
         raise ValueError(f"Team {ft_id} in {from_gw} does not have 11 players")
 
     # 2) get transfers made after from_gw
@@ -41,7 +40,8 @@ def apply_transfers_for_team(cur, ft_id: int, from_gw: str, to_gw: str):
     transfers = cur.fetchall()
 
     # 3) apply transfers in memory
-    player_ids = [row["player_id"] for row in prev_lineup]
+    prev_ids = prev_lineup["player_ids"]
+    player_ids = list(prev_ids)
 
     for tr in transfers:
         out_id = tr["player_out_id"]
@@ -52,26 +52,21 @@ def apply_transfers_for_team(cur, ft_id: int, from_gw: str, to_gw: str):
         idx = player_ids.index(out_id)
         player_ids[idx] = in_id
 
-    # 4) write new lineup for to_gw
-    # first clean if exists (idempotent)
+    # keep captain/vice from previous gw if the same player stayed
+    def kept(slot):
+        if slot and player_ids[slot - 1] == prev_ids[slot - 1]:
+            return slot
+        return None
+
+    # 4) write new lineup for to_gw (same slot order; replaces an existing one, idempotent)
     cur.execute("""
-        DELETE FROM fantasy_lineup
-        WHERE ft_id = %s AND gw_code = %s
-    """, (ft_id, to_gw))
-
-    # keep same slot numbers 1..11
-    for i, player_id in enumerate(player_ids, start=1):
-        # keep captain/vice from previous gw if the same player stayed
-        prev = next((p for p in prev_lineup if p["slot"] == i), None)
-        captain = False
-        vice = False
-        if prev and prev["player_id"] == player_id:
-            captain = prev["captain"]
-            vice = prev["vice_captain"]
-        cur.execute("""
-            INSERT INTO fantasy_lineup (ft_id, gw_code, player_id, slot, captain, vice_captain)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """, (ft_id, to_gw, player_id, i, captain, vice))
+        INSERT INTO fantasy_lineup (ft_id, gw_code, player_ids, captain_slot, vice_captain_slot)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (ft_id, gw_code) DO UPDATE
+        SET player_ids = EXCLUDED.player_ids,
+            captain_slot = EXCLUDED.captain_slot,
+            vice_captain_slot = EXCLUDED.vice_captain_slot
+    """, (ft_id, to_gw, player_ids, kept(prev_lineup["captain_slot"]), kept(prev_lineup["vice_captain_slot"])))
 
 
 def apply_transfers_to_all(to_gw: str):
@@ -1,8 +1,10 @@
 # backend/db.py
 
 import os
+import time
 from pathlib import Path
 import psycopg2
+from psycopg2.extensions import connection as _connection, cursor as _cursor
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 
@@ -10,13 +12,74 @@ BASE_DIR = Path(__file__).resolve().parent
 env_path = BASE_DIR / ".env"
 load_dotenv(env_path)
 
+import metrics  # noqa: E402  (reads METRICS_ENABLED from .env)
+
+
+class _Metered:
+    """Cursor mixin that reports every statement to metrics."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            metrics.record_query(time.perf_counter() - start, query, self.rowcount)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            metrics.record_query(time.perf_counter() - start, query, self.rowcount)
+
+    def copy_expert(self, sql, file, size=8192):
+        start = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            metrics.record_query(time.perf_counter() - start, sql, self.rowcount)
+
+
+class MeteredCursor(_Metered, RealDictCursor):
+    pass
+
+
+class MeteredTupleCursor(_Metered, _cursor):
+    pass
+
+
+class MeteredConnection(_connection):
+    def close(self):
+        if not self.closed:
+            metrics.record_close()
+        super().close()
+
+
 def get_conn():
+    if not metrics.enabled:
+        return _connect(RealDictCursor, _connection)
+    start = time.perf_counter()
+    conn = _connect(MeteredCursor, MeteredConnection)
+    metrics.record_connect(time.perf_counter() - start)
+    return conn
+
+
+def tuple_cursor(conn, name=None):
+    """
+    Cursor returning plain tuples instead of the connection's dict rows
+    (no per-row dict); named, it is a server-side cursor.
+    """
+    return conn.cursor(name, cursor_factory=MeteredTupleCursor if metrics.enabled else _cursor)
+
+
+def _connect(cursor_factory, connection_factory):
     return psycopg2.connect(
         host=os.getenv("DB_HOST"),
         port=os.getenv("DB_PORT"),
         dbname=os.getenv("DB_NAME"),
         user=os.getenv("DB_USER"),
         password=os.getenv("DB_PASSWORD"),
-        cursor_factory=RealDictCursor,
+        cursor_factory=cursor_factory,
+        connection_factory=connection_factory,
         sslmode="require"
     )
@@ -0,0 +1,130 @@
+# backend/export.py
+
+"""
+Season data export for GET /export/{dataset}, as CSV or NDJSON.
+
+Rows are read through a server-side (named) cursor CHUNK_ROWS at a time and
+each chunk is encoded and handed to the client before the next is fetched,
+so an export of any size holds one chunk in memory and the first bytes go
+out as soon as Postgres returns the first rows.
+
+There is no ORDER BY: a sort would have to read the whole table before
+the first row. Partitioned tables (player_points, fantasy_lineup) come out
+gameweek by gameweek, their partition order.
+"""
+
+import csv
+import io
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import psycopg2.extensions
+
+import fast_json
+from db import tuple_cursor
+
+CHUNK_ROWS = 10_000
+
+CSV = "csv"
+NDJSON = "ndjson"
+MEDIA_TYPES = {CSV: "text/csv; charset=utf-8", NDJSON: "application/x-ndjson"}
+
+# dataset -> (SELECT ... FROM ..., gw_code column for the ?gw_code= filter)
+DATASETS: Dict[str, Tuple[str, str]] = {
+    "player_points": (
+        "SELECT gw_code, player_id, points FROM player_points",
+        "gw_code",
+    ),
+    "lineups": (
+        """
+        SELECT gw_code, ft_id, player_ids,
+               player_ids[captain_slot] AS captain_id,
+               player_ids[vice_captain_slot] AS vice_captain_id
+        FROM fantasy_lineup
+        """,
+        "gw_code",
+    ),
+    "transfers": (
+        "SELECT gw_code, ft_id, sub_no, player_out_id, player_in_id, created_at FROM transfer",
+        "gw_code",
+    ),
+    "standings": (
+        "SELECT gw_code, ft_id, gw_points, total_points FROM standings_snapshot",
+        "gw_code",
+    ),
+    "matches": (
+        """
+        SELECT id, gw_code, hometeam_code, awayteam_code, gametime, home_goals, away_goals
+        FROM match
+        """,
+        "gw_code",
+    ),
+}
+
+# In CSV, BIGINT[] (lineup player_ids) and TIMESTAMPTZ columns are passed
+# through as Postgres prints them ({1,2,3}, 2025-08-16 14:00:00+00): COPY
+# reads them back as-is, and no datetime is parsed only to be printed again
+_AS_TEXT = psycopg2.extensions.new_type((1016, 1184), "EXPORT_TEXT", lambda value, cur: value)
+
+
+def export_query(dataset: str, gw_code: Optional[str]) -> Tuple[str, List]:
+    """SQL + params for one dataset; ValueError if it is unknown."""
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}'. Available: {', '.join(DATASETS)}")
+    sql, gw_column = DATASETS[dataset]
+    if gw_code is None:
+        return sql, []
+    return f"{sql} WHERE {gw_column} = %s", [gw_code.strip()]
+
+
+def _csv_chunks(cur, names: List[str], rows: List[tuple]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(names)
+    while True:
+        writer.writerows(rows)
+        yield buf.getvalue().encode("utf-8")
+        if len(rows) < CHUNK_ROWS:
+            return
+        buf.seek(0)
+        buf.truncate()
+        rows = cur.fetchmany(CHUNK_ROWS)
+
+
+def _ndjson_chunks(cur, names: List[str], rows: List[tuple]) -> Iterator[bytes]:
+    while rows:
+        yield b"".join(fast_json.dumps(dict(zip(names, row))) + b"\n" for row in rows)
+        if len(rows) < CHUNK_ROWS:
+            return
+        rows = cur.fetchmany(CHUNK_ROWS)
+
+
+def _closing(conn, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    try:
+        yield from chunks
+    finally:
+        # Also runs if the client goes away mid-stream (generator closed);
+        # closing rolls back the read-only transaction and drops the cursor
+        conn.close()
+
+
+def stream_export(conn, sql: str, params: List, fmt: str) -> Iterator[bytes]:
+    """
+    Run the export query and return its rows as encoded chunks. The query
+    and first fetch run here, so errors surface before a response starts;
+    `conn` is then owned by the returned iterator and closed when it ends.
+    """
+    try:
+        if fmt == CSV:
+            cur = tuple_cursor(conn, "export")
+            psycopg2.extensions.register_type(_AS_TEXT, cur)
+        else:
+            cur = fast_json.cursor(conn, "export")
+        cur.execute(sql, params)
+        # A named cursor only knows its columns after the first fetch
+        rows = cur.fetchmany(CHUNK_ROWS)
+        names = fast_json.columns(cur)
+    except Exception:
+        conn.close()
+        raise
+    chunks = _csv_chunks if fmt == CSV else _ndjson_chunks
+    return _closing(conn, chunks(cur, names, rows))
@@ -0,0 +1,138 @@
+# backend/fast_json.py
+
+"""
+Fast JSON bodies for large list responses (/players, /standings, fixtures).
+
+The default path builds a RealDictRow per row, then FastAPI walks every value
+with jsonable_encoder before json.dumps. Here instead:
+- rows come from a tuple cursor (db.tuple_cursor) whose NUMERIC columns are
+  parsed straight to int / float, the numbers jsonable_encoder would have
+  produced from a Decimal (no Decimal is ever built);
+- encode_rows() zips them with the column names and serializes with orjson,
+  which also handles dates natively, to the same JSON as the default path;
+- json_response() gzips the body when the client accepts it and it is at
+  least GZIP_MIN_BYTES (0 turns compression off).
+
+Without orjson installed everything still works through the standard json
+module, just slower.
+"""
+
+import gzip
+import json
+import os
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+import psycopg2.extensions
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from db import tuple_cursor
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, see requirements.txt
+    orjson = None
+
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+GZIP_LEVEL = 5
+# A strong ETag must differ between content encodings: "v12" -> "v12-gz"
+GZIP_ETAG_SUFFIX = "-gz"
+
+
+def _numeric(value: Optional[str], cur) -> Any:
+    # Postgres prints NUMERIC without exponents, so a '.' is the only way
+    # to tell 12.50 (float, as jsonable_encoder does) from 12 (int)
+    if value is None:
+        return None
+    return float(value) if "." in value or value == "NaN" else int(value)
+
+
+NUMERIC = psycopg2.extensions.new_type(psycopg2.extensions.DECIMAL.values, "NUMERIC_JSON", _numeric)
+
+
+def cursor(conn, name=None):
+    """Tuple cursor for encode_rows(): NUMERIC comes back as int / float."""
+    cur = tuple_cursor(conn, name)
+    psycopg2.extensions.register_type(NUMERIC, cur)
+    return cur
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    return jsonable_encoder(obj)
+
+
+def dumps(data: Any) -> bytes:
+    """Same JSON as FastAPI's default JSONResponse, as bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        jsonable_encoder(data),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def columns(cur) -> List[str]:
+    return [d[0] for d in cur.description]
+
+
+def encode_rows(names: Sequence[str], rows: Sequence[tuple]) -> bytes:
+    """
+    Tuple rows as a JSON list of objects. Values past len(names) are left
+    out (e.g. sort-only columns selected last).
+    """
+    return dumps([dict(zip(names, row)) for row in rows])
+
+
+def accepts_gzip(request: Request) -> bool:
+    return GZIP_MIN_BYTES > 0 and "gzip" in request.headers.get("accept-encoding", "")
+
+
+def compress(body: bytes) -> Optional[bytes]:
+    """Gzipped body, or None if it is too small to be worth it."""
+    if GZIP_MIN_BYTES <= 0 or len(body) < GZIP_MIN_BYTES:
+        return None
+    return gzip.compress(body, GZIP_LEVEL)
+
+
+def response_headers(response: Response) -> Dict[str, str]:
+    """Headers a handler set on its Response (e.g. X-Next-Cursor), minus the body's own."""
+    return {
+        k: v for k, v in response.headers.items()
+        if k not in ("content-length", "content-type")
+    }
+
+
+def gzip_etag(etag: str) -> str:
+    """ETag of the gzipped variant of a body tagged `etag`."""
+    return etag[:-1] + GZIP_ETAG_SUFFIX + '"'
+
+
+def json_response(
+    request: Request,
+    body: bytes,
+    headers: Optional[Dict[str, str]] = None,
+    gzipped: Optional[bytes] = None,
+) -> Response:
+    """
+    Response for an encoded JSON body, gzipped if the client accepts it.
+    `gzipped` is an already compressed copy (the response cache keeps one).
+    An ETag in `headers` gets GZIP_ETAG_SUFFIX when the gzipped body is sent.
+    """
+    headers = dict(headers or {})
+    if GZIP_MIN_BYTES > 0:
+        headers["Vary"] = "Accept-Encoding"
+        if accepts_gzip(request):
+            if gzipped is None:
+                gzipped = compress(body)
+            if gzipped is not None:
+                body = gzipped
+                headers["Content-Encoding"] = "gzip"
+                if "ETag" in headers:
+                    headers["ETag"] = gzip_etag(headers["ETag"])
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,125 @@
+# backend/invalidation.py
+
+"""
+Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+Every bump_data_version() call (schema SECTION 9) NOTIFYs channel
+'data_version' with {"version": n, "scopes": [...]}. Postgres delivers it
+when the writer commits, to every connection LISTENing, whichever worker
+or node ran /simulate, /transfers or the loader. Each API worker runs one
+InvalidationListener thread that applies those versions to its
+data_versions, so responses cached at older versions stop being served:
+- 'gw:<code>'     gameweek simulated, or lineups / transfers changed in it
+- 'global'        reference data reloaded (teams, players and their prices):
+                  also empties the response cache and the fuzzy player index
+- 'fantasy_team', 'league:<id>'  standings / league tables
+
+If the connection drops, the listener reconnects and reloads the whole
+data_version table, so bumps missed in between are not lost.
+
+The same connection calls release_stale_simulations() every
+STALE_SIMULATION_CHECK seconds: a gameweek left 'simulating' by a
+simulate that died is reset, and its bump reaches every worker as above.
+"""
+
+import json
+import logging
+import select
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from db import get_conn
+from player_search import invalidate_fuzzy_index
+from response_cache import GLOBAL, data_versions, response_cache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "data_version"
+
+# Seconds between checks for stop(), and before reconnecting after an error
+POLL_TIMEOUT = 5.0
+RECONNECT_DELAY = 5.0
+STALE_SIMULATION_CHECK = 60.0
+
+
+def handle_notification(payload: str) -> Dict:
+    """Apply one 'data_version' NOTIFY payload to this process's caches."""
+    msg = json.loads(payload)
+    scopes = msg["scopes"]
+    data_versions.apply([{"scope": s, "version": msg["version"]} for s in scopes])
+    if GLOBAL in scopes:
+        response_cache.clear()
+        invalidate_fuzzy_index()
+    return msg
+
+
+def release_stale_simulations(conn) -> None:
+    """Reset gameweeks stuck in 'simulating' (autocommit connection)."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT release_stale_simulations() AS code")
+        released = [row["code"] for row in cur.fetchall()]
+    if released:
+        logger.warning("Released gameweeks left 'simulating' by a failed run: %s", ", ".join(released))
+
+
+class InvalidationListener:
+    """Background thread holding one LISTEN connection."""
+
+    def __init__(self, conn_factory: Callable = get_conn):
+        self._conn_factory = conn_factory
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._connected_before = False
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(POLL_TIMEOUT + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.warning("Cache invalidation listener lost its connection; reconnecting", exc_info=True)
+                self._stop.wait(RECONNECT_DELAY)
+
+    def _listen(self) -> None:
+        conn = self._conn_factory()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            # Catch up on whatever was committed before LISTEN took effect
+            data_versions.load(conn)
+            if self._connected_before:
+                response_cache.clear()
+                invalidate_fuzzy_index()
+            self._connected_before = True
+
+            next_check = 0.0
+            while not self._stop.is_set():
+                if time.monotonic() >= next_check:
+                    release_stale_simulations(conn)
+                    next_check = time.monotonic() + STALE_SIMULATION_CHECK
+                if select.select([conn], [], [], POLL_TIMEOUT) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    payload = conn.notifies.pop(0).payload
+                    try:
+                        handle_notification(payload)
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("Ignoring malformed %s notification: %r", CHANNEL, payload)
+        finally:
+            conn.close()
+
+
+invalidation_listener = InvalidationListener()
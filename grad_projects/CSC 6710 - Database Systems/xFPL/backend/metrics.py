@@ -0,0 +1,284 @@
+# backend/metrics.py
+
+"""
+Prometheus metrics for the API, rendered at GET /metrics.
+
+- MetricsMiddleware times every request and counts it by route template
+  and status. While a request runs, a RequestStats in a ContextVar collects
+  the queries its handler runs (sync handlers run in the threadpool with a
+  copy of the context, so they update the same object).
+- db.get_conn() hands out MeteredConnection / MeteredCursor, which call
+  record_connect / record_query around connects and statements. There is
+  no pool (every get_conn() opens a connection), so the pool stats are
+  connects, closes and connect latency.
+- simulate_phase("matches") times one phase of a gameweek simulation (and
+  labels a running ?profile=phases profile with it).
+- With SQL_TRACE=1 each request also carries a sql_trace.RequestTrace
+  (statement shapes, N+1 warnings, X-DB-* headers).
+
+No client library: the two metric types needed are here and render the
+text exposition format. METRICS_ENABLED=0 in .env turns it all off.
+"""
+
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import profiling
+import sql_trace
+
+enabled = os.getenv("METRICS_ENABLED", "1") != "0"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+PHASE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_label_str(self.labelnames, k)} {_fmt(v)}" for k, v in values]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets) + (math.inf,)
+        # labels -> [count per bucket ..., sum]
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def totals(self) -> Dict[Labels, Tuple[int, float]]:
+        """Observation count and sum per label set."""
+        with self._lock:
+            return {k: (int(sum(v[:-1])), v[-1]) for k, v in self._series.items()}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((k, list(v)) for k, v in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, counts in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _label_str(self.labelnames, labels, f'le="{_fmt(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, labels)} {_fmt(counts[-1])}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+HTTP_REQUESTS = Counter(
+    "xfpl_http_requests_total", "HTTP requests by route template and status.",
+    ("method", "route", "status"),
+)
+HTTP_LATENCY = Histogram(
+    "xfpl_http_request_duration_seconds", "Time from request start to the last response byte.",
+    LATENCY_BUCKETS, ("method", "route"),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "xfpl_http_request_db_queries", "Database statements run per request.",
+    QUERY_COUNT_BUCKETS, ("method", "route"),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "xfpl_http_request_db_seconds", "Time spent in database statements per request.",
+    LATENCY_BUCKETS, ("method", "route"),
+)
+DB_QUERIES = Counter("xfpl_db_queries_total", "Database statements run (requests and background work).")
+DB_QUERY_SECONDS = Counter("xfpl_db_query_seconds_total", "Time spent in database statements.")
+DB_CONNECTS = Counter("xfpl_db_connections_opened_total", "Connections opened by get_conn().")
+DB_CLOSES = Counter("xfpl_db_connections_closed_total", "Connections closed explicitly.")
+DB_CONNECT_SECONDS = Histogram(
+    "xfpl_db_connect_seconds", "Time to open a database connection.", LATENCY_BUCKETS,
+)
+SIMULATE_PHASE_SECONDS = Histogram(
+    "xfpl_simulate_phase_seconds", "Duration of each gameweek simulation phase.",
+    PHASE_BUCKETS, ("phase",),
+)
+
+METRICS = [
+    HTTP_REQUESTS, HTTP_LATENCY, REQUEST_DB_QUERIES, REQUEST_DB_SECONDS,
+    DB_QUERIES, DB_QUERY_SECONDS, DB_CONNECTS, DB_CLOSES, DB_CONNECT_SECONDS,
+    SIMULATE_PHASE_SECONDS,
+]
+
+# Other modules' metrics (e.g. the response cache), rendered after ours
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def add_collector(collect: Callable[[], List[str]]) -> None:
+    _collectors.append(collect)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines += metric.render()
+    for collect in _collectors:
+        lines += collect()
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------------
+# Per-request database stats
+# ----------------------------------------------------------------------------
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "trace")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.trace = sql_trace.new_trace()
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def record_query(seconds: float, query: Any = None, rows: int = -1) -> None:
+    DB_QUERIES.inc()
+    DB_QUERY_SECONDS.inc(amount=seconds)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+        if stats.trace is not None:
+            stats.trace.record(query, seconds, rows)
+
+
+def record_connect(seconds: float) -> None:
+    DB_CONNECTS.inc()
+    DB_CONNECT_SECONDS.observe(seconds)
+
+
+def record_close() -> None:
+    DB_CLOSES.inc()
+
+
+def observe_phase(phase: str, seconds: float) -> None:
+    if enabled:
+        SIMULATE_PHASE_SECONDS.observe(seconds, phase)
+
+
+class PhaseTimer:
+    __slots__ = ("phase", "start", "_previous")
+
+    def __init__(self, phase: str):
+        self.phase = phase
+        self._previous = profiling.set_phase(phase) if profiling.enabled else None
+        self.start = time.perf_counter()
+
+    def stop(self) -> None:
+        observe_phase(self.phase, time.perf_counter() - self.start)
+        if profiling.enabled:
+            profiling.set_phase(self._previous)
+
+
+def start_phase(phase: str) -> PhaseTimer:
+    """For a phase that does not fit a with block: call .stop() where it ends."""
+    return PhaseTimer(phase)
+
+
+@contextmanager
+def simulate_phase(phase: str):
+    timer = start_phase(phase)
+    try:
+        yield
+    finally:
+        timer.stop()
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware (no BaseHTTPMiddleware task per request)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not enabled:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+        method = scope["method"]
+
+        def route_label() -> str:
+            # The router stores the matched route in the shared scope
+            return getattr(scope.get("route"), "path", None) or "unmatched"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if stats.trace is not None:
+                    headers = sql_trace.finish(method, route_label(), stats.trace, stats.db_seconds)
+                    stats.trace = None
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            route = route_label()
+            if stats.trace is not None:
+                # No response was started (the handler raised)
+                sql_trace.finish(method, route, stats.trace, stats.db_seconds)
+            HTTP_REQUESTS.inc(method, route, str(status))
+            HTTP_LATENCY.observe(time.perf_counter() - start, method, route)
+            REQUEST_DB_QUERIES.observe(stats.queries, method, route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, method, route)
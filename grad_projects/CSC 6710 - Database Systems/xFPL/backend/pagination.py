@@ -0,0 +1,103 @@
+# backend/pagination.py
+
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is requested with ?limit=N[&cursor=...]. The body stays a plain list;
+when more rows exist the response carries an X-Next-Cursor header, an opaque
+token holding the sort key of the last row returned. The next page seeks past
+that key with a WHERE clause the ORDER BY index can serve (no OFFSET), so a
+page costs the same however deep into the list it is.
+"""
+
+import base64
+import json
+from decimal import Decimal
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# (sql expression, descending?)
+SortKey = Tuple[str, bool]
+
+
+def encode_cursor(scope: str, values: Sequence[Any]) -> str:
+    """Pack the last row's sort values into an opaque, URL-safe token."""
+    plain = [str(v) if isinstance(v, Decimal) else v for v in values]
+    payload = json.dumps([scope, plain], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(scope: str, cursor: str, n_keys: int) -> List[Any]:
+    """Unpack a cursor produced by encode_cursor for the same endpoint."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        got_scope, values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if got_scope != scope or not isinstance(values, list) or len(values) != n_keys:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return values
+
+
+def order_by(keys: Sequence[SortKey]) -> str:
+    return ", ".join(f"{expr} {'DESC' if desc else 'ASC'}" for expr, desc in keys)
+
+
+def keyset_condition(keys: Sequence[SortKey], values: Sequence[Any]) -> Tuple[str, List[Any]]:
+    """
+    WHERE fragment matching rows strictly after `values` in ORDER BY `keys`.
+
+    Keys sharing one direction use a row comparison; mixed directions expand to
+    a <= x AND ((a < x) OR (a = x AND b > y) OR ...). The redundant leading
+    bound is what lets the planner start the index scan at the cursor instead
+    of filtering every row before it.
+    """
+    if all(desc == keys[0][1] for _, desc in keys):
+        cols = ", ".join(expr for expr, _ in keys)
+        marks = ", ".join(["%s"] * len(keys))
+        op = "<" if keys[0][1] else ">"
+        return f"({cols}) {op} ({marks})", list(values)
+
+    lead_expr, lead_desc = keys[0]
+    clauses = []
+    params: List[Any] = [values[0]]
+    for i, (expr, desc) in enumerate(keys):
+        parts = [f"{keys[j][0]} = %s" for j in range(i)]
+        parts.append(f"{expr} {'<' if desc else '>'} %s")
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(values[:i])
+        params.append(values[i])
+    bound = f"{lead_expr} {'<=' if lead_desc else '>='} %s"
+    return f"({bound} AND (" + " OR ".join(clauses) + "))", params
+
+
+def seek(
+    keys: Sequence[SortKey],
+    scope: str,
+    cursor: Optional[str],
+) -> Tuple[str, List[Any]]:
+    """Decode `cursor` (if any) into a WHERE fragment; ('TRUE', []) for page one."""
+    if not cursor:
+        return "TRUE", []
+    return keyset_condition(keys, decode_cursor(scope, cursor, len(keys)))
+
+
+def finish_page(
+    rows: List[Any],
+    limit: int,
+    response: Response,
+    scope: str,
+    key_fn: Callable[[Any], Sequence[Any]],
+) -> List[Any]:
+    """
+    Rows (dicts or tuples) are fetched with LIMIT limit + 1; drop the
+    look-ahead row and, if it existed, point X-Next-Cursor at the last row
+    of this page.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(scope, key_fn(rows[-1]))
+    return rows
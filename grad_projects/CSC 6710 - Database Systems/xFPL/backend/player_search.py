@@ -0,0 +1,370 @@
+# backend/player_search.py
+
+"""
+Player search for the /players browser.
+
+Filters are written against the normalized columns maintained by the schema
+so every predicate can use an index:
+- team_code is stored upper-case (CHAR(3)) -> idx_player_team_pos_cost
+- position is constrained to GK/DEF/MID/FWD -> idx_player_pos_cost
+- search_name is LOWER(first_name || ' ' || last_name) -> trigram / prefix indexes
+
+Substring queries of 3+ characters use the pg_trgm GIN index; shorter queries
+fall back to prefix matching, which the text_pattern_ops indexes serve.
+"""
+
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pagination import SortKey, keyset_condition, order_by
+
+# Trigram indexes cannot narrow queries shorter than one trigram
+MIN_SUBSTRING_LEN = 3
+
+POSITION_ALIASES = {
+    "FW": "FWD", "F": "FWD", "ST": "FWD", "ATT": "FWD", "FORWARD": "FWD",
+    "GKP": "GK", "GOALKEEPER": "GK",
+    "DEFENDER": "DEF",
+    "MIDFIELDER": "MID",
+}
+
+PLAYER_COLUMNS = "id, team_code, first_name, last_name, position, cost"
+
+
+def normalize_position(position: str) -> str:
+    """Map frontend position aliases onto the values stored in player.position."""
+    pos = position.upper().strip()
+    return POSITION_ALIASES.get(pos, pos)
+
+
+def normalize_query(q: str) -> str:
+    """Lower-case and collapse whitespace the same way search_name is built."""
+    return " ".join(q.lower().split())
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def player_sort_keys(q: Optional[str] = None) -> List[SortKey]:
+    """
+    ORDER BY keys for a /players page. `id` is the final tie-breaker so the
+    order is total and keyset cursors never skip or repeat a player.
+    """
+    keys: List[SortKey] = [
+        ("cost", True),
+        ("team_code", False),
+        ("position", False),
+        ("last_name", False),
+        ("first_name", False),
+        ("id", False),
+    ]
+    if q and normalize_query(q):
+        keys.insert(0, ("search_rank", False))
+    return keys
+
+
+def build_player_query(
+    team_code: Optional[str] = None,
+    position: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: int = 500,
+    after: Optional[Sequence] = None,
+) -> Tuple[str, List]:
+    """
+    Build the SQL + params for a player search.
+
+    Results are ranked so last-name prefix hits come first, then first-name /
+    full-name prefix hits, then other substring hits; ties keep the original
+    browser ordering (most expensive first). Name searches return the rank
+    as `search_rank`.
+
+    `after` holds the player_sort_keys values of the previous page's last row.
+    """
+    where = []
+    params: List = []
+    rank_sql = ""
+    rank_params: List = []
+
+    if team_code:
+        where.append("team_code = %s")
+        params.append(team_code.upper().strip())
+
+    if position:
+        where.append("position = %s")
+        params.append(normalize_position(position))
+
+    term = normalize_query(q) if q else ""
+    if term:
+        prefix = _escape_like(term) + "%"
+        if len(term) >= MIN_SUBSTRING_LEN:
+            where.append("search_name LIKE %s")
+            params.append("%" + _escape_like(term) + "%")
+        else:
+            where.append("(LOWER(last_name) LIKE %s OR search_name LIKE %s)")
+            params.extend([prefix, prefix])
+        rank_sql = """,
+                CASE
+                    WHEN LOWER(last_name) LIKE %s THEN 0
+                    WHEN search_name LIKE %s THEN 1
+                    ELSE 2
+                END AS search_rank"""
+        rank_params = [prefix, prefix]
+
+    where_sql = ""
+    if where:
+        where_sql = "WHERE " + " AND ".join(where)
+
+    keys = player_sort_keys(q)
+    seek_sql = ""
+    seek_params: List = []
+    if after is not None:
+        cond, seek_params = keyset_condition(keys, after)
+        seek_sql = "WHERE " + cond
+
+    sql = f"""
+        SELECT * FROM (
+            SELECT {PLAYER_COLUMNS}{rank_sql}
+            FROM player
+            {where_sql}
+        ) p
+        {seek_sql}
+        ORDER BY {order_by(keys)}
+        LIMIT %s
+    """
+    return sql, rank_params + params + seek_params + [limit]
+
+
+# =====================================================
+# FUZZY (typo-tolerant) SEARCH
+# =====================================================
+#
+# In-memory index over player names, built once from the player table.
+# Candidates come from a bigram count filter (bucketed by term length), then
+# each candidate is verified with a banded Levenshtein that gives up as soon
+# as the distance exceeds the threshold.
+
+Q = 2
+
+
+def fold_name(text: str) -> str:
+    """Lower-case, strip accents and collapse whitespace ("Ødegaard" -> "ødegaard")."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
+
+def _qgrams(term: str) -> List[str]:
+    padded = "^" + term + "$"
+    return [padded[i:i + Q] for i in range(len(padded) - Q + 1)]
+
+
+def bounded_edit_distance(a: str, b: str, k: int) -> Optional[int]:
+    """
+    Levenshtein distance between a and b if it is <= k, else None.
+    Only the diagonal band of width 2k+1 is computed.
+    """
+    la, lb = len(a), len(b)
+    if abs(la - lb) > k:
+        return None
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+
+    big = k + 1
+    prev = [j if j <= k else big for j in range(lb + 1)]
+    for i in range(1, la + 1):
+        lo = max(1, i - k)
+        hi = min(lb, i + k)
+        cur = [big] * (lb + 1)
+        cur[0] = i if i <= k else big
+        ca = a[i - 1]
+        row_min = cur[0]
+        for j in range(lo, hi + 1):
+            cost = 0 if ca == b[j - 1] else 1
+            v = prev[j - 1] + cost
+            if prev[j] + 1 < v:
+                v = prev[j] + 1
+            if cur[j - 1] + 1 < v:
+                v = cur[j - 1] + 1
+            cur[j] = v
+            if v < row_min:
+                row_min = v
+        if row_min > k:
+            return None
+        prev = cur
+    return prev[lb] if prev[lb] <= k else None
+
+
+def default_max_distance(term: str) -> int:
+    """Typo budget by query length: short names tolerate fewer edits."""
+    if len(term) <= 3:
+        return 0
+    if len(term) <= 5:
+        return 1
+    return 2
+
+
+class FuzzyPlayerIndex:
+    """
+    Edit-distance index over player names.
+
+    Each player is indexed under every name token and its full name, so
+    "halaand", "erling halaand" and "erlnig" all resolve to the same player.
+    """
+
+    def __init__(self, players: List[Dict]):
+        self.players: Dict[int, Dict] = {}
+        self.terms: List[str] = []
+        self.term_players: List[List[int]] = []
+        term_grams: List[int] = []
+        postings: Dict[Tuple[int, str], List[int]] = defaultdict(list)
+        by_length: Dict[int, List[int]] = defaultdict(list)
+
+        term_ids: Dict[str, int] = {}
+        for p in players:
+            self.players[p["id"]] = p
+            full = fold_name(f"{p['first_name']} {p['last_name']}")
+            for term in {full, *full.split()}:
+                tid = term_ids.get(term)
+                if tid is None:
+                    tid = len(self.terms)
+                    term_ids[term] = tid
+                    self.terms.append(term)
+                    self.term_players.append([])
+                    grams = set(_qgrams(term))
+                    term_grams.append(len(grams))
+                    by_length[len(term)].append(tid)
+                    for g in grams:
+                        postings[(len(term), g)].append(tid)
+                self.term_players[tid].append(p["id"])
+
+        # Posting lists are counted with np.bincount, which keeps candidate
+        # generation in the low milliseconds at ~100k players. numpy is
+        # imported here, with the first index, rather than at API startup.
+        import numpy as np
+
+        self.term_grams = np.array(term_grams, dtype=np.int32)
+        # (length, qgram) -> term ids
+        self.postings = {key: np.array(ids, dtype=np.int32) for key, ids in postings.items()}
+        self.by_length = {length: np.array(ids, dtype=np.int32) for length, ids in by_length.items()}
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def _candidates(self, term: str, k: int) -> List[int]:
+        import numpy as np
+
+        grams = set(_qgrams(term))
+        lengths = range(max(1, len(term) - k), len(term) + k + 1)
+
+        # Count filter: k edits remove at most k*Q distinct q-grams, so a match
+        # shares at least max(|G(a)|, |G(b)|) - k*Q of them. Queries too short
+        # for that bound to prune anything are verified against every term of
+        # a compatible length.
+        floor = len(grams) - k * Q
+        if floor <= 0:
+            same_length = [self.by_length[n] for n in lengths if n in self.by_length]
+            return np.concatenate(same_length).tolist() if same_length else []
+
+        lists = [
+            self.postings[(n, g)]
+            for n in lengths for g in grams
+            if (n, g) in self.postings
+        ]
+        if not lists:
+            return []
+        counts = np.bincount(np.concatenate(lists), minlength=len(self.terms))
+        ids = np.flatnonzero(counts >= floor)
+        keep = counts[ids] >= self.term_grams[ids] - k * Q
+        return ids[keep].tolist()
+
+    def search(
+        self,
+        q: str,
+        max_distance: Optional[int] = None,
+        team_code: Optional[str] = None,
+        position: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict]:
+        """Players whose name is within max_distance edits of q, nearest first."""
+        term = fold_name(q)
+        if not term:
+            return []
+        k = default_max_distance(term) if max_distance is None else max_distance
+        team = team_code.upper().strip() if team_code else None
+        pos = normalize_position(position) if position else None
+
+        best: Dict[int, int] = {}
+        for tid in self._candidates(term, k):
+            d = bounded_edit_distance(term, self.terms[tid], k)
+            if d is None:
+                continue
+            for pid in self.term_players[tid]:
+                if d < best.get(pid, k + 1):
+                    best[pid] = d
+
+        hits = []
+        for pid, d in best.items():
+            p = self.players[pid]
+            if team and p["team_code"] != team:
+                continue
+            if pos and p["position"] != pos:
+                continue
+            hits.append({**p, "distance": d})
+        hits.sort(key=lambda r: (r["distance"], -float(r["cost"]), r["last_name"], r["first_name"]))
+        return hits[:limit]
+
+
+_fuzzy_index: Optional[FuzzyPlayerIndex] = None
+_fuzzy_lock = threading.Lock()
+
+
+def load_fuzzy_index(conn) -> FuzzyPlayerIndex:
+    """(Re)build the fuzzy index from the player table and swap it in."""
+    global _fuzzy_index
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT {PLAYER_COLUMNS} FROM player")
+        rows = cur.fetchall()
+    index = FuzzyPlayerIndex([dict(r) for r in rows])
+    _fuzzy_index = index
+    return index
+
+
+def get_fuzzy_index(conn_factory) -> FuzzyPlayerIndex:
+    """Return the current index, building it on first use."""
+    index = _fuzzy_index
+    if index is not None:
+        return index
+    with _fuzzy_lock:
+        if _fuzzy_index is None:
+            conn = conn_factory()
+            try:
+                load_fuzzy_index(conn)
+            finally:
+                conn.close()
+        return _fuzzy_index
+
+
+def get_players(conn_factory, ids: Sequence[int]) -> Dict[int, Dict]:
+    """
+    Rows (PLAYER_COLUMNS) for the given ids from the in-memory index, so
+    squad checks need no query. Unknown ids trigger one rebuild in case
+    players were loaded since the index was built; ids still unknown are
+    left out of the result.
+    """
+    players = get_fuzzy_index(conn_factory).players
+    if any(pid not in players for pid in ids):
+        conn = conn_factory()
+        try:
+            players = load_fuzzy_index(conn).players
+        finally:
+            conn.close()
+    return {pid: players[pid] for pid in ids if pid in players}
+
+
+def invalidate_fuzzy_index() -> None:
+    """Drop the index so the next fuzzy search rebuilds it (e.g. after a data load)."""
+    global _fuzzy_index
+    _fuzzy_index = None
@@ -0,0 +1,312 @@
+# backend/profiling.py
+
+"""
+On-demand profiling of single requests, for admins (ADMIN_TOKEN in .env).
+
+Ask for a profile of one request with ?profile=1 (or an X-Profile: 1
+header) plus the X-Admin-Token header. The handler then runs under a
+sampling profiler: a thread that records the handler thread's stack every
+PROFILE_INTERVAL_MS (default 1 ms; wall clock, so time waiting on the
+database shows up under cursor.execute). The profile is kept in a ring
+buffer and the response carries its id in X-Profile-Id; fetch it from
+GET /debug/profiles/{id} as
+- tree       indented call tree with % of samples (the default)
+- collapsed  folded stacks, one "a;b;c count" line per stack, which
+             flamegraph.pl, speedscope and inferno read as is
+
+?profile=phases roots the stacks at the simulate phase they ran in
+(lineups, matches, points, chemistry, standings, carry_forward; see
+metrics.simulate_phase), so one POST /simulate shows each phase as its own
+subtree, with the wall time of each phase in the profile summary.
+
+Scripts can profile any block with `with Profile("label") as p:` and read
+p.tree() / p.collapsed().
+
+Without ADMIN_TOKEN the middleware and route wrapper are not installed and
+the phase hook is one flag check: profiling costs nothing.
+"""
+
+import functools
+import hmac
+import inspect
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from fastapi.routing import APIRoute
+from starlette.responses import JSONResponse
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+enabled = bool(ADMIN_TOKEN)
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "1")) / 1000
+RECENT_PROFILES = 20
+MIN_TREE_PERCENT = 0.5
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+HANDLER, PHASES = "handler", "phases"
+NO_PHASE = "(outside phases)"
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return enabled and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+# ----------------------------------------------------------------------------
+# Sampling profiler
+# ----------------------------------------------------------------------------
+
+_active: ContextVar[Optional["Profile"]] = ContextVar("active_profile", default=None)
+
+
+class Profile:
+    """Samples the stack of the thread that enters it, below the entering frame."""
+
+    def __init__(self, label: str, mode: str = HANDLER, interval: float = SAMPLE_INTERVAL):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.mode = mode
+        self.interval = interval
+        self.started_at = time.time()
+        self.seconds = 0.0
+        # (phase or None, code objects root first) -> samples
+        self.samples: Counter = Counter()
+        self.phase: Optional[str] = None
+        self.phase_seconds: Dict[str, float] = {}
+        self._start = self._phase_start = 0.0
+        self._root = None
+        self._thread_id = 0
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._token = None
+
+    def __enter__(self) -> "Profile":
+        self._root = sys._getframe(1)
+        self._thread_id = threading.get_ident()
+        self._token = _active.set(self)
+        self._start = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample, name=f"profile-{self.id}", daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._sampler.join()
+        self.set_phase(None)
+        self.seconds = time.perf_counter() - self._start
+        _active.reset(self._token)
+        self._root = None
+
+    def _sample(self) -> None:
+        thread_id, root = self._thread_id, self._root
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            codes = []
+            while frame is not None and frame is not root:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            if frame is None or not codes:
+                continue  # not below the profiled block (yet, or any more)
+            codes.reverse()
+            phase = (self.phase or NO_PHASE) if self.mode == PHASES else None
+            self.samples[(phase, tuple(codes))] += 1
+
+    def set_phase(self, phase: Optional[str]) -> Optional[str]:
+        """Label the samples that follow; returns the previous label."""
+        now = time.perf_counter()
+        if self.phase is not None:
+            self.phase_seconds[self.phase] = self.phase_seconds.get(self.phase, 0.0) + now - self._phase_start
+        previous, self.phase, self._phase_start = self.phase, phase, now
+        return previous
+
+    # -- output ------------------------------------------------------------
+
+    def _stacks(self) -> List[Tuple[List[str], int]]:
+        stacks = []
+        for (phase, codes), count in self.samples.items():
+            names = [_frame_name(c) for c in codes]
+            if phase is not None:
+                names.insert(0, f"[phase] {phase}")
+            stacks.append(([self.label] + names, count))
+        return stacks
+
+    def collapsed(self) -> str:
+        lines = [";".join(names) + f" {count}" for names, count in self._stacks()]
+        return "\n".join(sorted(lines)) + "\n"
+
+    def tree(self) -> str:
+        root: Dict[str, Any] = {"count": 0, "self": 0, "children": {}}
+        for names, count in self._stacks():
+            node = root
+            node["count"] += count
+            for name in names:
+                node = node["children"].setdefault(name, {"count": 0, "self": 0, "children": {}})
+                node["count"] += count
+            node["self"] += count
+
+        total = root["count"] or 1
+        lines = [
+            f"{self.label}: {self.seconds * 1000:.1f} ms wall, {root['count']} samples "
+            f"every {self.interval * 1000:g} ms",
+        ]
+        if self.phase_seconds:
+            lines.append("phases: " + ", ".join(f"{p} {s * 1000:.1f} ms" for p, s in self.phase_seconds.items()))
+        lines.append(f"{'total':>7} {'self':>7}")
+
+        def walk(node: Dict, depth: int) -> None:
+            for name, child in sorted(node["children"].items(), key=lambda kv: -kv[1]["count"]):
+                if child["count"] * 100 / total < MIN_TREE_PERCENT:
+                    continue
+                lines.append(
+                    f"{child['count'] * 100 / total:6.1f}% {child['self'] * 100 / total:6.1f}% "
+                    f"{'  ' * depth}{name}"
+                )
+                walk(child, depth + 1)
+
+        walk(root, 0)
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "ms": round(self.seconds * 1000, 3),
+            "samples": sum(self.samples.values()),
+            "phases_ms": {p: round(s * 1000, 3) for p, s in self.phase_seconds.items()},
+        }
+
+
+def set_phase(phase: Optional[str]) -> Optional[str]:
+    """Called by metrics.simulate_phase; a no-op unless a profile is running here."""
+    profile = _active.get()
+    return profile.set_phase(phase) if profile is not None else None
+
+
+_recent: Deque[Profile] = deque(maxlen=RECENT_PROFILES)
+_recent_lock = threading.Lock()
+
+
+def _keep(profile: Profile) -> None:
+    with _recent_lock:
+        _recent.append(profile)
+
+
+def recent_profiles() -> List[Dict]:
+    """Summaries of the last RECENT_PROFILES profiles, newest first."""
+    with _recent_lock:
+        return [p.summary() for p in reversed(_recent)]
+
+
+def get_profile(profile_id: str) -> Optional[Profile]:
+    with _recent_lock:
+        return next((p for p in _recent if p.id == profile_id), None)
+
+
+# ----------------------------------------------------------------------------
+# Per-request hook: middleware (who asked) + route class (wraps the handler)
+# ----------------------------------------------------------------------------
+
+class ProfileRequest:
+    __slots__ = ("label", "mode", "profile_id")
+
+    def __init__(self, label: str, mode: str):
+        self.label = label
+        self.mode = mode
+        self.profile_id: Optional[str] = None
+
+
+_requested: ContextVar[Optional[ProfileRequest]] = ContextVar("profile_request", default=None)
+
+
+def profiled(endpoint: Callable) -> Callable:
+    """Run a sync endpoint under a Profile when its request asked for one."""
+    if inspect.iscoroutinefunction(endpoint) or getattr(endpoint, "profiled", False):
+        # Every handler here is sync (async ones share the event loop thread);
+        # include_router rebuilds routes from already-wrapped endpoints
+        return endpoint
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        request = _requested.get()
+        if request is None:
+            return endpoint(*args, **kwargs)
+        profile = Profile(request.label, request.mode)
+        request.profile_id = profile.id
+        try:
+            with profile:
+                return endpoint(*args, **kwargs)
+        finally:
+            _keep(profile)
+
+    wrapper.profiled = True
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """Route class that lets ProfileMiddleware profile the handler."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, profiled(endpoint), **kwargs)
+
+
+def _requested_mode(scope) -> Optional[str]:
+    value = None
+    query = scope.get("query_string", b"")
+    if b"profile=" in query:
+        value = parse_qs(query.decode("latin-1")).get("profile", [None])[0]
+    if value is None:
+        for name, header in scope["headers"]:
+            if name == b"x-profile":
+                value = header.decode("latin-1")
+                break
+    if value in (None, "", "0", "false"):
+        return None
+    return PHASES if value == PHASES else HANDLER
+
+
+class ProfileMiddleware:
+    """Plain ASGI middleware: checks the admin token and reports the profile id."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        mode = _requested_mode(scope) if scope["type"] == "http" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        token = next((v.decode("latin-1") for k, v in scope["headers"] if k == b"x-admin-token"), None)
+        if not is_admin(token):
+            response = JSONResponse({"detail": f"Profiling requires a valid {ADMIN_TOKEN_HEADER}"}, status_code=403)
+            await response(scope, receive, send)
+            return
+
+        request = ProfileRequest(f"{scope['method']} {scope['path']}", mode)
+        ctx_token = _requested.set(request)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and request.profile_id is not None:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER.lower().encode("latin-1"), request.profile_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _requested.reset(ctx_token)
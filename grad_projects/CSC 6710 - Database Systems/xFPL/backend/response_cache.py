@@ -0,0 +1,323 @@
+# backend/response_cache.py
+
+"""
+ETags and an in-process response cache for read endpoints.
+
+Endpoints whose output only changes when data is written (/teams, /standings,
+/epl-table, ...) are tagged with a data version: the highest data_version
+counter among the scopes they read (SECTION 9 of the schema). Writers bump
+those scopes in the same transaction as their change.
+
+- If-None-Match equal to the current tag -> 304, straight from memory.
+- Otherwise the body is served from the cache if it was built at the
+  current version, or built once and cached. Requests that miss at the
+  same moment (everyone refreshing /standings right after a simulate)
+  share that one build instead of each running the aggregation.
+
+The counters are loaded from data_version once and then kept in memory,
+updated as this process writes and as other workers' writes are announced
+(invalidation.py), so neither path touches Postgres.
+
+Bodies are encoded with fast_json, and large ones are cached gzipped too,
+so a hit never re-compresses.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+import fast_json
+import metrics
+from db import get_conn
+
+# data_version scopes
+GLOBAL = "global"
+FANTASY_TEAM = "fantasy_team"
+
+CACHE_MAX_ENTRIES = 1024
+
+# Clients may keep a copy but must revalidate it (If-None-Match) before use
+CACHE_CONTROL = "no-cache"
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+# body, gzipped body (None if small), extra headers
+CacheEntry = Tuple[bytes, Optional[bytes], Dict[str, str]]
+
+
+def gw_scope(gw_code: str) -> str:
+    return "gw:" + gw_code.strip()
+
+
+def league_scope(league_id: int) -> str:
+    return f"league:{league_id}"
+
+
+def bump_versions(cur, *scopes: str) -> List[Dict]:
+    """
+    Bump `scopes` inside the writer's transaction. Pass the returned rows to
+    data_versions.apply() after the commit, never before: a reader that sees
+    the new version must also see the new data.
+    """
+    cur.execute("SELECT scope, version FROM bump_data_version(VARIADIC %s)", (list(scopes),))
+    return cur.fetchall()
+
+
+class DataVersions:
+    """This process's copy of the data_version table."""
+
+    def __init__(self, conn_factory: Callable = get_conn):
+        self._conn_factory = conn_factory
+        self._versions: Dict[str, int] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self, conn) -> None:
+        with conn.cursor() as cur:
+            cur.execute("SELECT scope, version FROM data_version")
+            rows = cur.fetchall()
+        self.apply(rows)
+        self._loaded = True
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        conn = self._conn_factory()
+        try:
+            self.load(conn)
+        finally:
+            conn.close()
+
+    def apply(self, rows: Iterable[Dict]) -> None:
+        """Merge committed (scope, version) rows; versions only move forward."""
+        with self._lock:
+            for r in rows:
+                if r["version"] > self._versions.get(r["scope"], 0):
+                    self._versions[r["scope"]] = r["version"]
+
+    def current(self, *scopes: str) -> int:
+        """Version of data that depends on `scopes` (and on the global scope)."""
+        self._ensure_loaded()
+        with self._lock:
+            return max(self._versions.get(s, 0) for s in (GLOBAL,) + scopes)
+
+    def through(self, gw_code: str, *scopes: str) -> int:
+        """
+        Version of cumulative data up to and including gw_code (tables,
+        standings). Gameweek codes are zero-padded (GW01..GW38), so they
+        compare in game order.
+        """
+        self._ensure_loaded()
+        last = gw_scope(gw_code)
+        with self._lock:
+            gw_versions = [
+                v for s, v in self._versions.items()
+                if s.startswith("gw:") and s <= last
+            ]
+            return max([self._versions.get(s, 0) for s in (GLOBAL,) + scopes] + gw_versions)
+
+    def latest(self) -> int:
+        """Version of data that depends on every gameweek (e.g. the first open one)."""
+        self._ensure_loaded()
+        with self._lock:
+            return max(self._versions.values(), default=0)
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    At most one call per key at a time: callers arriving while it runs wait
+    and get its result (or its exception) instead of running it again.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Any, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return (result, shared); shared is True if another caller computed it."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+
+class CacheStats:
+    """Per-route counters for cached_json: how each request was answered."""
+
+    OUTCOMES = ("not_modified", "hit", "coalesced", "built", "error")
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._counts.get(route)
+            if counts is None:
+                counts = self._counts[route] = dict.fromkeys(self.OUTCOMES, 0)
+            counts[outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Counts per route plus hit_ratio: the share of requests answered
+        without running the query (304, cache hit, or a shared build).
+        """
+        with self._lock:
+            routes = {r: dict(c) for r, c in self._counts.items()}
+        total = dict.fromkeys(self.OUTCOMES, 0)
+        for counts in routes.values():
+            for k in self.OUTCOMES:
+                total[k] += counts[k]
+        routes["_total"] = total
+        for counts in routes.values():
+            requests = sum(counts.values())
+            saved = counts["not_modified"] + counts["hit"] + counts["coalesced"]
+            counts["requests"] = requests
+            counts["hit_ratio"] = round(saved / requests, 4) if requests else None
+        return routes
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def render_prometheus(self) -> List[str]:
+        name = "xfpl_response_cache_requests_total"
+        lines = [
+            f"# HELP {name} Cached GET requests by how they were answered.",
+            f"# TYPE {name} counter",
+        ]
+        with self._lock:
+            for route, counts in sorted(self._counts.items()):
+                for outcome, n in counts.items():
+                    lines.append(f'{name}{{route="{route}",outcome="{outcome}"}} {n}')
+        return lines
+
+
+class ResponseCache:
+    """LRU of encoded JSON bodies; an entry only serves the version it was built at."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[int, CacheEntry]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey, version: int) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: CacheKey, version: int, entry: CacheEntry) -> None:
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current[0] > version:
+                return
+            self._entries[key] = (version, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+data_versions = DataVersions()
+response_cache = ResponseCache()
+single_flight = SingleFlight()
+cache_stats = CacheStats()
+metrics.add_collector(cache_stats.render_prometheus)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """The tag in If-None-Match that `etag` or its gzip variant matches, if any."""
+    if not if_none_match:
+        return None
+    variants = (etag, fast_json.gzip_etag(etag))
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == "*":
+            return etag
+        if tag in variants:
+            return tag
+    return None
+
+
+def cached_json(request: Request, version: int, build: Callable[[Response], Any]) -> Response:
+    """
+    Respond to a GET with build()'s result as of `version`.
+
+    `version` must be read before building, so a body is never cached under
+    a version newer than its data. build() gets a Response to set extra
+    headers on (e.g. X-Next-Cursor); those are cached with the body. It may
+    return the JSON already encoded (bytes, e.g. fast_json.encode_rows).
+    Concurrent misses for the same key and version share one build().
+    """
+    route = getattr(request.scope.get("route"), "path", request.url.path)
+    etag = f'"v{version}"'
+    cache_headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    matched = _etag_matches(request.headers.get("if-none-match"), etag)
+    if matched is not None:
+        cache_stats.record(route, "not_modified")
+        # The 304 names the variant (identity or gzip) the client holds
+        return Response(status_code=304, headers={**cache_headers, "ETag": matched})
+
+    key: CacheKey = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    hit = response_cache.get(key, version)
+    if hit is not None:
+        cache_stats.record(route, "hit")
+        body, gzipped, headers = hit
+    else:
+        def build_entry() -> CacheEntry:
+            # A flight that just finished may have filled the entry already
+            entry = response_cache.get(key, version)
+            if entry is not None:
+                return entry
+            scratch = Response()
+            data = build(scratch)
+            body = data if isinstance(data, bytes) else fast_json.dumps(data)
+            headers = fast_json.response_headers(scratch)
+            entry = (body, fast_json.compress(body), headers)
+            response_cache.put(key, version, entry)
+            return entry
+
+        try:
+            (body, gzipped, headers), shared = single_flight.do((key, version), build_entry)
+        except Exception:
+            cache_stats.record(route, "error")
+            raise
+        cache_stats.record(route, "coalesced" if shared else "built")
+
+    return fast_json.json_response(request, body, {**headers, **cache_headers}, gzipped)
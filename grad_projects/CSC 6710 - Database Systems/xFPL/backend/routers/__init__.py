@@ -0,0 +1,20 @@
+# backend/routers/__init__.py
+
+"""
+The API routes, one module per area; main.py includes them all.
+
+Routers import their heavy dependencies (simulate_gameweek and numpy,
+ai_recommendations) inside the handlers that need them, so starting a
+worker only pays for FastAPI, psycopg2 and these modules; main.warmup()
+loads the rest in the background.
+"""
+
+from fastapi import APIRouter
+from fastapi.routing import APIRoute
+
+import profiling
+
+
+def new_router() -> APIRouter:
+    # With profiling on (ADMIN_TOKEN), every handler gets the ?profile=1 hook
+    return APIRouter(route_class=profiling.ProfiledRoute if profiling.enabled else APIRoute)
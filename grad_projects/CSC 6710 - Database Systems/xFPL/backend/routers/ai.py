@@ -0,0 +1,174 @@
+# backend/routers/ai.py
+
+"""AI transfer recommendations and fixture difficulty ratings."""
+
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Query, Request
+
+from db import get_conn
+from response_cache import cached_json, data_versions
+from routers import new_router
+
+router = new_router()
+
+
+def _ai_module():
+    """ai_recommendations, imported on first use; None if it is missing (optional module)."""
+    try:
+        import ai_recommendations
+    except ImportError:
+        return None
+    return ai_recommendations
+
+
+def _team_fdr() -> Dict[str, int]:
+    ai = _ai_module()
+    return ai.TEAM_FDR if ai is not None else {}
+
+
+@router.get("/ai/recommendations/{ft_id}/{gw_code}")
+def ai_transfer_recommendations(
+    ft_id: int,
+    gw_code: str,
+    position: Optional[str] = Query(None, description="Filter by position: GK, DEF, MID, FWD"),
+    budget: Optional[float] = Query(None, description="Max player cost"),
+    limit: int = Query(10, ge=1, le=25)
+):
+    """
+    Get AI-powered transfer recommendations based on:
+    - Player form (last 5 GWs)
+    - Fixture difficulty rating (FDR)
+    - Value (points per million)
+    - Team constraints
+    """
+    ai = _ai_module()
+    if ai is None:
+        raise HTTPException(
+            status_code=501,
+            detail="AI recommendations module not available. Please ensure ai_recommendations.py is present."
+        )
+    
+    try:
+        result = ai.get_transfer_recommendations(ft_id, gw_code, position, budget, limit)
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/ai/sell-suggestions/{ft_id}/{gw_code}")
+def ai_sell_suggestions(
+    ft_id: int,
+    gw_code: str,
+    limit: int = Query(5, ge=1, le=11)
+):
+    """
+    Get suggestions for players to transfer out based on:
+    - Poor recent form
+    - Difficult upcoming fixtures
+    - Better value alternatives available
+    """
+    ai = _ai_module()
+    if ai is None:
+        raise HTTPException(
+            status_code=501,
+            detail="AI recommendations module not available."
+        )
+    
+    try:
+        return ai.get_players_to_sell(ft_id, gw_code, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/fdr")
+def get_all_fdr(request: Request):
+    """
+    Get fixture difficulty ratings for all teams.
+    1 = Very Easy, 5 = Very Hard
+    """
+    return cached_json(request, data_versions.current(), lambda response: _all_fdr())
+
+
+def _all_fdr():
+    team_fdr = _team_fdr()
+    if not team_fdr:
+        # Default FDR if AI module not available
+        return {
+            "ARS": 5, "MCI": 5,
+            "AVL": 4, "CHE": 4, "CRY": 4, "SUN": 3, 
+            "BHA": 3, "MUN": 3, "LIV": 3, "EVE": 2, "TOT": 3, "NEW": 3, "BRE": 3, "BOU": 3,
+            "FUL": 2, "NFO": 2, "LEE": 2, "WHU": 2, 
+            "BUR": 1, "WOL": 1,
+        }
+    return team_fdr
+
+
+@router.get("/fdr/fixtures/{team_code}/{gw_code}")
+def get_team_upcoming_fdr(
+    team_code: str,
+    gw_code: str,
+    lookahead: int = Query(5, ge=1, le=10)
+):
+    """
+    Get upcoming fixtures with FDR for a specific team.
+    """
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT game_no FROM gameweek WHERE code = %s", (gw_code,))
+                row = cur.fetchone()
+                if not row:
+                    raise HTTPException(status_code=404, detail="Gameweek not found")
+                current_gw_no = row["game_no"]
+                
+                cur.execute(
+                    """
+                    SELECT 
+                        g.code as gw_code,
+                        g.game_no,
+                        m.hometeam_code,
+                        m.awayteam_code
+                    FROM match m
+                    JOIN gameweek g ON g.code = m.gw_code
+                    WHERE (UPPER(m.hometeam_code) = %s OR UPPER(m.awayteam_code) = %s)
+                      AND g.game_no >= %s
+                      AND m.home_goals IS NULL
+                    ORDER BY g.game_no
+                    LIMIT %s
+                    """,
+                    (team_code.upper(), team_code.upper(), current_gw_no, lookahead)
+                )
+                fixtures = cur.fetchall()
+                
+                fdr_map = _team_fdr() or {
+                    "MCI": 5, "ARS": 5, "LIV": 5, "CHE": 4, "MUN": 4, "TOT": 4
+                }
+                
+                result = []
+                for f in fixtures:
+                    is_home = f["hometeam_code"].upper() == team_code.upper()
+                    opponent = f["awayteam_code"] if is_home else f["hometeam_code"]
+                    base_fdr = fdr_map.get(opponent.upper(), 3)
+                    # Home advantage
+                    fdr = max(1, base_fdr - 1) if is_home else min(5, base_fdr)
+                    
+                    result.append({
+                        "gw_code": f["gw_code"],
+                        "gw_no": f["game_no"],
+                        "opponent": opponent,
+                        "is_home": is_home,
+                        "fdr": fdr,
+                        "difficulty": ["", "Very Easy", "Easy", "Medium", "Hard", "Very Hard"][fdr]
+                    })
+                
+                return {
+                    "team_code": team_code.upper(),
+                    "fixtures": result,
+                    "avg_fdr": round(sum(f["fdr"] for f in result) / len(result), 1) if result else 3.0
+                }
+    finally:
+        conn.close()
@@ -0,0 +1,111 @@
+# backend/routers/captain.py
+
+"""Captain management and chemistry bonus."""
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from db import get_conn
+from routers import new_router
+
+router = new_router()
+
+
+class CaptainChange(BaseModel):
+    ft_id: int
+    gw_code: str
+    captain_id: int
+    vice_captain_id: int
+
+
+@router.post("/captain")
+def change_captain(payload: CaptainChange):
+    """
+    Change captain and vice-captain for a gameweek.
+    Only allowed if the gameweek hasn't been simulated yet.
+    """
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                # Check if GW is simulated (or being simulated)
+                cur.execute("SELECT status FROM gameweek WHERE code = %s", (payload.gw_code,))
+                row = cur.fetchone()
+                if row and row["status"] != "pending":
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Cannot change captain: this gameweek has already been simulated."
+                    )
+                
+                # Verify both players are in the lineup
+                cur.execute(
+                    """
+                    SELECT player_id FROM v_lineup_slot
+                    WHERE ft_id = %s AND gw_code = %s AND slot BETWEEN 1 AND 11
+                    """,
+                    (payload.ft_id, payload.gw_code)
+                )
+                lineup_ids = [r["player_id"] for r in cur.fetchall()]
+                
+                if payload.captain_id not in lineup_ids:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Captain must be in your starting XI."
+                    )
+                if payload.vice_captain_id not in lineup_ids:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Vice-captain must be in your starting XI."
+                    )
+                if payload.captain_id == payload.vice_captain_id:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Captain and vice-captain must be different players."
+                    )
+                
+                # Set new captain and vice-captain
+                cur.execute(
+                    """
+                    UPDATE fantasy_lineup
+                    SET captain_slot = array_position(player_ids, %s::bigint),
+                        vice_captain_slot = array_position(player_ids, %s::bigint)
+                    WHERE ft_id = %s AND gw_code = %s
+                    """,
+                    (payload.captain_id, payload.vice_captain_id, payload.ft_id, payload.gw_code)
+                )
+                
+    finally:
+        conn.close()
+    
+    return {
+        "status": "ok",
+        "captain_id": payload.captain_id,
+        "vice_captain_id": payload.vice_captain_id
+    }
+
+
+@router.get("/chemistry-bonus/{ft_id}/{gw_code}")
+def get_chemistry_bonus(ft_id: int, gw_code: str):
+    """
+    Get chemistry bonus for a fantasy team in a specific gameweek.
+    Returns 0 if no bonus earned.
+    """
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                # CHAR(4) comparison ignores padding; comparing the column
+                # itself (not TRIM(gw_code)) lets the planner pick one partition
+                cur.execute(
+                    """
+                    SELECT points FROM chemistry_bonus
+                    WHERE ft_id = %s AND gw_code = %s
+                    """,
+                    (ft_id, gw_code.strip())
+                )
+                row = cur.fetchone()
+                if row:
+                    return {"ft_id": ft_id, "gw_code": gw_code, "points": row["points"]}
+                return {"ft_id": ft_id, "gw_code": gw_code, "points": 0}
+    finally:
+        conn.close()
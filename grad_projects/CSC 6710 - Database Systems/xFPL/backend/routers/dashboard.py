@@ -0,0 +1,107 @@
+# backend/routers/dashboard.py
+
+"""Team dashboard (one round trip for the team page)."""
+
+from db import get_conn
+from routers import new_router
+from routers.fantasy_teams import _points_breakdown
+from routers.gameweeks import _gameweek_status
+from routers.transfers import MAX_TRANSFERS_PER_GW
+
+router = new_router()
+
+
+@router.get("/dashboard/{ft_id}/{gw_code}")
+def get_dashboard(ft_id: int, gw_code: str):
+    """
+    Everything the team page needs for one gameweek, from one connection
+    and two queries: the lineup, then transfers + gameweek status +
+    chemistry bonus. Each part has the same shape as its own endpoint
+    (/lineup, /points/breakdown, /transfers, /transfers/remaining,
+    /gameweek-status, /chemistry-bonus).
+    """
+    gw_code = gw_code.strip()
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT
+                        fl.slot,
+                        fl.player_id,
+                        p.first_name,
+                        p.last_name,
+                        p.position,
+                        p.team_code,
+                        p.cost,
+                        fl.captain,
+                        fl.vice_captain,
+                        COALESCE(pp.points, 0) as points
+                    FROM v_lineup_slot fl
+                    JOIN player p ON p.id = fl.player_id
+                    LEFT JOIN player_points pp ON pp.player_id = fl.player_id AND pp.gw_code = fl.gw_code
+                    WHERE fl.ft_id = %s
+                      AND fl.gw_code = %s
+                    ORDER BY fl.slot
+                    """,
+                    (ft_id, gw_code),
+                )
+                lineup = cur.fetchall()
+
+                cur.execute(
+                    """
+                    SELECT
+                        g.status,
+                        g.simulated_at,
+                        g.matches_total,
+                        g.matches_played,
+                        COALESCE(cb.points, 0) AS chemistry_bonus,
+                        COALESCE(t.transfers, '[]'::json) AS transfers
+                    FROM (VALUES (%(gw_code)s::bpchar)) AS k(gw_code)
+                    LEFT JOIN gameweek g ON g.code = k.gw_code
+                    LEFT JOIN chemistry_bonus cb ON cb.ft_id = %(ft_id)s AND cb.gw_code = %(gw_code)s
+                    CROSS JOIN (
+                        SELECT json_agg(x ORDER BY x.sub_no) AS transfers
+                        FROM (
+                            SELECT
+                                t.sub_no,
+                                t.player_out_id,
+                                po.first_name as out_first_name,
+                                po.last_name as out_last_name,
+                                po.position as out_position,
+                                t.player_in_id,
+                                pi.first_name as in_first_name,
+                                pi.last_name as in_last_name,
+                                pi.position as in_position
+                            FROM transfer t
+                            JOIN player po ON po.id = t.player_out_id
+                            JOIN player pi ON pi.id = t.player_in_id
+                            WHERE t.ft_id = %(ft_id)s AND t.gw_code = %(gw_code)s
+                        ) x
+                    ) t
+                    """,
+                    {"ft_id": ft_id, "gw_code": gw_code},
+                )
+                row = cur.fetchone()
+    finally:
+        conn.close()
+
+    used = len(row["transfers"])
+    return {
+        "ft_id": ft_id,
+        "gw_code": gw_code,
+        "lineup": lineup,
+        "points": _points_breakdown(
+            ft_id, gw_code, [p for p in lineup if p["slot"] <= 11], row["chemistry_bonus"]
+        ),
+        "transfers": row["transfers"],
+        "transfers_remaining": {
+            "ft_id": ft_id,
+            "gw_code": gw_code,
+            "used": used,
+            "remaining": MAX_TRANSFERS_PER_GW - used,
+        },
+        "gameweek_status": _gameweek_status(gw_code, row if row["status"] else None),
+        "chemistry_bonus": {"ft_id": ft_id, "gw_code": gw_code, "points": row["chemistry_bonus"]},
+    }
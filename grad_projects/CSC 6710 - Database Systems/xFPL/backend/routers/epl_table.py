@@ -0,0 +1,132 @@
+# backend/routers/epl_table.py
+
+"""Real EPL table (based on match data)."""
+
+from collections import defaultdict
+
+from fastapi import HTTPException, Request
+
+from db import get_conn
+from response_cache import cached_json, data_versions
+from routers import new_router
+
+router = new_router()
+
+
+@router.get("/epl-table/{gw_code}")
+def epl_table(gw_code: str, request: Request):
+    """
+    Standings of *real* teams based on matches up to and including gw_code.
+    Uses 3 pts win / 1 draw / 0 loss, standard GD / GF ordering.
+    prev_position is the club's position after the previous gameweek.
+    """
+    return cached_json(request, data_versions.through(gw_code), lambda response: _epl_table(gw_code))
+
+
+def _epl_table(gw_code: str):
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            # Written by simulate_matches for every simulated gameweek
+            cur.execute(
+                """
+                SELECT team_code, played, wins, draws, losses, gf, ga,
+                       gf - ga AS gd, points, position, prev_position
+                FROM epl_table_snapshot
+                WHERE gw_code = %s
+                ORDER BY position
+                """,
+                (gw_code.strip(),),
+            )
+            table = cur.fetchall()
+            if table:
+                return table
+
+            # No snapshot (e.g. results loaded rather than simulated): add up the matches
+            cur.execute("SELECT game_no FROM gameweek WHERE code = %s", (gw_code,))
+            row = cur.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Gameweek not found")
+            target_no = row["game_no"]
+
+            cur.execute(
+                """
+                SELECT
+                    m.hometeam_code,
+                    m.awayteam_code,
+                    m.home_goals,
+                    m.away_goals
+                FROM match m
+                JOIN gameweek g ON g.code = m.gw_code
+                WHERE g.game_no <= %s
+                  AND m.home_goals IS NOT NULL
+                  AND m.away_goals IS NOT NULL
+                """,
+                (target_no,),
+            )
+            rows = cur.fetchall()
+
+    stats = defaultdict(lambda: {
+        "team_code": "",
+        "played": 0,
+        "wins": 0,
+        "draws": 0,
+        "losses": 0,
+        "gf": 0,
+        "ga": 0,
+    })
+
+    for r in rows:
+        h = r["hometeam_code"]
+        a = r["awayteam_code"]
+        hg = int(r["home_goals"])
+        ag = int(r["away_goals"])
+
+        # home side
+        sh = stats[h]
+        sh["team_code"] = h
+        sh["played"] += 1
+        sh["gf"] += hg
+        sh["ga"] += ag
+        if hg > ag:
+            sh["wins"] += 1
+        elif hg == ag:
+            sh["draws"] += 1
+        else:
+            sh["losses"] += 1
+
+        # away side
+        sa = stats[a]
+        sa["team_code"] = a
+        sa["played"] += 1
+        sa["gf"] += ag
+        sa["ga"] += hg
+        if ag > hg:
+            sa["wins"] += 1
+        elif ag == hg:
+            sa["draws"] += 1
+        else:
+            sa["losses"] += 1
+
+    table = []
+    for t, s in stats.items():
+        gd = s["gf"] - s["ga"]
+        pts = s["wins"] * 3 + s["draws"]
+        table.append({
+            "team_code": s["team_code"],
+            "played": s["played"],
+            "wins": s["wins"],
+            "draws": s["draws"],
+            "losses": s["losses"],
+            "gf": s["gf"],
+            "ga": s["ga"],
+            "gd": gd,
+            "points": pts,
+        })
+
+    # sort by points, then GD, then GF, then team_code
+    table.sort(key=lambda x: (-x["points"], -x["gd"], -x["gf"], x["team_code"]))
+    for i, t in enumerate(table, start=1):
+        t["position"] = i
+        t["prev_position"] = None
+    return table
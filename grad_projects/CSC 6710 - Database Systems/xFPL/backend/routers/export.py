@@ -0,0 +1,54 @@
+# backend/routers/export.py
+
+"""Season data export for analysts: whole tables streamed as CSV or NDJSON."""
+
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from db import get_conn
+from export import CSV, MEDIA_TYPES, export_query, stream_export
+from routers import new_router
+
+router = new_router()
+
+
+@router.get("/export/{dataset}")
+def export_dataset(
+    dataset: str,
+    format: str = Query(CSV, description="csv or ndjson"),
+    gw_code: Optional[str] = Query(None, description="Only this gameweek"),
+):
+    """
+    Stream player_points, lineups, transfers, standings or matches.
+
+    Rows are fetched through a server-side cursor in chunks and sent as they
+    are encoded, so a full-season export starts at once and runs in constant
+    memory. Rows are in no particular order (see export.py).
+    """
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+    try:
+        sql, params = export_query(dataset, gw_code)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    conn = get_conn()
+    try:
+        if gw_code is not None:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1 FROM gameweek WHERE code = %s", (gw_code.strip(),))
+                    if not cur.fetchone():
+                        raise HTTPException(status_code=404, detail="Gameweek not found")
+    except Exception:
+        conn.close()
+        raise
+
+    filename = f"{dataset}-{gw_code.strip()}" if gw_code else dataset
+    return StreamingResponse(
+        stream_export(conn, sql, params, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
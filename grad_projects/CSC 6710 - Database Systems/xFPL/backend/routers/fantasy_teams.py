@@ -0,0 +1,474 @@
+# backend/routers/fantasy_teams.py
+
+"""Fantasy teams: creation (constraints enforced here), lineups, points, simulate."""
+
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Query, Request, Response
+from psycopg2.errors import UniqueViolation
+from pydantic import BaseModel
+
+from db import get_conn
+from metrics import simulate_phase
+from pagination import finish_page, seek
+from player_search import get_players
+from response_cache import FANTASY_TEAM, bump_versions, cached_json, data_versions, gw_scope
+from squad import insert_team, validate_squad
+from routers import new_router
+
+router = new_router()
+
+
+class TeamCreate(BaseModel):
+    user_id: int
+    name: str
+    gw_code: str
+    player_ids: List[int]
+    captain_id: int
+    vice_captain_id: int
+
+
+# =====================================================
+# FANTASY TEAM CREATION (constraints enforced here)
+# =====================================================
+
+@router.post("/fantasy-teams")
+def create_fantasy_team(payload: TeamCreate):
+    """
+    Create a fantasy team + its initial GW lineup with constraints:
+    - exactly 11 players (no bench yet)
+    - budget <= 100.0M
+    - max 2 players from the same real team
+    - exactly 1 goalkeeper
+    - at least 3 defenders
+    - at least 2 midfielders
+    - at least 1 forward
+    - captain and vice-captain must be in that XI and distinct
+    - each manager (user_id) may own at most 1 fantasy team
+    """
+    if len(payload.player_ids) != 11:
+        raise HTTPException(
+            status_code=400,
+            detail="You must select exactly 11 players.",
+        )
+
+    # de-dup while preserving order
+    unique_players = list(dict.fromkeys(payload.player_ids))
+    if len(unique_players) != 11:
+        raise HTTPException(
+            status_code=400,
+            detail="Duplicate players in selection.",
+        )
+
+    # captain & vice must be in the XI and distinct
+    if payload.captain_id not in unique_players:
+        raise HTTPException(
+            status_code=400,
+            detail="Captain must be one of the selected XI.",
+        )
+    if payload.vice_captain_id not in unique_players:
+        raise HTTPException(
+            status_code=400,
+            detail="Vice-captain must be one of the selected XI.",
+        )
+    if payload.captain_id == payload.vice_captain_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Captain and vice-captain must be different players.",
+        )
+
+    # Player meta comes from the in-memory player index, so the only
+    # round trip is the INSERT that creates the team and its XI.
+    players = get_players(get_conn, unique_players)
+    if len(players) != len(unique_players):
+        missing = [pid for pid in unique_players if pid not in players]
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown player IDs: {missing}",
+        )
+
+    try:
+        squad = validate_squad(list(players.values()))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    conn = get_conn()
+    try:
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    team_row = insert_team(
+                        cur,
+                        payload.user_id,
+                        payload.name,
+                        payload.gw_code,
+                        unique_players,
+                        payload.captain_id,
+                        payload.vice_captain_id,
+                    )
+        except UniqueViolation:
+            # Rule 0: one fantasy team per manager (fantasy_team.user_id is UNIQUE)
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT id, name FROM fantasy_team WHERE user_id = %s",
+                        (payload.user_id,),
+                    )
+                    existing = cur.fetchone()
+            if not existing:
+                raise
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"Manager already has a fantasy team ('{existing['name']}'). "
+                    "Each manager may create only one team."
+                ),
+            )
+    finally:
+        conn.close()
+
+    data_versions.apply([{"scope": FANTASY_TEAM, "version": team_row.pop("data_version")}])
+    return {
+        "fantasy_team": team_row,
+        "gw_code": payload.gw_code,
+        "players": unique_players,
+        "total_cost": squad["total_cost"],
+        "formation": squad["formation"],
+    }
+
+
+# =====================================================
+# EXISTING FANTASY ENDPOINTS
+# =====================================================
+
+@router.get("/fantasy-teams")
+def list_fantasy_teams(
+    response: Response,
+    user_id: Optional[int] = Query(None),
+    limit: int = Query(500, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+):
+    where_sql, params = seek([("ft.id", False)], "fantasy-teams", cursor)
+    if user_id is not None:
+        where_sql += " AND ft.user_id = %s"
+        params = params + [user_id]
+
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT
+                    ft.id,
+                    ft.name,
+                    ft.user_id,
+                    COALESCE(u.username, 'Unknown') AS username
+                FROM fantasy_team ft
+                LEFT JOIN app_user u ON u.id = ft.user_id
+                WHERE {where_sql}
+                ORDER BY ft.id
+                LIMIT %s;
+                """,
+                params + [limit + 1],
+            )
+            rows = cur.fetchall()
+    conn.close()
+    return finish_page(rows, limit, response, "fantasy-teams", lambda r: [r["id"]])
+
+
+@router.get("/gameweeks")
+def list_gameweeks(request: Request):
+    return cached_json(request, data_versions.current(), lambda response: _list_gameweeks())
+
+
+def _list_gameweeks():
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT code, game_no, start_time, end_time
+                FROM gameweek
+                ORDER BY game_no;
+                """
+            )
+            rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+@router.get("/lineup/{ft_id}/{gw_code}")
+def get_lineup(ft_id: int, gw_code: str):
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT
+                    fl.slot,
+                    fl.player_id,
+                    p.first_name,
+                    p.last_name,
+                    p.position,
+                    p.team_code,
+                    p.cost,
+                    fl.captain,
+                    fl.vice_captain,
+                    COALESCE(pp.points, 0) as points
+                FROM v_lineup_slot fl
+                JOIN player p ON p.id = fl.player_id
+                LEFT JOIN player_points pp ON pp.player_id = fl.player_id AND pp.gw_code = fl.gw_code
+                WHERE fl.ft_id = %s
+                  AND fl.gw_code = %s
+                ORDER BY fl.slot;
+                """,
+                (ft_id, gw_code),
+            )
+            rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def _carry_lineups(cur, from_gw: str, to_gw: str) -> int:
+    """Copy every from_gw lineup to to_gw unless the team already has one; returns teams copied."""
+    cur.execute(
+        """
+        INSERT INTO fantasy_lineup (ft_id, gw_code, player_ids, captain_slot, vice_captain_slot)
+        SELECT ft_id, %s, player_ids, captain_slot, vice_captain_slot
+        FROM fantasy_lineup
+        WHERE gw_code = %s
+        ON CONFLICT (ft_id, gw_code) DO NOTHING
+        """,
+        (to_gw, from_gw)
+    )
+    return cur.rowcount
+
+
+@router.post("/generate/{gw_code}")
+def generate_lineups(gw_code: str):
+    """
+    Copy lineups from previous GW to current GW for all teams.
+    This should be called before simulation to carry forward lineups.
+    """
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                # Get previous GW
+                cur.execute("SELECT game_no FROM gameweek WHERE code = %s", (gw_code,))
+                row = cur.fetchone()
+                if not row:
+                    raise HTTPException(status_code=404, detail="Gameweek not found")
+                current_no = row["game_no"]
+                
+                if current_no <= 1:
+                    # First gameweek - no previous to copy from
+                    return {"status": "ok", "message": "First gameweek - no lineup to copy", "generated_for": gw_code}
+                
+                cur.execute("SELECT code FROM gameweek WHERE game_no = %s", (current_no - 1,))
+                prev_row = cur.fetchone()
+                if not prev_row:
+                    raise HTTPException(status_code=400, detail="No previous gameweek found")
+                prev_gw = prev_row["code"]
+                
+                # Copy every previous lineup; teams that already have one keep it
+                copied = _carry_lineups(cur, prev_gw, gw_code)
+                bumped = bump_versions(cur, gw_scope(gw_code)) if copied else []
+                    
+    finally:
+        conn.close()
+    data_versions.apply(bumped)
+    
+    return {"status": "ok", "generated_for": gw_code, "teams_copied": copied}
+
+
+@router.post("/simulate/{gw_code}")
+def simulate(gw_code: str):
+    """
+    Simulate matches and assign points for a gameweek.
+    Also copies lineups forward to next GW if they don't exist.
+    """
+    # numpy and the match model load with the first simulate, not at startup
+    from simulate_gameweek import simulate_matches, assign_player_points
+
+    try:
+        # First, ensure lineups exist for this GW (copy from previous if needed)
+        with simulate_phase("lineups"):
+            generate_lineups(gw_code)
+        
+        # Then simulate matches
+        with simulate_phase("matches"):
+            simulate_matches(gw_code)
+        assign_player_points(gw_code)
+        
+        # Copy lineups to next GW for continuity
+        conn = get_conn()
+        try:
+            with conn, simulate_phase("carry_forward"):
+                with conn.cursor() as cur:
+                    cur.execute("SELECT game_no FROM gameweek WHERE code = %s", (gw_code,))
+                    row = cur.fetchone()
+                    if row:
+                        current_no = row["game_no"]
+                        cur.execute("SELECT code FROM gameweek WHERE game_no = %s", (current_no + 1,))
+                        next_row = cur.fetchone()
+                        if next_row:
+                            # Copy lineups to next GW
+                            _carry_lineups(cur, gw_code, next_row["code"])
+        finally:
+            conn.close()
+            
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "simulated", "gw_code": gw_code}
+
+
+@router.get("/matches/{gw_code}")
+def get_matches(gw_code: str, request: Request):
+    return cached_json(
+        request, data_versions.current(gw_scope(gw_code)), lambda response: _get_matches(gw_code)
+    )
+
+
+def _get_matches(gw_code: str):
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT
+                    hometeam_code,
+                    awayteam_code,
+                    home_goals,
+                    away_goals
+                FROM match
+                WHERE gw_code = %s
+                ORDER BY id;
+                """,
+                (gw_code,),
+            )
+            rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+@router.get("/points/fantasy/{ft_id}/{gw_code}")
+def get_fantasy_points(ft_id: int, gw_code: str):
+    """
+    Points for a single fantasy team in a single GW (starting XI only).
+    Includes chemistry bonus via v_fantasy_standings.
+    """
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT gw_total_points
+                FROM v_fantasy_standings
+                WHERE ft_id = %s AND gw_code = %s
+                """,
+                (ft_id, gw_code),
+            )
+            row = cur.fetchone()
+            total = row["gw_total_points"] if row and row["gw_total_points"] is not None else 0
+    conn.close()
+    return {"fantasy_team": ft_id, "gw_code": gw_code, "total_points": total}
+
+
+def _points_breakdown(ft_id: int, gw_code: str, starters: List[Dict], chemistry_bonus: int) -> Dict:
+    """Per-player and total points for a starting XI (captain doubled, plus chemistry bonus)."""
+    breakdown = []
+    total_raw = 0
+    captain_bonus = 0
+
+    for player in starters:
+        raw_pts = int(player["points"])
+        is_captain = player["captain"]
+        is_vc = player["vice_captain"]
+
+        # Captain gets double points
+        final_pts = raw_pts * 2 if is_captain else raw_pts
+        if is_captain:
+            captain_bonus = raw_pts  # The bonus from doubling
+
+        total_raw += raw_pts
+
+        breakdown.append({
+            "slot": player["slot"],
+            "player_id": player["player_id"],
+            "name": f"{player['first_name']} {player['last_name']}",
+            "position": player["position"].strip().upper(),
+            "team_code": player["team_code"],
+            "cost": float(player["cost"]),
+            "raw_points": raw_pts,
+            "final_points": final_pts,
+            "is_captain": is_captain,
+            "is_vice_captain": is_vc,
+        })
+
+    total_with_captain = total_raw + captain_bonus
+    total_with_bonus = total_with_captain + chemistry_bonus
+
+    return {
+        "ft_id": ft_id,
+        "gw_code": gw_code,
+        "players": breakdown,
+        "summary": {
+            "raw_total": total_raw,
+            "captain_bonus": captain_bonus,
+            "subtotal": total_with_captain,
+            "chemistry_bonus": chemistry_bonus,
+            "grand_total": total_with_bonus
+        }
+    }
+
+
+@router.get("/points/breakdown/{ft_id}/{gw_code}")
+def get_points_breakdown(ft_id: int, gw_code: str):
+    """
+    Get detailed points breakdown for each player in the starting XI.
+    Shows individual points and total with captain bonus.
+    """
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                # Get lineup with player info and points
+                cur.execute(
+                    """
+                    SELECT 
+                        fl.slot,
+                        fl.player_id,
+                        fl.captain,
+                        fl.vice_captain,
+                        p.first_name,
+                        p.last_name,
+                        p.position,
+                        p.team_code,
+                        p.cost,
+                        COALESCE(pp.points, 0) as points
+                    FROM v_lineup_slot fl
+                    JOIN player p ON p.id = fl.player_id
+                    LEFT JOIN player_points pp ON pp.player_id = fl.player_id AND pp.gw_code = fl.gw_code
+                    WHERE fl.ft_id = %s AND fl.gw_code = %s AND fl.slot BETWEEN 1 AND 11
+                    ORDER BY fl.slot
+                    """,
+                    (ft_id, gw_code)
+                )
+                lineup = cur.fetchall()
+                
+                # Get chemistry bonus
+                cur.execute(
+                    """
+                    SELECT COALESCE(points, 0) as bonus
+                    FROM chemistry_bonus
+                    WHERE ft_id = %s AND gw_code = %s
+                    """,
+                    (ft_id, gw_code.strip())
+                )
+                cb_row = cur.fetchone()
+                chemistry_bonus = cb_row["bonus"] if cb_row else 0
+                
+                return _points_breakdown(ft_id, gw_code, lineup, chemistry_bonus)
+    finally:
+        conn.close()
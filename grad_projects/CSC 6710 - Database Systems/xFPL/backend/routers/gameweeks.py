@@ -0,0 +1,229 @@
+# backend/routers/gameweeks.py
+
+"""Gameweek status, start gameweeks and captain updates."""
+
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel
+
+from db import get_conn
+from response_cache import cached_json, data_versions, gw_scope
+from routers import new_router
+
+router = new_router()
+
+
+class CaptainUpdate(BaseModel):
+    ft_id: int
+    gw_code: str
+    captain_id: int
+    vice_captain_id: int
+
+
+# Columns of gameweek that _gameweek_status reads
+GAMEWEEK_STATUS_COLUMNS = "status, simulated_at, matches_total, matches_played"
+
+
+def _gameweek_status(gw_code: str, row: Optional[Dict]) -> Dict:
+    """Status payload from a gameweek row (GAMEWEEK_STATUS_COLUMNS); None = unknown GW."""
+    row = row or {"status": "pending", "simulated_at": None, "matches_total": 0, "matches_played": 0}
+    return {
+        "gw_code": gw_code,
+        "status": row["status"],
+        "simulated_at": row["simulated_at"],
+        "total_matches": row["matches_total"],
+        "simulated_matches": row["matches_played"],
+        "is_simulated": row["status"] == "simulated",
+        "transfers_open": row["status"] == "pending"
+    }
+
+
+@router.get("/gameweek-status/{gw_code}")
+def get_gameweek_status(gw_code: str, request: Request):
+    """
+    Get the status of a gameweek - whether it's been simulated or not.
+    """
+    return cached_json(
+        request, data_versions.current(gw_scope(gw_code)), lambda response: _get_gameweek_status(gw_code)
+    )
+
+
+def _get_gameweek_status(gw_code: str):
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            # Maintained by simulate_matches (gameweek.status)
+            cur.execute(
+                f"SELECT {GAMEWEEK_STATUS_COLUMNS} FROM gameweek WHERE code = %s",
+                (gw_code,)
+            )
+            row = cur.fetchone()
+            
+    conn.close()
+    return _gameweek_status(gw_code, row)
+
+
+@router.get("/first-unsimulated-gw")
+def get_first_unsimulated_gw(request: Request):
+    """
+    Get the first gameweek that hasn't been simulated yet.
+    This is efficient - single query instead of scanning all GWs from frontend.
+    """
+    return cached_json(request, data_versions.latest(), lambda response: _first_unsimulated_gw())
+
+
+def _first_unsimulated_gw():
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            # Find the first GW where not all matches are simulated
+            cur.execute(
+                """
+                SELECT code, game_no
+                FROM gameweek
+                WHERE status <> 'simulated'
+                ORDER BY game_no
+                LIMIT 1
+                """
+            )
+            row = cur.fetchone()
+            
+            if not row:
+                # All gameweeks are simulated - return the last one
+                cur.execute(
+                    "SELECT code, game_no FROM gameweek ORDER BY game_no DESC LIMIT 1"
+                )
+                row = cur.fetchone()
+                if row:
+                    return {
+                        "gw_code": row["code"],
+                        "game_no": row["game_no"],
+                        "all_simulated": True
+                    }
+                return {"gw_code": None, "game_no": None, "all_simulated": True}
+            
+    conn.close()
+    return {
+        "gw_code": row["code"],
+        "game_no": row["game_no"],
+        "all_simulated": False
+    }
+
+
+@router.get("/available-start-gameweeks")
+def get_available_start_gameweeks(request: Request):
+    """
+    Get gameweeks that can be selected as starting gameweek for team creation.
+    Only returns unsimulated gameweeks (can't start a team in a past GW).
+    """
+    return cached_json(request, data_versions.latest(), lambda response: _available_start_gameweeks())
+
+
+def _available_start_gameweeks():
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            # Get all gameweeks not simulated (nor being simulated)
+            cur.execute(
+                """
+                SELECT code, game_no
+                FROM gameweek
+                WHERE status = 'pending'
+                ORDER BY game_no
+                """
+            )
+            rows = cur.fetchall()
+    conn.close()
+    return [{"code": r["code"], "game_no": r["game_no"]} for r in rows]
+
+
+@router.post("/update-captain")
+def update_captain(payload: CaptainUpdate):
+    """
+    Update captain and vice-captain for a fantasy team in a specific gameweek.
+    Only allowed if the gameweek hasn't been simulated yet.
+    """
+    if payload.captain_id == payload.vice_captain_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Captain and vice-captain must be different players."
+        )
+    
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                # Check if GW is simulated (or being simulated)
+                cur.execute("SELECT status FROM gameweek WHERE code = %s", (payload.gw_code,))
+                row = cur.fetchone()
+                if row and row["status"] != "pending":
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Cannot change captain after gameweek has been simulated."
+                    )
+                
+                # Check both players are in the lineup
+                cur.execute(
+                    """
+                    SELECT player_id FROM v_lineup_slot
+                    WHERE ft_id = %s AND gw_code = %s AND slot BETWEEN 1 AND 11
+                    """,
+                    (payload.ft_id, payload.gw_code)
+                )
+                lineup_ids = [r["player_id"] for r in cur.fetchall()]
+                
+                if payload.captain_id not in lineup_ids:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Captain must be in your starting XI."
+                    )
+                if payload.vice_captain_id not in lineup_ids:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Vice-captain must be in your starting XI."
+                    )
+                
+                # Set new captain and vice-captain
+                cur.execute(
+                    """
+                    UPDATE fantasy_lineup
+                    SET captain_slot = array_position(player_ids, %s::bigint),
+                        vice_captain_slot = array_position(player_ids, %s::bigint)
+                    WHERE ft_id = %s AND gw_code = %s
+                    """,
+                    (payload.captain_id, payload.vice_captain_id, payload.ft_id, payload.gw_code)
+                )
+    finally:
+        conn.close()
+    
+    return {
+        "status": "ok",
+        "captain_id": payload.captain_id,
+        "vice_captain_id": payload.vice_captain_id
+    }
+
+
+@router.get("/chemistry-bonus/{ft_id}/{gw_code}")
+def get_chemistry_bonus(ft_id: int, gw_code: str):
+    """
+    Get chemistry bonus for a fantasy team in a specific gameweek.
+    Returns 0 if no bonus was earned.
+    """
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT points FROM chemistry_bonus
+                    WHERE ft_id = %s AND gw_code = %s
+                    """,
+                    (ft_id, gw_code)
+                )
+                row = cur.fetchone()
+                if row:
+                    return {"ft_id": ft_id, "gw_code": gw_code, "points": row["points"]}
+                return {"ft_id": ft_id, "gw_code": gw_code, "points": 0}
+    finally:
+        conn.close()
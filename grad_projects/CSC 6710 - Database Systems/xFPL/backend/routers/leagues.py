@@ -0,0 +1,431 @@
+# backend/routers/leagues.py
+
+"""League creation, joining, fixtures and head-to-head tables."""
+
+import random
+import string
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Query, Request, Response
+from pydantic import BaseModel
+
+import fast_json
+from db import get_conn
+from pagination import finish_page, seek
+from response_cache import bump_versions, cached_json, data_versions, league_scope
+from routers import new_router
+
+router = new_router()
+
+
+class LeagueCreate(BaseModel):
+    name: str
+
+class LeagueJoin(BaseModel):
+    ft_id: int
+
+
+def _generate_league_code(cur) -> str:
+    """
+    Generate a short uppercase code not already used in fantasy_league.
+    """
+    while True:
+        code = "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        cur.execute("SELECT 1 FROM fantasy_league WHERE code = %s", (code,))
+        if not cur.fetchone():
+            return code
+
+
+def _round_robin(team_ids: List[int]) -> List[List[Dict[str, int]]]:
+    """
+    Standard round-robin scheduler (single round). Returns a list of rounds;
+    each round is a list of {'home': ft_id, 'away': ft_id} dicts.
+    If odd number of teams, one gets a bye each round.
+    """
+    teams = team_ids[:]
+    n = len(teams)
+    if n < 2:
+        return []
+
+    bye = None
+    if n % 2 == 1:
+        bye = None
+        teams.append(bye)
+        n += 1
+
+    rounds: List[List[Dict[str, int]]] = []
+    for r in range(n - 1):
+        round_matches: List[Dict[str, int]] = []
+        for i in range(n // 2):
+            t1 = teams[i]
+            t2 = teams[n - 1 - i]
+            if t1 is not None and t2 is not None:
+                # alternate home/away by round number
+                if r % 2 == 0:
+                    round_matches.append({"home": t1, "away": t2})
+                else:
+                    round_matches.append({"home": t2, "away": t1})
+        # rotate (keep first fixed)
+        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+        rounds.append(round_matches)
+
+    return rounds
+
+
+@router.post("/leagues")
+def create_league(payload: LeagueCreate):
+    """
+    Create a new fantasy league. Returns id + join code.
+    """
+    if not payload.name.strip():
+        raise HTTPException(status_code=400, detail="League name cannot be empty.")
+
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                code = _generate_league_code(cur)
+                cur.execute(
+                    """
+                    INSERT INTO fantasy_league (name, code)
+                    VALUES (%s, %s)
+                    RETURNING id, name, code
+                    """,
+                    (payload.name.strip(), code),
+                )
+                row = cur.fetchone()
+    finally:
+        conn.close()
+    return row
+
+
+@router.get("/leagues")
+def list_leagues(
+    response: Response,
+    limit: int = Query(500, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+):
+    seek_sql, params = seek([("id", False)], "leagues", cursor)
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"SELECT id, name, code FROM fantasy_league WHERE {seek_sql} ORDER BY id LIMIT %s;",
+                params + [limit + 1],
+            )
+            rows = cur.fetchall()
+    conn.close()
+    return finish_page(rows, limit, response, "leagues", lambda r: [r["id"]])
+
+
+@router.post("/leagues/{league_id}/add-team")
+def add_team_to_league(league_id: int, payload: LeagueJoin):
+    """
+    Add an existing fantasy team into a league.
+    """
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                # Check league
+                cur.execute(
+                    "SELECT id, name FROM fantasy_league WHERE id = %s",
+                    (league_id,),
+                )
+                league = cur.fetchone()
+                if not league:
+                    raise HTTPException(status_code=404, detail="League not found")
+
+                # Check fantasy team
+                cur.execute(
+                    "SELECT id, name FROM fantasy_team WHERE id = %s",
+                    (payload.ft_id,),
+                )
+                ft = cur.fetchone()
+                if not ft:
+                    raise HTTPException(status_code=404, detail="Fantasy team not found")
+
+                # Insert if not already present
+                cur.execute(
+                    """
+                    INSERT INTO fantasy_league_team (league_id, ft_id)
+                    VALUES (%s, %s)
+                    ON CONFLICT (league_id, ft_id) DO NOTHING
+                    """,
+                    (league_id, payload.ft_id),
+                )
+                bumped = bump_versions(cur, league_scope(league_id))
+    finally:
+        conn.close()
+    data_versions.apply(bumped)
+
+    return {"status": "ok", "league_id": league_id, "ft_id": payload.ft_id}
+
+
+@router.post("/leagues/{league_id}/fixtures/generate")
+def generate_league_fixtures(league_id: int, start_gw: str = Query(...)):
+    """
+    Generate a single round-robin schedule for this league starting at `start_gw`.
+    Each round is mapped to one gameweek, in order of game_no.
+    Existing fixtures for this league are deleted and replaced.
+    """
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                # Check league
+                cur.execute(
+                    "SELECT id, name FROM fantasy_league WHERE id = %s",
+                    (league_id,),
+                )
+                league = cur.fetchone()
+                if not league:
+                    raise HTTPException(status_code=404, detail="League not found")
+
+                # League teams
+                cur.execute(
+                    """
+                    SELECT ft_id
+                    FROM fantasy_league_team
+                    WHERE league_id = %s
+                    ORDER BY ft_id
+                    """,
+                    (league_id,),
+                )
+                team_rows = cur.fetchall()
+                team_ids = [r["ft_id"] for r in team_rows]
+                if len(team_ids) < 2:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="At least 2 fantasy teams are required to schedule fixtures.",
+                    )
+
+                # Gameweeks from start_gw onwards
+                cur.execute(
+                    "SELECT game_no FROM gameweek WHERE code = %s",
+                    (start_gw,),
+                )
+                row = cur.fetchone()
+                if not row:
+                    raise HTTPException(status_code=404, detail="start_gw not found")
+                start_no = row["game_no"]
+
+                cur.execute(
+                    """
+                    SELECT code, game_no
+                    FROM gameweek
+                    WHERE game_no >= %s
+                    ORDER BY game_no
+                    """,
+                    (start_no,),
+                )
+                gw_rows = cur.fetchall()
+                if not gw_rows:
+                    raise HTTPException(status_code=400, detail="No gameweeks found from start_gw.")
+
+                rounds = _round_robin(team_ids)
+                needed_rounds = len(rounds)
+                if len(gw_rows) < needed_rounds:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Not enough gameweeks from {start_gw} to schedule "
+                               f"{needed_rounds} rounds (only {len(gw_rows)} available).",
+                    )
+
+                # Clear existing fixtures for this league
+                cur.execute(
+                    "DELETE FROM fantasy_fixture WHERE league_id = %s",
+                    (league_id,),
+                )
+
+                inserted = 0
+                for round_idx, fixtures in enumerate(rounds):
+                    gw_code = gw_rows[round_idx]["code"]
+                    for f in fixtures:
+                        cur.execute(
+                            """
+                            INSERT INTO fantasy_fixture
+                                (league_id, gw_code, home_ft_id, away_ft_id)
+                            VALUES (%s, %s, %s, %s)
+                            """,
+                            (league_id, gw_code, f["home"], f["away"]),
+                        )
+                        inserted += 1
+                bumped = bump_versions(cur, league_scope(league_id))
+    finally:
+        conn.close()
+    data_versions.apply(bumped)
+
+    return {
+        "status": "ok",
+        "league_id": league_id,
+        "rounds": len(rounds),
+        "fixtures": inserted,
+        "start_gw": start_gw,
+    }
+
+
+@router.get("/leagues/{league_id}/fixtures")
+def list_league_fixtures(league_id: int, request: Request):
+    """
+    List all fixtures for a league, ordered by gameweek.
+    """
+    conn = get_conn()
+    with conn:
+        with fast_json.cursor(conn) as cur:
+            cur.execute(
+                """
+                SELECT
+                    f.id,
+                    f.gw_code,
+                    f.home_ft_id,
+                    fh.name AS home_name,
+                    fa.name AS away_name,
+                    f.away_ft_id
+                FROM fantasy_fixture f
+                JOIN fantasy_team fh ON fh.id = f.home_ft_id
+                JOIN fantasy_team fa ON fa.id = f.away_ft_id
+                WHERE f.league_id = %s
+                ORDER BY f.gw_code, f.id
+                """,
+                (league_id,),
+            )
+            rows = cur.fetchall()
+            names = fast_json.columns(cur)
+    conn.close()
+    return fast_json.json_response(request, fast_json.encode_rows(names, rows))
+
+
+@router.get("/leagues/{league_id}/table/{gw_code}")
+def league_table(league_id: int, gw_code: str, request: Request):
+    """
+    Head-to-head league table up to gw_code.
+    Each fixture compares GW *total* fantasy points (incl. chemistry bonus)
+    of home vs away and assigns 3/1/0 league points.
+    """
+    return cached_json(
+        request,
+        data_versions.through(gw_code, league_scope(league_id)),
+        lambda response: _league_table(league_id, gw_code),
+    )
+
+
+def _league_table(league_id: int, gw_code: str):
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            # Check target GW
+            cur.execute("SELECT game_no FROM gameweek WHERE code = %s", (gw_code,))
+            row = cur.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Gameweek not found")
+            target_no = row["game_no"]
+
+            # League teams
+            cur.execute(
+                """
+                SELECT ft.id, ft.name, COALESCE(u.username, 'Unknown') AS username
+                FROM fantasy_league_team lt
+                JOIN fantasy_team ft ON ft.id = lt.ft_id
+                LEFT JOIN app_user u ON u.id = ft.user_id
+                WHERE lt.league_id = %s
+                ORDER BY ft.id
+                """,
+                (league_id,),
+            )
+            team_rows = cur.fetchall()
+            if not team_rows:
+                raise HTTPException(status_code=400, detail="League has no teams.")
+
+            stats: Dict[int, Dict] = {}
+            for r in team_rows:
+                ft_id = r["id"]
+                stats[ft_id] = {
+                    "ft_id": ft_id,
+                    "team_name": r["name"],
+                    "username": r["username"],
+                    "played": 0,
+                    "wins": 0,
+                    "draws": 0,
+                    "losses": 0,
+                    "points_for": 0,
+                    "points_against": 0,
+                    "league_points": 0,
+                }
+
+            # Fixtures up to target_no
+            cur.execute(
+                """
+                SELECT
+                    f.gw_code,
+                    f.home_ft_id,
+                    f.away_ft_id
+                FROM fantasy_fixture f
+                JOIN gameweek g ON g.code = f.gw_code
+                WHERE f.league_id = %s
+                  AND g.game_no <= %s
+                ORDER BY g.game_no, f.id
+                """,
+                (league_id, target_no),
+            )
+            fixtures = cur.fetchall()
+
+            for f in fixtures:
+                gw = f["gw_code"]
+                home = f["home_ft_id"]
+                away = f["away_ft_id"]
+
+                # GW-level fantasy points (incl. chemistry bonus) for both teams
+                cur.execute(
+                    """
+                    SELECT ft_id, gw_total_points
+                    FROM v_fantasy_standings
+                    WHERE gw_code = %s
+                      AND ft_id IN (%s, %s)
+                    """,
+                    (gw, home, away),
+                )
+                rows = cur.fetchall()
+                pts_map = {r["ft_id"]: (r["gw_total_points"] or 0) for r in rows}
+                home_pts = pts_map.get(home, 0)
+                away_pts = pts_map.get(away, 0)
+
+                # Update PF / PA
+                sh = stats[home]
+                sa = stats[away]
+
+                sh["played"] += 1
+                sa["played"] += 1
+
+                sh["points_for"] += home_pts
+                sh["points_against"] += away_pts
+
+                sa["points_for"] += away_pts
+                sa["points_against"] += home_pts
+
+                # Result & league points
+                if home_pts > away_pts:
+                    sh["wins"] += 1
+                    sa["losses"] += 1
+                    sh["league_points"] += 3
+                elif away_pts > home_pts:
+                    sa["wins"] += 1
+                    sh["losses"] += 1
+                    sa["league_points"] += 3
+                else:
+                    sh["draws"] += 1
+                    sa["draws"] += 1
+                    sh["league_points"] += 1
+                    sa["league_points"] += 1
+
+    # Build table
+    table = list(stats.values())
+    table.sort(
+        key=lambda x: (
+            -x["league_points"],
+            -(x["points_for"] - x["points_against"]),
+            -x["points_for"],
+            x["team_name"],
+        )
+    )
+    return table
@@ -0,0 +1,74 @@
+# backend/routers/ops.py
+
+"""Operational endpoints: response cache stats, metrics, SQL traces, profiles."""
+
+from fastapi import HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+import metrics
+import profiling
+import sql_trace
+from response_cache import cache_stats
+from routers import new_router
+
+router = new_router()
+
+
+# =====================================================
+# RESPONSE CACHE
+# =====================================================
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """How cached reads were answered, per route, with hit ratios."""
+    return {"routes": cache_stats.snapshot()}
+
+
+# =====================================================
+# METRICS (Prometheus text format)
+# =====================================================
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    """Request latency / status counts, DB queries and time, connections, simulate phases."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/debug/sql-traces", include_in_schema=False)
+def get_sql_traces():
+    """Statement shapes of the last requests (SQL_TRACE=1 only), newest first."""
+    if not sql_trace.enabled:
+        raise HTTPException(status_code=404, detail="SQL tracing is off (set SQL_TRACE=1)")
+    return {"repeat_limit": sql_trace.REPEAT_LIMIT, "requests": sql_trace.recent_traces()}
+
+
+# =====================================================
+# PROFILING (admins only; ?profile=1 on any request)
+# =====================================================
+
+def _require_admin(request: Request) -> None:
+    if not profiling.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is off (set ADMIN_TOKEN)")
+    if not profiling.is_admin(request.headers.get(profiling.ADMIN_TOKEN_HEADER)):
+        raise HTTPException(status_code=403, detail=f"Requires a valid {profiling.ADMIN_TOKEN_HEADER}")
+
+
+@router.get("/debug/profiles", include_in_schema=False)
+def list_profiles(request: Request):
+    """The last profiled requests, newest first."""
+    _require_admin(request)
+    return {"profiles": profiling.recent_profiles()}
+
+
+@router.get("/debug/profiles/{profile_id}", response_class=PlainTextResponse, include_in_schema=False)
+def get_profile(
+    profile_id: str,
+    request: Request,
+    format: str = Query("tree", pattern="^(tree|collapsed)$"),
+):
+    """One profile as a call tree, or as folded stacks for flamegraph tools."""
+    _require_admin(request)
+    profile = profiling.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile.tree() if format == "tree" else profile.collapsed())
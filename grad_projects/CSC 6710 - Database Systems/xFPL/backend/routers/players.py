@@ -0,0 +1,79 @@
+# backend/routers/players.py
+
+"""Player browser (for building squads): filters, name search, fuzzy search."""
+
+from typing import Optional
+
+from fastapi import Query, Request, Response
+
+import fast_json
+from db import get_conn
+from pagination import decode_cursor, finish_page
+from player_search import PLAYER_COLUMNS, build_player_query, get_fuzzy_index, player_sort_keys
+from response_cache import cached_json, data_versions
+from routers import new_router
+
+router = new_router()
+
+
+@router.get("/teams")
+def list_teams(request: Request):
+    """Get all team codes and names for dropdowns."""
+    return cached_json(request, data_versions.current(), lambda response: _list_teams())
+
+
+def _list_teams():
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT code, name FROM team ORDER BY name")
+            rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+@router.get("/players")
+def list_players(
+    request: Request,
+    response: Response,
+    team_code: Optional[str] = Query(None),
+    position: Optional[str] = Query(None),
+    q: Optional[str] = Query(None),
+    limit: int = Query(500, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    fuzzy: bool = Query(False, description="Typo-tolerant name search (requires q)"),
+    max_distance: Optional[int] = Query(None, ge=0, le=3, description="Max edits for fuzzy search"),
+):
+    """
+    List players with optional filters: by team code, position, name search.
+    Used by the frontend player browser.
+    Name search is ranked (last-name prefix hits first) and index-backed,
+    see player_search.py.
+
+    With fuzzy=true, q is matched by edit distance against the in-memory
+    name index instead ("halaand" -> Haaland); each row gets a `distance`.
+    Fuzzy results are a single page of the nearest `limit` matches.
+
+    The page is encoded straight from tuple rows (fast_json).
+    """
+    if fuzzy and q:
+        index = get_fuzzy_index(get_conn)
+        return index.search(q, max_distance, team_code, position, limit)
+
+    keys = player_sort_keys(q)
+    after = decode_cursor("players", cursor, len(keys)) if cursor else None
+    sql, params = build_player_query(team_code, position, q, limit + 1, after)
+
+    conn = get_conn()
+    with conn:
+        with fast_json.cursor(conn) as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+            names = fast_json.columns(cur)
+    conn.close()
+
+    key_idx = [names.index(k) for k, _ in keys]
+    rows = finish_page(rows, limit, response, "players", lambda r: [r[i] for i in key_idx])
+    # search_rank (selected last) is only a sort key
+    body = fast_json.encode_rows(names[:len(PLAYER_COLUMNS.split(","))], rows)
+    return fast_json.json_response(request, body, fast_json.response_headers(response))
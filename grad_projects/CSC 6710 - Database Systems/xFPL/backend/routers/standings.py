@@ -0,0 +1,114 @@
+# backend/routers/standings.py
+
+"""Fantasy league standings (cumulative; with bonus)."""
+
+from typing import Optional
+
+from fastapi import HTTPException, Query, Request, Response
+
+import fast_json
+from db import get_conn
+from pagination import finish_page, seek
+from response_cache import FANTASY_TEAM, cached_json, data_versions
+from routers import new_router
+
+router = new_router()
+
+
+@router.get("/standings/{gw_code}")
+def get_standings(
+    gw_code: str,
+    request: Request,
+    limit: int = Query(500, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+):
+    """
+    Cumulative standings by TOTAL fantasy points (player points + chemistry bonus)
+    up to and including gw_code.
+
+    Totals come from standings_snapshot, written when each GW is scored: the
+    latest scored GW at or before gw_code holds everyone's cumulative points.
+    Teams created since then are appended with 0 points.
+    """
+    return cached_json(
+        request,
+        data_versions.through(gw_code, FANTASY_TEAM),
+        lambda response: _get_standings(gw_code, response, limit, cursor),
+    )
+
+
+def _get_standings(gw_code: str, response: Response, limit: int, cursor: Optional[str]):
+    keys = [("total_points", True), ("ft_id", False)]
+    seek_sql, seek_params = seek(keys, "standings", cursor)
+
+    conn = get_conn()
+    with conn:
+        with fast_json.cursor(conn) as cur:
+            cur.execute("SELECT game_no FROM gameweek WHERE code = %s", (gw_code,))
+            row = cur.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Gameweek not found")
+            target_no = row[0]
+
+            cur.execute(
+                """
+                SELECT g.code
+                FROM gameweek g
+                WHERE g.game_no <= %s
+                  AND EXISTS (SELECT 1 FROM standings_snapshot s WHERE s.gw_code = g.code)
+                ORDER BY g.game_no DESC
+                LIMIT 1
+                """,
+                (target_no,),
+            )
+            snap = cur.fetchone()
+            snap_code = snap[0] if snap else None
+
+            # Each branch picks its page before the name joins, so only
+            # `limit` rows are ever joined.
+            cur.execute(
+                f"""
+                SELECT
+                    x.ft_id,
+                    ft.name AS team_name,
+                    COALESCE(u.username, 'Unknown') AS username,
+                    x.total_points
+                FROM (
+                    (
+                        SELECT ft_id, total_points
+                        FROM standings_snapshot
+                        WHERE gw_code = %s AND {seek_sql}
+                        ORDER BY total_points DESC, ft_id
+                        LIMIT %s
+                    )
+                    UNION ALL
+                    (
+                        SELECT ft_id, total_points
+                        FROM (
+                            SELECT id AS ft_id, 0 AS total_points
+                            FROM fantasy_team
+                            WHERE id > (
+                                SELECT COALESCE(MAX(ft_id), 0)
+                                FROM standings_snapshot
+                                WHERE gw_code = %s
+                            )
+                        ) new_teams
+                        WHERE {seek_sql}
+                        ORDER BY ft_id
+                        LIMIT %s
+                    )
+                ) x
+                JOIN fantasy_team ft ON ft.id = x.ft_id
+                LEFT JOIN app_user u ON u.id = ft.user_id
+                ORDER BY x.total_points DESC, x.ft_id
+                LIMIT %s;
+                """,
+                [snap_code] + seek_params + [limit + 1]
+                + [snap_code] + seek_params + [limit + 1]
+                + [limit + 1],
+            )
+            rows = cur.fetchall()
+            names = fast_json.columns(cur)
+    conn.close()
+    rows = finish_page(rows, limit, response, "standings", lambda r: [r[3], r[0]])
+    return fast_json.encode_rows(names, rows)
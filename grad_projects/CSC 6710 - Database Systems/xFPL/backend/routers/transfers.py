@@ -0,0 +1,384 @@
+# backend/routers/transfers.py
+
+"""Transfer system: single transfers, batches, history and remaining count."""
+
+from collections import defaultdict
+from typing import Dict, List
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from db import get_conn
+from response_cache import bump_versions, data_versions, gw_scope
+from routers import new_router
+
+router = new_router()
+
+
+class TransferRequest(BaseModel):
+    ft_id: int
+    gw_code: str
+    player_out_id: int
+    player_in_id: int
+
+class TransferSwap(BaseModel):
+    player_out_id: int
+    player_in_id: int
+
+class TransferBatch(BaseModel):
+    ft_id: int
+    gw_code: str
+    transfers: List[TransferSwap]
+
+
+MAX_TRANSFERS_PER_GW = 3
+
+
+def _lock_and_count_transfers(cur, ft_id: int, gw_code: str) -> int:
+    """
+    Lock the team row so transfers to one team run one at a time, then count
+    those already made in gw_code. The count is its own statement: one in
+    the locking SELECT would keep that statement's snapshot after waiting on
+    the lock and miss the transfer just committed, giving a duplicate sub_no.
+    """
+    cur.execute("SELECT id FROM fantasy_team WHERE id = %s FOR UPDATE", (ft_id,))
+    if not cur.fetchone():
+        raise HTTPException(status_code=404, detail="Fantasy team not found.")
+    cur.execute(
+        "SELECT COUNT(*) AS cnt FROM transfer WHERE ft_id = %s AND gw_code = %s",
+        (ft_id, gw_code)
+    )
+    return cur.fetchone()["cnt"]
+
+@router.get("/transfers/{ft_id}/{gw_code}")
+def get_transfers(ft_id: int, gw_code: str):
+    """Get transfers made by a team for a specific gameweek."""
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT 
+                    t.sub_no,
+                    t.player_out_id,
+                    po.first_name as out_first_name,
+                    po.last_name as out_last_name,
+                    po.position as out_position,
+                    t.player_in_id,
+                    pi.first_name as in_first_name,
+                    pi.last_name as in_last_name,
+                    pi.position as in_position
+                FROM transfer t
+                JOIN player po ON po.id = t.player_out_id
+                JOIN player pi ON pi.id = t.player_in_id
+                WHERE t.ft_id = %s AND t.gw_code = %s
+                ORDER BY t.sub_no
+                """,
+                (ft_id, gw_code)
+            )
+            rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+@router.get("/transfers/remaining/{ft_id}/{gw_code}")
+def get_remaining_transfers(ft_id: int, gw_code: str):
+    """Get the number of remaining transfers for a team in a gameweek."""
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT COUNT(*) as cnt FROM transfer WHERE ft_id = %s AND gw_code = %s",
+                (ft_id, gw_code)
+            )
+            used = cur.fetchone()["cnt"]
+    conn.close()
+    
+    return {"ft_id": ft_id, "gw_code": gw_code, "used": used, "remaining": MAX_TRANSFERS_PER_GW - used}
+
+
+@router.post("/transfers")
+def make_transfer(payload: TransferRequest):
+    """
+    Make a transfer for a fantasy team.
+    Constraints:
+    - Max 3 transfers per gameweek
+    - Player out must be in current lineup
+    - Player in must not already be in lineup
+    - Must maintain valid formation (1 GK, 3+ DEF, 2+ MID, 1+ FWD)
+    - Must stay within budget
+    - Max 2 players per real team
+    """
+    conn = get_conn()
+    used = 0
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                # Get count of transfers used (team locked until commit)
+                used = _lock_and_count_transfers(cur, payload.ft_id, payload.gw_code)
+                
+                # Check transfer limit
+                if used >= MAX_TRANSFERS_PER_GW:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Maximum {MAX_TRANSFERS_PER_GW} transfers allowed per gameweek."
+                    )
+                
+                # Get current lineup
+                cur.execute(
+                    """
+                    SELECT fl.player_id, fl.slot, p.position, p.cost, p.team_code
+                    FROM v_lineup_slot fl
+                    JOIN player p ON p.id = fl.player_id
+                    WHERE fl.ft_id = %s AND fl.gw_code = %s
+                    """,
+                    (payload.ft_id, payload.gw_code)
+                )
+                lineup = cur.fetchall()
+                
+                if not lineup:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="No lineup found for this team and gameweek."
+                    )
+                
+                # Check player_out is in lineup
+                lineup_ids = [r["player_id"] for r in lineup]
+                if payload.player_out_id not in lineup_ids:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Player to transfer out is not in your lineup."
+                    )
+                
+                # Check player_in is not in lineup
+                if payload.player_in_id in lineup_ids:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Player to transfer in is already in your lineup."
+                    )
+                
+                # Get player info
+                cur.execute(
+                    "SELECT id, position, cost, team_code FROM player WHERE id = %s",
+                    (payload.player_out_id,)
+                )
+                player_out = cur.fetchone()
+                
+                cur.execute(
+                    "SELECT id, position, cost, team_code FROM player WHERE id = %s",
+                    (payload.player_in_id,)
+                )
+                player_in = cur.fetchone()
+                
+                if not player_out or not player_in:
+                    raise HTTPException(status_code=400, detail="Invalid player ID.")
+                
+                # Check same position
+                if player_out["position"] != player_in["position"]:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Position mismatch: {player_out['position']} -> {player_in['position']}. Must transfer same position."
+                    )
+                
+                # Calculate new budget
+                current_cost = sum(float(r["cost"]) for r in lineup)
+                new_cost = current_cost - float(player_out["cost"]) + float(player_in["cost"])
+                if new_cost > 100.0:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Transfer would exceed budget: £{new_cost:.1f}M (max £100M)."
+                    )
+                
+                # Check team constraint (max 2 per real team)
+                team_counts = defaultdict(int)
+                for r in lineup:
+                    if r["player_id"] != payload.player_out_id:
+                        team_counts[r["team_code"]] += 1
+                team_counts[player_in["team_code"]] += 1
+                
+                if team_counts[player_in["team_code"]] > 2:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Cannot have more than 2 players from {player_in['team_code']}."
+                    )
+                
+                # Record the transfer
+                cur.execute(
+                    """
+                    INSERT INTO transfer (ft_id, gw_code, sub_no, player_out_id, player_in_id)
+                    VALUES (%s, %s, %s, %s, %s)
+                    """,
+                    (payload.ft_id, payload.gw_code, used + 1, payload.player_out_id, payload.player_in_id)
+                )
+                
+                # Update the lineup
+                cur.execute(
+                    """
+                    UPDATE fantasy_lineup
+                    SET player_ids = array_replace(player_ids, %s::bigint, %s::bigint)
+                    WHERE ft_id = %s AND gw_code = %s
+                    """,
+                    (payload.player_out_id, payload.player_in_id, payload.ft_id, payload.gw_code)
+                )
+                bumped = bump_versions(cur, gw_scope(payload.gw_code))
+                
+    finally:
+        conn.close()
+    data_versions.apply(bumped)
+    
+    return {
+        "status": "ok",
+        "transfer": {
+            "out": payload.player_out_id,
+            "in": payload.player_in_id,
+        },
+        "remaining_transfers": max(0, MAX_TRANSFERS_PER_GW - used - 1)
+    }
+
+
+def _validate_transfer_batch(lineup: List[Dict], incoming: Dict[int, Dict], swaps: List[TransferSwap]) -> float:
+    """
+    Check a set of swaps against the current lineup and return the final
+    squad cost. Swaps are judged on the squad they produce together, so
+    e.g. selling one ARS player and buying another in the same batch is fine
+    even if the club is already at its limit.
+    """
+    by_id = {r["player_id"]: r for r in lineup}
+    out_ids = [s.player_out_id for s in swaps]
+    in_ids = [s.player_in_id for s in swaps]
+
+    if len(set(out_ids)) != len(out_ids) or len(set(in_ids)) != len(in_ids):
+        raise HTTPException(status_code=400, detail="Each player can only be moved once per batch.")
+
+    final = {pid: r for pid, r in by_id.items() if pid not in out_ids}
+    for s in swaps:
+        player_out = by_id.get(s.player_out_id)
+        if not player_out:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Player {s.player_out_id} to transfer out is not in your lineup."
+            )
+        if s.player_in_id in by_id:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Player {s.player_in_id} to transfer in is already in your lineup."
+            )
+        player_in = incoming.get(s.player_in_id)
+        if not player_in:
+            raise HTTPException(status_code=400, detail=f"Invalid player ID: {s.player_in_id}.")
+        if player_out["position"] != player_in["position"]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Position mismatch: {player_out['position']} -> {player_in['position']}. Must transfer same position."
+            )
+        final[s.player_in_id] = player_in
+
+    new_cost = sum(float(r["cost"]) for r in final.values())
+    if new_cost > 100.0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Transfers would exceed budget: £{new_cost:.1f}M (max £100M)."
+        )
+
+    team_counts = defaultdict(int)
+    for r in final.values():
+        team_counts[r["team_code"]] += 1
+    over_rep = [tc for tc, c in team_counts.items() if c > 2]
+    if over_rep:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot have more than 2 players from {', '.join(over_rep)}."
+        )
+    return new_cost
+
+
+@router.post("/transfers/batch")
+def make_transfer_batch(payload: TransferBatch):
+    """
+    Make several transfers at once, all-or-nothing.
+    Same rules as /transfers, but budget and max-2-per-club are checked on
+    the final squad. The team row is locked so concurrent batches for the
+    same team cannot both spend the remaining allowance.
+    """
+    if not payload.transfers:
+        raise HTTPException(status_code=400, detail="No transfers given.")
+    if len(payload.transfers) > MAX_TRANSFERS_PER_GW:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {MAX_TRANSFERS_PER_GW} transfers allowed per gameweek."
+        )
+
+    out_ids = [s.player_out_id for s in payload.transfers]
+    in_ids = [s.player_in_id for s in payload.transfers]
+
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                used = _lock_and_count_transfers(cur, payload.ft_id, payload.gw_code)
+
+                remaining = MAX_TRANSFERS_PER_GW - used
+                if len(payload.transfers) > remaining:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Only {max(0, remaining)} transfers remaining this gameweek."
+                    )
+
+                cur.execute(
+                    """
+                    SELECT fl.player_id, fl.slot, p.position, p.cost, p.team_code
+                    FROM v_lineup_slot fl
+                    JOIN player p ON p.id = fl.player_id
+                    WHERE fl.ft_id = %s AND fl.gw_code = %s
+                    """,
+                    (payload.ft_id, payload.gw_code)
+                )
+                lineup = cur.fetchall()
+                if not lineup:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="No lineup found for this team and gameweek."
+                    )
+
+                cur.execute(
+                    "SELECT id, position, cost, team_code FROM player WHERE id = ANY(%s)",
+                    (in_ids,)
+                )
+                incoming = {r["id"]: r for r in cur.fetchall()}
+
+                new_cost = _validate_transfer_batch(lineup, incoming, payload.transfers)
+
+                cur.execute(
+                    """
+                    INSERT INTO transfer (ft_id, gw_code, sub_no, player_out_id, player_in_id)
+                    SELECT %s, %s, %s + v.ord, v.out_id, v.in_id
+                    FROM unnest(%s::bigint[], %s::bigint[]) WITH ORDINALITY AS v(out_id, in_id, ord)
+                    """,
+                    (payload.ft_id, payload.gw_code, used, out_ids, in_ids)
+                )
+
+                cur.execute(
+                    """
+                    UPDATE fantasy_lineup fl
+                    SET player_ids = ARRAY(
+                        SELECT COALESCE(v.in_id, s.player_id)
+                        FROM unnest(fl.player_ids) WITH ORDINALITY AS s(player_id, slot)
+                        LEFT JOIN unnest(%s::bigint[], %s::bigint[]) AS v(out_id, in_id)
+                            ON v.out_id = s.player_id
+                        ORDER BY s.slot
+                    )
+                    WHERE fl.ft_id = %s AND fl.gw_code = %s
+                    """,
+                    (out_ids, in_ids, payload.ft_id, payload.gw_code)
+                )
+                bumped = bump_versions(cur, gw_scope(payload.gw_code))
+    finally:
+        conn.close()
+    data_versions.apply(bumped)
+
+    return {
+        "status": "ok",
+        "transfers": [{"out": o, "in": i} for o, i in zip(out_ids, in_ids)],
+        "total_cost": round(new_cost, 1),
+        "remaining_transfers": remaining - len(out_ids),
+    }
@@ -0,0 +1,74 @@
+# backend/routers/users.py
+
+"""Manager accounts."""
+
+from typing import Optional
+
+from fastapi import Query, Response
+from pydantic import BaseModel
+
+from db import get_conn
+from pagination import finish_page, seek
+from routers import new_router
+
+router = new_router()
+
+
+class UserCreate(BaseModel):
+    username: str
+    email: str
+
+
+@router.get("/users")
+def list_users(
+    response: Response,
+    user_id: Optional[int] = Query(None),
+    limit: int = Query(500, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+):
+    where_sql, params = seek([("id", False)], "users", cursor)
+    if user_id is not None:
+        where_sql += " AND id = %s"
+        params = params + [user_id]
+
+    conn = get_conn()
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"SELECT id, username, email FROM app_user WHERE {where_sql} ORDER BY id LIMIT %s;",
+                params + [limit + 1],
+            )
+            rows = cur.fetchall()
+    conn.close()
+    return finish_page(rows, limit, response, "users", lambda r: [r["id"]])
+
+
+@router.post("/users")
+def create_user(user: UserCreate):
+    """
+    Simple account creation. If username already exists, we return
+    the existing record instead of failing.
+    """
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO app_user (username, email)
+                    VALUES (%s, %s)
+                    ON CONFLICT (username) DO NOTHING
+                    RETURNING id, username, email
+                    """,
+                    (user.username, user.email),
+                )
+                row = cur.fetchone()
+                if not row:
+                    cur.execute(
+                        "SELECT id, username, email FROM app_user WHERE username = %s OR email = %s",
+                        (user.username, user.email),
+                    )
+                    row = cur.fetchone()
+    finally:
+        conn.close()
+    return row
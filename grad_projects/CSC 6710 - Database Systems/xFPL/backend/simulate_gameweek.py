@@ -10,11 +10,13 @@ FIXED VERSION:
 """
 
 from collections import defaultdict
-from typing import Dict, Tuple, List, Set
+from typing import Dict, Tuple, List
 import numpy as np
 import random
 
 from db import get_conn
+from metrics import simulate_phase, start_phase
+from response_cache import bump_versions, data_versions, gw_scope
 
 
 # ============================================================================
@@ -60,10 +62,47 @@ def get_team_strength(team_code: str) -> Dict:
 # REALISTIC MATCH SIMULATION
 # ============================================================================
 
+def _lock_simulation(conn, gw_code: str) -> None:
+    """
+    Session advisory lock on gw_code for the whole run, released when the
+    connection closes, however the run ends. Another simulate of the same
+    gameweek is refused, and a 'simulating' status whose lock nobody holds
+    is reset by release_stale_simulations() (schema 2.7).
+    """
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT pg_try_advisory_lock(hashtext('simulate'), hashtext(%s)) AS locked",
+                (gw_code.strip(),),
+            )
+            locked = cur.fetchone()["locked"]
+    if not locked:
+        raise ValueError(f"Gameweek {gw_code} is already being simulated")
+
+
+def _mark_simulating(conn, gw_code: str) -> None:
+    """Set status 'simulating' in its own transaction, so other requests see it."""
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute("UPDATE gameweek SET status = 'simulating' WHERE code = %s", (gw_code,))
+            bumped = bump_versions(cur, gw_scope(gw_code))
+    data_versions.apply(bumped)
+
+
+def _refresh_status(conn, gw_code: str) -> None:
+    """Recount gw_code's results: 'simulated' if all are in, else back to 'pending'."""
+    with conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT refresh_gameweek_status(%s)", ([gw_code],))
+            bumped = bump_versions(cur, gw_scope(gw_code))
+    data_versions.apply(bumped)
+
+
 def simulate_matches(gw_code: str, seed: int = None) -> None:
     """
     Simulate matches with realistic scorelines.
     Top teams win more, score more, concede less.
+    gameweek.status reads 'simulating' while this runs.
     """
     if seed is not None:
         np.random.seed(seed)
@@ -71,6 +110,12 @@ def simulate_matches(gw_code: str, seed: int = None) -> None:
 
     conn = get_conn()
     try:
+        _lock_simulation(conn, gw_code)
+    except Exception:
+        conn.close()
+        raise
+    try:
+        _mark_simulating(conn, gw_code)
         with conn:
             with conn.cursor() as cur:
                 cur.execute("SELECT game_no FROM gameweek WHERE code = %s", (gw_code,))
@@ -158,8 +203,14 @@ def simulate_matches(gw_code: str, seed: int = None) -> None:
                     "UPDATE match SET home_goals = %s, away_goals = %s WHERE id = %s",
                     updates,
                 )
+                refresh_epl_table_snapshot(cur, gw_code, current_game_no)
     finally:
-        conn.close()
+        # Simulated, nothing left to simulate, or failed: status follows the results again
+        try:
+            _refresh_status(conn, gw_code)
+        finally:
+            # Also releases the advisory lock
+            conn.close()
 
 
 # ============================================================================
@@ -258,6 +309,8 @@ def assign_player_points(gw_code: str, seed: int = None) -> None:
                     raise ValueError(f"Gameweek {gw_code} not found")
                 current_game_no = row["game_no"]
 
+                points_phase = start_phase("points")
+
                 # Clear existing points
                 cur.execute("DELETE FROM player_points WHERE gw_code = %s", (gw_code,))
 
@@ -458,10 +511,204 @@ def assign_player_points(gw_code: str, seed: int = None) -> None:
                         rows,
                     )
 
+                points_phase.stop()
+
                 # Chemistry bonus (FIXED - proper reset after 5 GWs)
-                _apply_chemistry_bonus_fixed(cur, gw_code, current_game_no)
+                with simulate_phase("chemistry"):
+                    _apply_chemistry_bonus_fixed(cur, gw_code, current_game_no)
+
+                with simulate_phase("standings"):
+                    refresh_standings_snapshot(cur, gw_code, current_game_no)
+                bumped = bump_versions(cur, gw_scope(gw_code))
     finally:
         conn.close()
+    data_versions.apply(bumped)
+
+
+# ============================================================================
+# EPL TABLE SNAPSHOT - cumulative club table read by /epl-table
+# ============================================================================
+
+EPL_TABLE_SNAPSHOT_SQL = """
+    WITH results AS (
+        SELECT m.gw_code, m.hometeam_code AS team_code, m.home_goals AS gf, m.away_goals AS ga
+        FROM match m
+        WHERE m.gw_code = ANY(%(window)s::bpchar[])
+          AND m.home_goals IS NOT NULL AND m.away_goals IS NOT NULL
+        UNION ALL
+        SELECT m.gw_code, m.awayteam_code, m.away_goals, m.home_goals
+        FROM match m
+        WHERE m.gw_code = ANY(%(window)s::bpchar[])
+          AND m.home_goals IS NOT NULL AND m.away_goals IS NOT NULL
+    ),
+    delta AS (
+        SELECT
+            gw_code, team_code,
+            COUNT(*) AS played,
+            COUNT(*) FILTER (WHERE gf > ga) AS wins,
+            COUNT(*) FILTER (WHERE gf = ga) AS draws,
+            COUNT(*) FILTER (WHERE gf < ga) AS losses,
+            SUM(gf) AS gf,
+            SUM(ga) AS ga
+        FROM results
+        GROUP BY gw_code, team_code
+    ),
+    base AS (
+        SELECT * FROM epl_table_snapshot WHERE gw_code = %(base)s
+    ),
+    running AS (
+        SELECT
+            g.code AS gw_code,
+            g.game_no,
+            t.code AS team_code,
+            b.position AS base_position,
+            COALESCE(b.played, 0) + SUM(COALESCE(d.played, 0)) OVER w AS played,
+            COALESCE(b.wins, 0)   + SUM(COALESCE(d.wins, 0))   OVER w AS wins,
+            COALESCE(b.draws, 0)  + SUM(COALESCE(d.draws, 0))  OVER w AS draws,
+            COALESCE(b.losses, 0) + SUM(COALESCE(d.losses, 0)) OVER w AS losses,
+            COALESCE(b.gf, 0)     + SUM(COALESCE(d.gf, 0))     OVER w AS gf,
+            COALESCE(b.ga, 0)     + SUM(COALESCE(d.ga, 0))     OVER w AS ga
+        FROM gameweek g
+        CROSS JOIN team t
+        LEFT JOIN delta d ON d.gw_code = g.code AND d.team_code = t.code
+        LEFT JOIN base b ON b.team_code = t.code
+        WHERE g.code = ANY(%(window)s::bpchar[])
+        WINDOW w AS (PARTITION BY t.code ORDER BY g.game_no)
+    ),
+    ranked AS (
+        SELECT
+            r.*,
+            r.wins * 3 + r.draws AS points,
+            ROW_NUMBER() OVER (
+                PARTITION BY r.gw_code
+                ORDER BY r.wins * 3 + r.draws DESC, r.gf - r.ga DESC, r.gf DESC, r.team_code
+            ) AS position
+        FROM running r
+        WHERE r.played > 0
+    ),
+    moved AS (
+        SELECT
+            k.*,
+            COALESCE(LAG(k.position) OVER (PARTITION BY k.team_code ORDER BY k.game_no),
+                     k.base_position) AS prev_position
+        FROM ranked k
+    )
+    INSERT INTO epl_table_snapshot
+        (gw_code, team_code, played, wins, draws, losses, gf, ga, points, position, prev_position)
+    SELECT gw_code, team_code, played, wins, draws, losses, gf, ga, points, position, prev_position
+    FROM moved
+    WHERE gw_code = ANY(%(targets)s::bpchar[])
+"""
+
+
+def refresh_epl_table_snapshot(cur, gw_code: str, current_game_no: int) -> None:
+    """
+    Rewrite epl_table_snapshot for gw_code once its results are in.
+
+    Like the standings snapshot, later gameweeks that already have a table
+    are rebuilt too. Totals continue from the latest table before gw_code,
+    so only the matches after it are read.
+    """
+    cur.execute(
+        """
+        SELECT g.code, g.game_no,
+               EXISTS (SELECT 1 FROM epl_table_snapshot s WHERE s.gw_code = g.code) AS has_table
+        FROM gameweek g
+        ORDER BY g.game_no
+        """
+    )
+    gameweeks = cur.fetchall()
+
+    earlier = [g for g in gameweeks if g["game_no"] < current_game_no and g["has_table"]]
+    base = earlier[-1] if earlier else None
+    base_no = base["game_no"] if base else 0
+    targets = [
+        g for g in gameweeks
+        if g["code"] == gw_code or (g["game_no"] > current_game_no and g["has_table"])
+    ]
+    last_no = max(g["game_no"] for g in targets)
+    window = [g["code"] for g in gameweeks if base_no < g["game_no"] <= last_no]
+    target_codes = [g["code"] for g in targets]
+
+    cur.execute("DELETE FROM epl_table_snapshot WHERE gw_code = ANY(%s::bpchar[])", (target_codes,))
+    cur.execute(
+        EPL_TABLE_SNAPSHOT_SQL,
+        {"window": window, "targets": target_codes, "base": base["code"] if base else None},
+    )
+
+
+# ============================================================================
+# STANDINGS SNAPSHOT - cumulative totals read by /standings
+# ============================================================================
+
+def refresh_standings_snapshot(cur, gw_code: str, current_game_no: int) -> None:
+    """
+    Rewrite standings_snapshot for gw_code once its points and bonus are in.
+
+    Later gameweeks that already have a snapshot are rebuilt too, since
+    re-scoring an earlier GW shifts every cumulative total after it. Totals
+    continue from the latest snapshot before gw_code (GWs without one have
+    no points), so only the rebuilt gameweeks' lineups are scored.
+    """
+    cur.execute(
+        """
+        SELECT code FROM gameweek g
+        WHERE g.code = %s
+           OR (g.game_no > %s
+               AND EXISTS (SELECT 1 FROM standings_snapshot s WHERE s.gw_code = g.code))
+        """,
+        (gw_code, current_game_no),
+    )
+    targets = [r["code"] for r in cur.fetchall()]
+
+    cur.execute("DELETE FROM standings_snapshot WHERE gw_code = ANY(%s::bpchar[])", (targets,))
+    cur.execute(
+        """
+        WITH lineup_points AS (
+            SELECT fl.ft_id, fl.gw_code, SUM(pp.points) AS points
+            FROM fantasy_lineup fl
+            CROSS JOIN LATERAL unnest(fl.player_ids[1:11]) AS s(player_id)
+            JOIN player_points pp ON pp.player_id = s.player_id AND pp.gw_code = fl.gw_code
+            WHERE fl.gw_code = ANY(%(targets)s::bpchar[])
+              AND pp.gw_code = ANY(%(targets)s::bpchar[])
+            GROUP BY fl.ft_id, fl.gw_code
+        ),
+        base AS (
+            SELECT ss.ft_id, ss.total_points
+            FROM standings_snapshot ss
+            WHERE ss.gw_code = (
+                SELECT g.code FROM gameweek g
+                WHERE g.game_no < %(game_no)s
+                  AND EXISTS (SELECT 1 FROM standings_snapshot x WHERE x.gw_code = g.code)
+                ORDER BY g.game_no DESC
+                LIMIT 1
+            )
+        )
+        INSERT INTO standings_snapshot (gw_code, ft_id, gw_points, total_points)
+        SELECT
+            c.gw_code,
+            c.ft_id,
+            c.gw_points,
+            COALESCE(b.total_points, 0)
+                + SUM(c.gw_points) OVER (PARTITION BY c.ft_id ORDER BY c.game_no)
+        FROM (
+            SELECT
+                g.code AS gw_code,
+                g.game_no,
+                ft.id AS ft_id,
+                COALESCE(lp.points, 0) + COALESCE(cb.points, 0) AS gw_points
+            FROM fantasy_team ft
+            CROSS JOIN gameweek g
+            LEFT JOIN lineup_points lp ON lp.ft_id = ft.id AND lp.gw_code = g.code
+            LEFT JOIN chemistry_bonus cb
+                ON cb.ft_id = ft.id AND cb.gw_code = g.code
+               AND cb.gw_code = ANY(%(targets)s::bpchar[])
+            WHERE g.code = ANY(%(targets)s::bpchar[])
+        ) c
+        LEFT JOIN base b ON b.ft_id = c.ft_id
+        """,
+        {"targets": targets, "game_no": current_game_no},
+    )
 
 
 # ============================================================================
@@ -481,87 +728,43 @@ def _apply_chemistry_bonus_fixed(cur, gw_code: str, current_game_no: int) -> Non
     """
     if current_game_no < 5:
         return
-    
-    # Only award at GWs 5, 10, 15, 20, 25, 30, 35 (every 5th GW)
-    # OR check if this is the completion of a new 5-GW streak
-    
-    # Get all fantasy teams
-    cur.execute("SELECT id FROM fantasy_team")
-    teams = [r["id"] for r in cur.fetchall()]
-    
-    for ft_id in teams:
-        # Check if we already awarded bonus recently
-        cur.execute(
-            """
-            SELECT gw_code, g.game_no
+
+    # Gameweeks of the 5-GW streak, and those from its start on (a bonus in
+    # any of them blocks this one). Passed as literal arrays so the planner
+    # reads only their partitions.
+    cur.execute(
+        "SELECT code, game_no FROM gameweek WHERE game_no > %s - 5",
+        (current_game_no,),
+    )
+    recent = cur.fetchall()
+    streak_gws = [r["code"] for r in recent if r["game_no"] <= current_game_no]
+    recent_gws = [r["code"] for r in recent]
+
+    # All teams at once: a player is "stable" if in the starting XI of all
+    # of the last 5 lineups; teams with 6+ stable players and no bonus in the
+    # last 4 GWs (or a later one) get +15 for this GW.
+    cur.execute(
+        """
+        INSERT INTO chemistry_bonus (ft_id, gw_code, points)
+        SELECT stable.ft_id, %(gw_code)s, 15
+        FROM (
+            SELECT fl.ft_id, s.player_id
+            FROM fantasy_lineup fl
+            CROSS JOIN LATERAL unnest(fl.player_ids[1:11]) AS s(player_id)
+            WHERE fl.gw_code = ANY(%(streak_gws)s::bpchar[])
+              AND cardinality(fl.player_ids) >= 11
+            GROUP BY fl.ft_id, s.player_id
+            HAVING COUNT(*) = 5
+        ) stable
+        WHERE NOT EXISTS (
+            SELECT 1
             FROM chemistry_bonus cb
-            JOIN gameweek g ON g.code = cb.gw_code
-            WHERE cb.ft_id = %s
-            ORDER BY g.game_no DESC
-            LIMIT 1
-            """,
-            (ft_id,),
+            WHERE cb.ft_id = stable.ft_id
+              AND cb.gw_code = ANY(%(recent_gws)s::bpchar[])
         )
-        last_bonus = cur.fetchone()
-        
-        if last_bonus:
-            last_bonus_gw = last_bonus["game_no"]
-            # Need at least 5 GWs since last bonus
-            if current_game_no - last_bonus_gw < 5:
-                continue
-            # Check the 5 GWs since last bonus
-            start_gw = last_bonus_gw + 1
-        else:
-            # First time checking - start from GW1
-            start_gw = max(1, current_game_no - 4)
-        
-        # Get the last 5 GW codes from start_gw to current
-        cur.execute(
-            """
-            SELECT code FROM gameweek
-            WHERE game_no BETWEEN %s AND %s
-            ORDER BY game_no
-            """,
-            (current_game_no - 4, current_game_no),
-        )
-        gw_rows = cur.fetchall()
-        
-        if len(gw_rows) < 5:
-            continue
-        
-        last5_codes = [r["code"] for r in gw_rows]
-        
-        # Check lineups for each of the 5 GWs
-        lineups: List[Set[int]] = []
-        valid = True
-        
-        for c in last5_codes:
-            cur.execute(
-                """
-                SELECT player_id FROM fantasy_lineup
-                WHERE ft_id = %s AND gw_code = %s AND slot BETWEEN 1 AND 11
-                """,
-                (ft_id, c),
-            )
-            rows = cur.fetchall()
-            if len(rows) < 11:
-                valid = False
-                break
-            lineups.append({r["player_id"] for r in rows})
-        
-        if not valid or not lineups:
-            continue
-        
-        # Find players who appeared in ALL 5 GWs
-        stable_players = set.intersection(*lineups)
-        
-        if len(stable_players) >= 6:
-            # Award bonus for this GW
-            cur.execute(
-                """
-                INSERT INTO chemistry_bonus (ft_id, gw_code, points)
-                VALUES (%s, %s, 15)
-                ON CONFLICT (ft_id, gw_code) DO UPDATE SET points = 15
-                """,
-                (ft_id, gw_code),
-            )
\ No newline at end of file
+        GROUP BY stable.ft_id
+        HAVING COUNT(*) >= 6
+        ON CONFLICT (ft_id, gw_code) DO UPDATE SET points = 15
+        """,
+        {"gw_code": gw_code, "streak_gws": streak_gws, "recent_gws": recent_gws},
+    )
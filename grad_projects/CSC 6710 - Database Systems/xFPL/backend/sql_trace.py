@@ -0,0 +1,124 @@
+# backend/sql_trace.py
+
+"""
+SQL tracing and N+1 detection for development / staging (SQL_TRACE=1).
+
+With tracing on, the metered cursor (db.py) also hands every statement to
+the current request's RequestTrace: its normalized shape (literals and
+parameters replaced by ?, whitespace collapsed), duration and row count.
+When the request ends, MetricsMiddleware calls finish(), which
+- logs a warning for each shape run more than SQL_TRACE_REPEAT_LIMIT
+  times (default 10): a query issued in a loop, i.e. an N+1,
+- keeps the trace in a ring buffer (GET /debug/sql-traces),
+- returns the X-DB-Queries / X-DB-Time / X-DB-Repeated response headers.
+
+Off (the default) it costs one attribute check per statement.
+Requires METRICS_ENABLED (the default), since it rides on the metered cursor.
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+enabled = os.getenv("SQL_TRACE", "0") == "1"
+REPEAT_LIMIT = int(os.getenv("SQL_TRACE_REPEAT_LIMIT", "10"))
+RECENT_TRACES = 50
+
+DB_QUERIES_HEADER = "X-DB-Queries"
+DB_TIME_HEADER = "X-DB-Time"
+DB_REPEATED_HEADER = "X-DB-Repeated"
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"%\(\w+\)s|%s")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize(query: str) -> str:
+    """Statement shape: the same query with different values maps to one string."""
+    shape = _COMMENT.sub(" ", query)
+    shape = _STRING.sub("?", shape)
+    shape = _PARAM.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _LIST.sub("(?+)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+def _query_text(query: Any) -> str:
+    if isinstance(query, bytes):
+        return query.decode("utf-8", "replace")
+    return query if isinstance(query, str) else repr(query)
+
+
+class RequestTrace:
+    __slots__ = ("statements",)
+
+    def __init__(self):
+        # (query text, seconds, rows); normalized when the request ends
+        self.statements: List[Tuple[str, float, int]] = []
+
+    def record(self, query: Any, seconds: float, rows: int) -> None:
+        self.statements.append((_query_text(query), seconds, rows))
+
+    def by_shape(self) -> List[Dict]:
+        """Statements grouped by shape, most frequent first."""
+        shapes: Dict[str, Dict] = {}
+        for query, seconds, rows in self.statements:
+            shape = normalize(query)
+            s = shapes.get(shape)
+            if s is None:
+                s = shapes[shape] = {"shape": shape, "count": 0, "seconds": 0.0, "rows": 0}
+            s["count"] += 1
+            s["seconds"] += seconds
+            s["rows"] += max(rows, 0)
+        return sorted(shapes.values(), key=lambda s: (-s["count"], -s["seconds"]))
+
+
+_recent: Deque[Dict] = deque(maxlen=RECENT_TRACES)
+_recent_lock = threading.Lock()
+
+
+def new_trace() -> Optional[RequestTrace]:
+    return RequestTrace() if enabled else None
+
+
+def finish(method: str, route: str, trace: RequestTrace, db_seconds: float) -> Dict[str, str]:
+    """Check a finished request for N+1s, keep its trace, and return the debug headers."""
+    shapes = trace.by_shape()
+    repeated = [s for s in shapes if s["count"] > REPEAT_LIMIT]
+    for s in repeated:
+        logger.warning(
+            "N+1 suspect: %s %s ran one statement %d times (%.1f ms): %s",
+            method, route, s["count"], s["seconds"] * 1000, s["shape"][:200],
+        )
+    with _recent_lock:
+        _recent.append({
+            "method": method,
+            "route": route,
+            "queries": len(trace.statements),
+            "db_ms": round(db_seconds * 1000, 3),
+            "repeated": [s["shape"] for s in repeated],
+            "shapes": [{**s, "seconds": round(s["seconds"], 6)} for s in shapes],
+        })
+    headers = {
+        DB_QUERIES_HEADER: str(len(trace.statements)),
+        DB_TIME_HEADER: f"{db_seconds * 1000:.3f}ms",
+    }
+    if repeated:
+        headers[DB_REPEATED_HEADER] = str(max(s["count"] for s in repeated))
+    return headers
+
+
+def recent_traces() -> List[Dict]:
+    """Traces of the last RECENT_TRACES requests, newest first."""
+    with _recent_lock:
+        return list(reversed(_recent))
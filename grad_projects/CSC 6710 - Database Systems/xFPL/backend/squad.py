@@ -0,0 +1,122 @@
+# backend/squad.py
+
+"""
+Squad rules for a new fantasy team, and the single statement that creates
+the team together with its starting XI.
+
+validate_squad works on player rows already in memory (see
+player_search.get_players), so creating a team costs one round trip: the
+INSERT below. "One team per manager" is left to fantasy_team's
+UNIQUE (user_id) constraint.
+"""
+
+from collections import defaultdict
+from typing import Dict, List
+
+BUDGET = 100.0
+MAX_PER_CLUB = 2
+
+CREATE_TEAM_SQL = """
+    WITH ft AS (
+        INSERT INTO fantasy_team (user_id, name)
+        VALUES (%(user_id)s, %(name)s)
+        RETURNING id, user_id, name
+    ),
+    xi AS (
+        INSERT INTO fantasy_lineup (ft_id, gw_code, player_ids, captain_slot, vice_captain_slot)
+        SELECT ft.id, %(gw_code)s, %(player_ids)s::bigint[],
+               array_position(%(player_ids)s::bigint[], %(captain_id)s::bigint),
+               array_position(%(player_ids)s::bigint[], %(vice_captain_id)s::bigint)
+        FROM ft
+    )
+    -- New teams join /standings: bump its data version (response_cache.FANTASY_TEAM)
+    SELECT ft.id, ft.user_id, ft.name, v.version AS data_version
+    FROM ft
+    CROSS JOIN bump_data_version('fantasy_team') AS v
+"""
+
+
+def position_group(position: str) -> str:
+    pos = (position or "").strip().upper()
+    if pos in ("GK", "GKP"):
+        return "GK"
+    if pos in ("FWD", "FW", "F"):
+        return "FWD"
+    return pos
+
+
+def validate_squad(players: List[Dict]) -> Dict:
+    """
+    Check an XI against the budget, club and formation rules.
+    Returns total cost and formation counts; raises ValueError on the first
+    broken rule.
+    """
+    total_cost = 0.0
+    per_team = defaultdict(int)
+    pos_counts = defaultdict(int)
+
+    for p in players:
+        total_cost += float(p["cost"])
+        per_team[p["team_code"]] += 1
+        pos_counts[position_group(p["position"])] += 1
+
+    # Budget rule
+    if total_cost > BUDGET:
+        raise ValueError(f"Budget exceeded: {total_cost:.1f}M used (max {BUDGET:.0f}M).")
+
+    # Max 2 per real club
+    over_rep = [tc for tc, c in per_team.items() if c > MAX_PER_CLUB]
+    if over_rep:
+        raise ValueError(
+            "Too many players from the same club: "
+            + ", ".join(f"{tc} ({per_team[tc]})" for tc in over_rep)
+        )
+
+    # ===== FORMATION CONSTRAINTS =====
+    gk_count = pos_counts.get("GK", 0)
+    if gk_count != 1:
+        raise ValueError(f"Your XI must contain exactly 1 goalkeeper (currently {gk_count}).")
+
+    def_count = pos_counts.get("DEF", 0)
+    if def_count < 3:
+        raise ValueError(f"Your XI must contain at least 3 defenders (currently {def_count}).")
+
+    mid_count = pos_counts.get("MID", 0)
+    if mid_count < 2:
+        raise ValueError(f"Your XI must contain at least 2 midfielders (currently {mid_count}).")
+
+    fwd_count = pos_counts.get("FWD", 0)
+    if fwd_count < 1:
+        raise ValueError(f"Your XI must contain at least 1 forward (currently {fwd_count}).")
+
+    return {
+        "total_cost": total_cost,
+        "formation": {"GK": gk_count, "DEF": def_count, "MID": mid_count, "FWD": fwd_count},
+    }
+
+
+def insert_team(
+    cur,
+    user_id: int,
+    name: str,
+    gw_code: str,
+    player_ids: List[int],
+    captain_id: int,
+    vice_captain_id: int,
+) -> Dict:
+    """
+    Create the team and its XI (slots follow player_ids order) in one statement.
+    The returned row also carries the bumped 'fantasy_team' data_version.
+    """
+    cur.execute(
+        CREATE_TEAM_SQL,
+        {
+            "user_id": user_id,
+            "name": name,
+            "gw_code": gw_code,
+            "player_ids": player_ids,
+            "captain_id": captain_id,
+            "vice_captain_id": vice_captain_id,
+        },
+    )
+    return cur.fetchone()
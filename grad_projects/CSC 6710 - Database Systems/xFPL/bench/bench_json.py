@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON serialization of the largest list responses.
+
+For each case the same query is run and encoded two ways, alternating
+rounds so drift in the database affects both alike:
+- default: RealDictCursor rows (Decimal costs), jsonable_encoder, json.dumps
+  (what FastAPI does with a returned list)
+- fast:    fast_json.cursor tuple rows, fast_json.encode_rows (orjson if
+  installed)
+and the median fetch + encode and encode-only times are reported, plus the
+gzip size and cost of the body. Cases: /players?limit=1000, a 1000-row
+/standings page and the fixture list of the largest league (run
+generate_season.py first for realistic sizes).
+
+Then the three endpoints are timed in-process (FastAPI TestClient, response
+cache emptied before each request) with and without Accept-Encoding: gzip.
+
+Nothing is written to the database.
+
+Usage:
+    python bench_json.py
+    python bench_json.py --repeat 200 --rounds 10
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import fast_json  # noqa: E402
+import main as api  # noqa: E402
+from db import get_conn  # noqa: E402
+from player_search import build_player_query  # noqa: E402
+from response_cache import response_cache  # noqa: E402
+
+STANDINGS_SQL = """
+    SELECT s.ft_id, ft.name AS team_name, COALESCE(u.username, 'Unknown') AS username, s.total_points
+    FROM standings_snapshot s
+    JOIN fantasy_team ft ON ft.id = s.ft_id
+    LEFT JOIN app_user u ON u.id = ft.user_id
+    WHERE s.gw_code = %s
+    ORDER BY s.total_points DESC, s.ft_id
+    LIMIT 1000
+"""
+
+FIXTURES_SQL = """
+    SELECT f.id, f.gw_code, f.home_ft_id, fh.name AS home_name, fa.name AS away_name, f.away_ft_id
+    FROM fantasy_fixture f
+    JOIN fantasy_team fh ON fh.id = f.home_ft_id
+    JOIN fantasy_team fa ON fa.id = f.away_ft_id
+    WHERE f.league_id = %s
+    ORDER BY f.gw_code, f.id
+"""
+
+
+def pick_ids(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT gw_code FROM standings_snapshot ORDER BY gw_code DESC LIMIT 1")
+        gw = cur.fetchone()
+        cur.execute(
+            "SELECT league_id FROM fantasy_fixture GROUP BY league_id ORDER BY COUNT(*) DESC LIMIT 1"
+        )
+        league = cur.fetchone()
+    conn.commit()
+    if gw is None or league is None:
+        raise SystemExit("Needs standings and league fixtures (generate_season.py).")
+    return gw["gw_code"], league["league_id"]
+
+
+def default_encode(rows):
+    return json.dumps(
+        jsonable_encoder(rows), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def run_default(conn, sql, params):
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    t0 = time.perf_counter()
+    body = default_encode(rows)
+    return body, time.perf_counter() - t0
+
+
+def run_fast(conn, sql, params):
+    with fast_json.cursor(conn) as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+        names = fast_json.columns(cur)
+    t0 = time.perf_counter()
+    body = fast_json.encode_rows(names, rows)
+    return body, time.perf_counter() - t0
+
+
+def time_path(conn, run, sql, params, n):
+    """Median (fetch + encode, encode only) seconds over n runs."""
+    total, encode = [], []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        body, enc = run(conn, sql, params)
+        total.append(time.perf_counter() - t0)
+        encode.append(enc)
+    conn.commit()
+    return statistics.median(total), statistics.median(encode), body
+
+
+def time_endpoint(client, path, params, headers, n):
+    samples = []
+    for _ in range(n):
+        response_cache.clear()
+        t0 = time.perf_counter()
+        resp = client.get(path, params=params, headers=headers)
+        samples.append(time.perf_counter() - t0)
+        resp.raise_for_status()
+    return statistics.median(samples), resp
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=50, help="runs per round")
+    ap.add_argument("--rounds", type=int, default=5, help="rounds per path")
+    args = ap.parse_args()
+
+    conn = get_conn()
+    try:
+        gw_code, league_id = pick_ids(conn)
+        players_sql, players_params = build_player_query(limit=1000)
+        cases = [
+            ("/players?limit=1000", players_sql, players_params),
+            (f"/standings/{gw_code} (1000 rows)", STANDINGS_SQL, (gw_code,)),
+            (f"/leagues/{league_id}/fixtures", FIXTURES_SQL, (league_id,)),
+        ]
+        print(f"encoder: {'orjson' if fast_json.orjson is not None else 'json (orjson not installed)'}\n")
+        print(f"{'case':<34} {'path':<8} {'fetch+enc ms':>13} {'encode ms':>10} {'bytes':>8} "
+              f"{'gzip bytes':>11} {'gzip ms':>8}")
+        for name, sql, params in cases:
+            results = {"default": [], "fast": []}
+            bodies = {}
+            for _ in range(args.rounds):
+                for path, run in (("default", run_default), ("fast", run_fast)):
+                    total, encode, bodies[path] = time_path(conn, run, sql, params, args.repeat)
+                    results[path].append((total, encode))
+            if bodies["default"] != bodies["fast"]:
+                print(f"{name}: bodies differ")
+            for path, samples in results.items():
+                body = bodies[path]
+                t0 = time.perf_counter()
+                packed = gzip.compress(body, fast_json.GZIP_LEVEL)
+                gzip_ms = (time.perf_counter() - t0) * 1000
+                print(
+                    f"{name:<34} {path:<8} {statistics.median(s[0] for s in samples) * 1000:>13.3f} "
+                    f"{statistics.median(s[1] for s in samples) * 1000:>10.3f} {len(body):>8} "
+                    f"{len(packed):>11} {gzip_ms:>8.3f}"
+                )
+    finally:
+        conn.close()
+
+    client = TestClient(api.app)
+    endpoints = [
+        ("/players", {"limit": 1000}),
+        (f"/standings/{gw_code}", {"limit": 1000}),
+        (f"/leagues/{league_id}/fixtures", {}),
+    ]
+    print(f"\n{'endpoint (cache emptied)':<34} {'identity ms':>12} {'gzip ms':>8} {'wire bytes':>11} {'gzip wire':>10}")
+    with client:
+        for path, params in endpoints:
+            client.get(path, params=params)  # warm up
+            plain, resp = time_endpoint(client, path, params, {"Accept-Encoding": "identity"}, args.repeat)
+            packed, gz = time_endpoint(client, path, params, {"Accept-Encoding": "gzip"}, args.repeat)
+            wire = gz.headers.get("content-length") if gz.headers.get("content-encoding") == "gzip" else "-"
+            print(f"{path:<34} {plain * 1000:>12.3f} {packed * 1000:>8.3f} "
+                  f"{resp.headers.get('content-length'):>11} {wire:>10}")
+
+
+if __name__ == "__main__":
+    main()
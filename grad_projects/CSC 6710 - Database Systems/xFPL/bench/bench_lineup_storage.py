@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Benchmark lineup storage: one row per slot vs one row per lineup
+(migration 004).
+
+A season of lineups for --teams teams (38 GWs, a few transfers most weeks)
+is generated once and stored in two scratch schemas:
+- rows:    the old layout, 11 rows per lineup with its PK / UNIQUE /
+           gw / player / partial captain indexes and v_fantasy_standings
+- compact: fantasy_lineup as it is now (player_ids[] + captain/vice slot)
+
+For each layout the script reports table + index size, the time to carry
+every lineup to the next GW, and the time to score the last GW: the
+chemistry bonus and the standings snapshot, using the pre-004 code for
+"rows" and simulate_gameweek for "compact". Both must produce the same
+bonuses and standings.
+
+Player points are random. The live tables are never touched; the scratch
+schemas are dropped at the end unless --keep is given.
+
+Usage:
+    python bench_lineup_storage.py                   # 10k teams
+    python bench_lineup_storage.py --teams 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List, Set
+
+from psycopg2.extras import execute_values
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from db import get_conn  # noqa: E402
+from simulate_gameweek import _apply_chemistry_bonus_fixed, refresh_standings_snapshot  # noqa: E402
+
+COMMON = "bench_lineup_common"
+ROWS = "bench_lineup_rows"
+COMPACT = "bench_lineup_compact"
+
+LAST_GW = "GW38"
+LAST_GW_NO = 38
+
+# fantasy_lineup and v_fantasy_standings as they were before migration 004
+ROWS_DDL = """
+CREATE TABLE {schema}.fantasy_lineup (
+    ft_id           BIGINT NOT NULL,
+    gw_code         CHAR(4) NOT NULL,
+    player_id       BIGINT NOT NULL,
+    slot            SMALLINT NOT NULL CHECK (slot BETWEEN 1 AND 15),
+    captain         BOOLEAN NOT NULL DEFAULT FALSE,
+    vice_captain    BOOLEAN NOT NULL DEFAULT FALSE,
+
+    PRIMARY KEY (ft_id, gw_code, slot),
+    UNIQUE (ft_id, gw_code, player_id)
+);
+CREATE INDEX ON {schema}.fantasy_lineup(gw_code);
+CREATE INDEX ON {schema}.fantasy_lineup(player_id);
+CREATE UNIQUE INDEX ON {schema}.fantasy_lineup(ft_id, gw_code) WHERE captain;
+CREATE UNIQUE INDEX ON {schema}.fantasy_lineup(ft_id, gw_code) WHERE vice_captain;
+
+CREATE VIEW {schema}.v_fantasy_standings AS
+SELECT
+    ft.id AS ft_id,
+    ft.name AS team_name,
+    u.username,
+    fl.gw_code,
+    COALESCE(SUM(pp.points), 0) AS gw_player_points,
+    COALESCE(MAX(cb.points), 0) AS gw_bonus_points,
+    COALESCE(SUM(pp.points), 0) + COALESCE(MAX(cb.points), 0) AS gw_total_points
+FROM {common}.fantasy_team ft
+LEFT JOIN {common}.app_user u ON u.id = ft.user_id
+LEFT JOIN {schema}.fantasy_lineup fl ON fl.ft_id = ft.id AND fl.slot BETWEEN 1 AND 11
+LEFT JOIN {common}.player_points pp ON pp.player_id = fl.player_id AND pp.gw_code = fl.gw_code
+LEFT JOIN {schema}.chemistry_bonus cb ON cb.ft_id = ft.id AND cb.gw_code = fl.gw_code
+WHERE fl.gw_code IS NOT NULL
+GROUP BY ft.id, ft.name, u.username, fl.gw_code;
+"""
+
+
+# ---------------------------------------------------------------------------
+# Scoring as it was before migration 004 (simulate_gameweek.py)
+# ---------------------------------------------------------------------------
+
+def legacy_refresh_standings_snapshot(cur, gw_code: str, current_game_no: int) -> None:
+    cur.execute(
+        """
+        SELECT code FROM gameweek g
+        WHERE g.code = %s
+           OR (g.game_no > %s
+               AND EXISTS (SELECT 1 FROM standings_snapshot s WHERE s.gw_code = g.code))
+        """,
+        (gw_code, current_game_no),
+    )
+    targets = [r["code"] for r in cur.fetchall()]
+
+    cur.execute("DELETE FROM standings_snapshot WHERE gw_code = ANY(%s::bpchar[])", (targets,))
+    cur.execute(
+        """
+        INSERT INTO standings_snapshot (gw_code, ft_id, gw_points, total_points)
+        SELECT c.gw_code, c.ft_id, c.gw_points, c.total_points
+        FROM (
+            SELECT
+                g.code AS gw_code,
+                ft.id AS ft_id,
+                COALESCE(v.gw_total_points, 0) AS gw_points,
+                SUM(COALESCE(v.gw_total_points, 0))
+                    OVER (PARTITION BY ft.id ORDER BY g.game_no) AS total_points
+            FROM fantasy_team ft
+            CROSS JOIN gameweek g
+            LEFT JOIN v_fantasy_standings v ON v.ft_id = ft.id AND v.gw_code = g.code
+            WHERE g.game_no <= (
+                SELECT MAX(game_no) FROM gameweek WHERE code = ANY(%s::bpchar[])
+            )
+        ) c
+        WHERE c.gw_code = ANY(%s::bpchar[])
+        """,
+        (targets, targets),
+    )
+
+
+def legacy_apply_chemistry_bonus(cur, gw_code: str, current_game_no: int) -> None:
+    if current_game_no < 5:
+        return
+
+    cur.execute("SELECT id FROM fantasy_team")
+    teams = [r["id"] for r in cur.fetchall()]
+
+    for ft_id in teams:
+        cur.execute(
+            """
+            SELECT gw_code, g.game_no
+            FROM chemistry_bonus cb
+            JOIN gameweek g ON g.code = cb.gw_code
+            WHERE cb.ft_id = %s
+            ORDER BY g.game_no DESC
+            LIMIT 1
+            """,
+            (ft_id,),
+        )
+        last_bonus = cur.fetchone()
+        if last_bonus and current_game_no - last_bonus["game_no"] < 5:
+            continue
+
+        cur.execute(
+            """
+            SELECT code FROM gameweek
+            WHERE game_no BETWEEN %s AND %s
+            ORDER BY game_no
+            """,
+            (current_game_no - 4, current_game_no),
+        )
+        gw_rows = cur.fetchall()
+        if len(gw_rows) < 5:
+            continue
+
+        lineups: List[Set[int]] = []
+        valid = True
+        for r in gw_rows:
+            cur.execute(
+                """
+                SELECT player_id FROM fantasy_lineup
+                WHERE ft_id = %s AND gw_code = %s AND slot BETWEEN 1 AND 11
+                """,
+                (ft_id, r["code"]),
+            )
+            rows = cur.fetchall()
+            if len(rows) < 11:
+                valid = False
+                break
+            lineups.append({r["player_id"] for r in rows})
+
+        if valid and lineups and len(set.intersection(*lineups)) >= 6:
+            cur.execute(
+                """
+                INSERT INTO chemistry_bonus (ft_id, gw_code, points)
+                VALUES (%s, %s, 15)
+                ON CONFLICT (ft_id, gw_code) DO UPDATE SET points = 15
+                """,
+                (ft_id, gw_code),
+            )
+
+
+# ---------------------------------------------------------------------------
+# Data
+# ---------------------------------------------------------------------------
+
+def season_lineups(player_ids, gw_codes, n_teams, rng):
+    """(ft_id, gw_code, player_ids, captain_slot, vice_captain_slot) for every team and GW."""
+    for ft_id in range(1, n_teams + 1):
+        xi = rng.sample(player_ids, 11)
+        captain, vice = rng.sample(range(1, 12), 2)
+        for gw in gw_codes:
+            yield (ft_id, gw, list(xi), captain, vice)
+            # 1-2 transfers in about a third of the gameweeks
+            if rng.random() < 0.35:
+                for _ in range(rng.randint(1, 2)):
+                    p = rng.choice(player_ids)
+                    if p not in xi:
+                        xi[rng.randrange(11)] = p
+
+
+def build_schemas(cur, n_teams: int) -> None:
+    for schema in (COMMON, ROWS, COMPACT):
+        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cur.execute(f"CREATE SCHEMA {schema}")
+
+    for table in ("app_user", "fantasy_team", "player_points"):
+        cur.execute(f"CREATE TABLE {COMMON}.{table} (LIKE public.{table} INCLUDING ALL)")
+    cur.execute(
+        f"""
+        INSERT INTO {COMMON}.fantasy_team (id, user_id, name) OVERRIDING SYSTEM VALUE
+        SELECT i, i, 'Bench ' || i FROM generate_series(1, %s) AS i
+        """,
+        (n_teams,),
+    )
+    cur.execute(
+        f"""
+        INSERT INTO {COMMON}.player_points (player_id, gw_code, points)
+        SELECT p.id, g.code, floor(random() * 13)::INT
+        FROM public.player p CROSS JOIN public.gameweek g
+        """
+    )
+
+    for schema in (ROWS, COMPACT):
+        for table in ("chemistry_bonus", "standings_snapshot"):
+            cur.execute(f"CREATE TABLE {schema}.{table} (LIKE public.{table} INCLUDING ALL)")
+    cur.execute(f"CREATE TABLE {COMPACT}.fantasy_lineup (LIKE public.fantasy_lineup INCLUDING ALL)")
+    cur.execute(ROWS_DDL.format(schema=ROWS, common=COMMON))
+
+
+def load_lineups(cur, n_teams: int, seed: int) -> None:
+    cur.execute("SELECT id FROM public.player ORDER BY id")
+    player_ids = [r["id"] for r in cur.fetchall()]
+    cur.execute("SELECT code FROM public.gameweek ORDER BY game_no")
+    gw_codes = [r["code"] for r in cur.fetchall()]
+
+    execute_values(
+        cur,
+        f"""
+        INSERT INTO {COMPACT}.fantasy_lineup (ft_id, gw_code, player_ids, captain_slot, vice_captain_slot)
+        VALUES %s
+        """,
+        season_lineups(player_ids, gw_codes, n_teams, random.Random(seed)),
+        template="(%s, %s, %s::bigint[], %s, %s)",
+        page_size=5000,
+    )
+    cur.execute(
+        f"""
+        INSERT INTO {ROWS}.fantasy_lineup (ft_id, gw_code, player_id, slot, captain, vice_captain)
+        SELECT fl.ft_id, fl.gw_code, s.player_id, s.slot,
+               s.slot = fl.captain_slot, s.slot = fl.vice_captain_slot
+        FROM {COMPACT}.fantasy_lineup fl
+        CROSS JOIN LATERAL unnest(fl.player_ids) WITH ORDINALITY AS s(player_id, slot)
+        """
+    )
+
+
+# ---------------------------------------------------------------------------
+# Workloads
+# ---------------------------------------------------------------------------
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return round(time.perf_counter() - t0, 2)
+
+
+def storage(cur, schema: str):
+    cur.execute(
+        f"""
+        SELECT
+            (SELECT COUNT(*) FROM {schema}.fantasy_lineup) AS n_rows,
+            pg_relation_size('{schema}.fantasy_lineup') AS heap_bytes,
+            pg_total_relation_size('{schema}.fantasy_lineup') AS total_bytes
+        """
+    )
+    return cur.fetchone()
+
+
+def run_variant(conn, schema: str, chemistry, snapshot, carry_sql: str, incremental: bool):
+    cur = conn.cursor()
+    cur.execute(f"SET search_path TO {schema}, {COMMON}, public")
+    conn.commit()
+
+    result = {"schema": schema, **storage(cur, schema)}
+
+    def carry():
+        cur.execute(carry_sql)
+        conn.commit()
+
+    result["carry_s"] = timed(carry)
+    cur.execute("DELETE FROM fantasy_lineup WHERE gw_code = 'GW39'")
+    conn.commit()
+
+    # The incremental snapshot continues from the previous GW's, as a season
+    # scored week by week would have it; the legacy one recomputes history.
+    if incremental:
+        for game_no in range(1, LAST_GW_NO):
+            snapshot(cur, f"GW{game_no:02d}", game_no)
+        conn.commit()
+
+    def score_chemistry():
+        chemistry(cur, LAST_GW, LAST_GW_NO)
+        conn.commit()
+
+    def score_snapshot():
+        snapshot(cur, LAST_GW, LAST_GW_NO)
+        conn.commit()
+
+    result["chemistry_s"] = timed(score_chemistry)
+    result["snapshot_s"] = timed(score_snapshot)
+
+    cur.execute("RESET search_path")
+    conn.commit()
+    cur.close()
+    return result
+
+
+def same_results(cur) -> bool:
+    cur.execute(
+        f"""
+        SELECT
+            (SELECT COUNT(*) FROM (
+                (SELECT * FROM {ROWS}.chemistry_bonus EXCEPT SELECT * FROM {COMPACT}.chemistry_bonus)
+                UNION ALL
+                (SELECT * FROM {COMPACT}.chemistry_bonus EXCEPT SELECT * FROM {ROWS}.chemistry_bonus)
+            ) d) AS bonus_diff,
+            (SELECT COUNT(*) FROM (
+                (SELECT * FROM {ROWS}.standings_snapshot WHERE gw_code = %(gw)s
+                 EXCEPT SELECT * FROM {COMPACT}.standings_snapshot WHERE gw_code = %(gw)s)
+                UNION ALL
+                (SELECT * FROM {COMPACT}.standings_snapshot WHERE gw_code = %(gw)s
+                 EXCEPT SELECT * FROM {ROWS}.standings_snapshot WHERE gw_code = %(gw)s)
+            ) d) AS snapshot_diff
+        """,
+        {"gw": LAST_GW},
+    )
+    row = cur.fetchone()
+    return row["bonus_diff"] == 0 and row["snapshot_diff"] == 0
+
+
+def run(n_teams: int, seed: int = 42, keep: bool = False):
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                build_schemas(cur, n_teams)
+                load_lineups(cur, n_teams, seed)
+
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            for schema in (COMMON, ROWS, COMPACT):
+                cur.execute(f"VACUUM ANALYZE {schema}.fantasy_lineup" if schema != COMMON
+                            else f"ANALYZE {COMMON}.player_points")
+        conn.autocommit = False
+
+        results = [
+            run_variant(
+                conn, ROWS, legacy_apply_chemistry_bonus, legacy_refresh_standings_snapshot,
+                """
+                INSERT INTO fantasy_lineup (ft_id, gw_code, player_id, slot, captain, vice_captain)
+                SELECT ft_id, 'GW39', player_id, slot, captain, vice_captain
+                FROM fantasy_lineup
+                WHERE gw_code = 'GW38'
+                """,
+                incremental=False,
+            ),
+            run_variant(
+                conn, COMPACT, _apply_chemistry_bonus_fixed, refresh_standings_snapshot,
+                """
+                INSERT INTO fantasy_lineup (ft_id, gw_code, player_ids, captain_slot, vice_captain_slot)
+                SELECT ft_id, 'GW39', player_ids, captain_slot, vice_captain_slot
+                FROM fantasy_lineup
+                WHERE gw_code = 'GW38'
+                """,
+                incremental=True,
+            ),
+        ]
+
+        with conn:
+            with conn.cursor() as cur:
+                match = same_results(cur)
+                if not keep:
+                    for schema in (COMMON, ROWS, COMPACT):
+                        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    finally:
+        conn.close()
+    return results, match
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--teams", type=int, default=10_000)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--keep", action="store_true", help="keep the scratch schemas")
+    args = ap.parse_args()
+
+    results, match = run(args.teams, args.seed, args.keep)
+
+    print(f"\n{args.teams} teams x 38 GWs; scoring = {LAST_GW}")
+    print(
+        f"{'layout':<22} {'rows':>10} {'heap MB':>8} {'total MB':>9} "
+        f"{'carry s':>8} {'chem s':>8} {'snap s':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['schema']:<22} {r['n_rows']:>10} {r['heap_bytes'] / 2**20:>8.1f} "
+            f"{r['total_bytes'] / 2**20:>9.1f} {r['carry_s']:>8.2f} "
+            f"{r['chemistry_s']:>8.2f} {r['snapshot_s']:>8.2f}"
+        )
+    print(f"same bonuses and standings: {'yes' if match else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
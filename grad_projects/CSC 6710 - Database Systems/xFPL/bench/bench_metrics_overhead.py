@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cost of the /metrics instrumentation (MetricsMiddleware plus
+the metered cursor and connection from db.get_conn).
+
+Runs read-only requests against the app in-process (FastAPI TestClient),
+alternating rounds with metrics.enabled on and off so drift in the
+database affects both sides alike, and reports the median per-request
+time of each side and the overhead. Cases:
+- a 304 from the response cache (no database: the worst case for overhead)
+- /players (one query) and /dashboard (two queries, one connection)
+
+Nothing is written to the database.
+
+Usage:
+    python bench_metrics_overhead.py
+    python bench_metrics_overhead.py --requests 500 --rounds 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main as api  # noqa: E402
+import metrics  # noqa: E402
+from db import get_conn  # noqa: E402
+
+
+def pick_ids():
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT code FROM gameweek ORDER BY game_no LIMIT 1")
+            gw = cur.fetchone()
+            cur.execute("SELECT ft_id FROM fantasy_lineup WHERE gw_code = %s LIMIT 1", (gw["code"],))
+            ft = cur.fetchone()
+    finally:
+        conn.close()
+    return gw["code"], (ft["ft_id"] if ft else 0)
+
+
+def time_requests(client, request, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        request(client)
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=300, help="requests per round")
+    ap.add_argument("--rounds", type=int, default=8, help="rounds per side (on / off)")
+    args = ap.parse_args()
+
+    gw_code, ft_id = pick_ids()
+    client = TestClient(api.app)
+    with client:
+        etag = client.get(f"/epl-table/{gw_code}").headers["etag"]
+        cases = [
+            ("304 /epl-table (cache)",
+             lambda c: c.get(f"/epl-table/{gw_code}", headers={"If-None-Match": etag})),
+            ("/players?limit=50", lambda c: c.get("/players", params={"limit": 50})),
+            (f"/dashboard/{ft_id}/{gw_code}", lambda c: c.get(f"/dashboard/{ft_id}/{gw_code}")),
+        ]
+
+        print(f"{'case':<30} {'off (ms)':>10} {'on (ms)':>10} {'overhead':>10}")
+        for name, request in cases:
+            time_requests(client, request, max(1, args.requests // 10))  # warm up
+            samples = {True: [], False: []}
+            for _ in range(args.rounds):
+                for flag in (False, True):
+                    metrics.enabled = flag
+                    samples[flag].append(time_requests(client, request, args.requests))
+            metrics.enabled = True
+            off = statistics.median(samples[False])
+            on = statistics.median(samples[True])
+            print(f"{name:<30} {off * 1000:>10.3f} {on * 1000:>10.3f} {(on / off - 1) * 100:>9.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Benchmark gameweek partitioning of the per-GW tables.
+
+fantasy_lineup / player_points / chemistry_bonus / fantasy_fixture are built
+twice in scratch schemas, flat (one heap + a gw_code index, the layout before
+partitioning) and LIST-partitioned by gw_code (create_gameweek_partitions),
+and filled with --teams lineups for every gameweek. For each standings /
+scoring query the script reports the partitions the planner keeps and the
+median time in both layouts, then ends the season in each: DELETE on the
+flat tables vs CALL archive_season() on the partitioned ones.
+
+Requires migration 005 (create_gameweek_partitions / archive_season). The
+live tables are never touched (archive_season() runs against empty scratch
+copies of transfer, match, gameweek, ...); archived tables and the scratch
+schemas are dropped at the end unless --keep is given.
+
+Usage:
+    python bench_partition_pruning.py                # 10k teams x 38 GWs
+    python bench_partition_pruning.py --teams 2000 --runs 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from db import get_conn  # noqa: E402
+
+FLAT = "bench_partitions_flat"
+LIST = "bench_partitions_list"
+TABLES = ("fantasy_lineup", "player_points", "chemistry_bonus", "fantasy_fixture")
+# Also archived / reset by archive_season(): empty stand-ins in LIST, so the
+# call (run with search_path LIST, public) never reaches the live ones
+SEASON_TABLES = ("transfer", "standings_snapshot", "epl_table_snapshot", "match", "gameweek", "data_version")
+SEASON = "bench"
+
+GW = "GW20"
+STREAK = ["GW16", "GW17", "GW18", "GW19", "GW20"]
+
+# The gameweek-scoped reads of the API and of simulate_gameweek.py
+QUERIES = [
+    (
+        "gw standings",
+        """
+        SELECT fl.ft_id, COALESCE(SUM(pp.points), 0) + COALESCE(MAX(cb.points), 0) AS gw_total_points
+        FROM fantasy_lineup fl
+        CROSS JOIN LATERAL unnest(fl.player_ids[1:11]) AS s(player_id)
+        LEFT JOIN player_points pp ON pp.player_id = s.player_id AND pp.gw_code = fl.gw_code
+        LEFT JOIN chemistry_bonus cb ON cb.ft_id = fl.ft_id AND cb.gw_code = fl.gw_code
+        WHERE fl.gw_code = %(gw)s
+        GROUP BY fl.ft_id
+        """,
+    ),
+    (
+        "points breakdown",
+        """
+        SELECT s.slot, s.player_id, COALESCE(pp.points, 0) AS raw_points
+        FROM fantasy_lineup fl
+        CROSS JOIN LATERAL unnest(fl.player_ids) WITH ORDINALITY AS s(player_id, slot)
+        LEFT JOIN player_points pp ON pp.player_id = s.player_id AND pp.gw_code = fl.gw_code
+        WHERE fl.ft_id = %(ft_id)s AND fl.gw_code = %(gw)s AND s.slot BETWEEN 1 AND 11
+        """,
+    ),
+    (
+        "snapshot lineup_points",
+        """
+        SELECT fl.ft_id, fl.gw_code, SUM(pp.points) AS points
+        FROM fantasy_lineup fl
+        CROSS JOIN LATERAL unnest(fl.player_ids[1:11]) AS s(player_id)
+        JOIN player_points pp ON pp.player_id = s.player_id AND pp.gw_code = fl.gw_code
+        WHERE fl.gw_code = ANY(%(targets)s::bpchar[])
+          AND pp.gw_code = ANY(%(targets)s::bpchar[])
+        GROUP BY fl.ft_id, fl.gw_code
+        """,
+    ),
+    (
+        "chemistry window",
+        """
+        SELECT fl.ft_id, s.player_id
+        FROM fantasy_lineup fl
+        CROSS JOIN LATERAL unnest(fl.player_ids[1:11]) AS s(player_id)
+        WHERE fl.gw_code = ANY(%(streak)s::bpchar[])
+        GROUP BY fl.ft_id, s.player_id
+        HAVING COUNT(*) = 5
+        """,
+    ),
+    (
+        "chemistry lookup",
+        "SELECT points FROM chemistry_bonus WHERE ft_id = %(ft_id)s AND gw_code = %(gw)s",
+    ),
+    (
+        "league fixtures gw",
+        """
+        SELECT id, home_ft_id, away_ft_id FROM fantasy_fixture
+        WHERE league_id = %(league_id)s AND gw_code = %(gw)s
+        """,
+    ),
+]
+
+
+def build_schemas(cur) -> None:
+    for schema in (FLAT, LIST):
+        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cur.execute(f"CREATE SCHEMA {schema}")
+
+    for table in TABLES:
+        cur.execute(f"CREATE TABLE {FLAT}.{table} (LIKE public.{table} INCLUDING ALL)")
+        cur.execute(f"CREATE INDEX ON {FLAT}.{table}(gw_code)")
+        cur.execute(
+            f"CREATE TABLE {LIST}.{table} (LIKE public.{table} INCLUDING ALL) PARTITION BY LIST (gw_code)"
+        )
+        cur.execute("SELECT create_gameweek_partitions(%s::regclass)", (f"{LIST}.{table}",))
+
+    for table in SEASON_TABLES:
+        cur.execute(f"CREATE TABLE {LIST}.{table} (LIKE public.{table} INCLUDING ALL)")
+    cur.execute(f"CREATE SEQUENCE {LIST}.data_version_seq")
+
+
+def fill(cur, n_teams: int) -> dict:
+    """Synthetic season in the flat schema, copied into the partitioned one."""
+    # Team t's XI in GW g is a window of the player list that shifts every
+    # 7 GWs, so lineups vary but some stay put for 5+ GWs (chemistry).
+    cur.execute(
+        f"""
+        WITH p AS (SELECT array_agg(id ORDER BY id) AS ids FROM player)
+        INSERT INTO {FLAT}.fantasy_lineup (ft_id, gw_code, player_ids, captain_slot, vice_captain_slot)
+        SELECT
+            t,
+            g.code,
+            p.ids[o:o + 10],
+            1,
+            2
+        FROM generate_series(1, %s) AS t
+        CROSS JOIN gameweek g
+        CROSS JOIN p
+        CROSS JOIN LATERAL (
+            SELECT 1 + (t * 11 + (g.game_no / 7) * 3) %% (cardinality(p.ids) - 11) AS o
+        ) w
+        """,
+        (n_teams,),
+    )
+    cur.execute(
+        f"""
+        INSERT INTO {FLAT}.player_points (player_id, gw_code, points)
+        SELECT p.id, g.code, (hashtext(p.id || g.code) & 15) - 2
+        FROM player p CROSS JOIN gameweek g
+        """
+    )
+    cur.execute(
+        f"""
+        INSERT INTO {FLAT}.chemistry_bonus (ft_id, gw_code, points)
+        SELECT t, g.code, 15
+        FROM generate_series(1, %s, 3) AS t
+        CROSS JOIN gameweek g
+        WHERE g.game_no %% 5 = 0
+        """,
+        (n_teams,),
+    )
+    # 20-team leagues, round-robin-ish pairs every GW
+    cur.execute(
+        f"""
+        INSERT INTO {FLAT}.fantasy_fixture (league_id, gw_code, home_ft_id, away_ft_id)
+        SELECT (t - 1) / 20 + 1, g.code, t, t + 1
+        FROM generate_series(1, %s, 2) AS t
+        CROSS JOIN gameweek g
+        """,
+        (n_teams - 1,),
+    )
+
+    counts = {}
+    for table in TABLES:
+        # fantasy_fixture.id is an identity column; keep the flat copy's ids
+        overriding = "OVERRIDING SYSTEM VALUE" if table == "fantasy_fixture" else ""
+        cur.execute(f"INSERT INTO {LIST}.{table} {overriding} SELECT * FROM {FLAT}.{table}")
+        cur.execute(f"ANALYZE {FLAT}.{table}")
+        cur.execute(f"ANALYZE {LIST}.{table}")
+        cur.execute(f"SELECT COUNT(*) AS n FROM {FLAT}.{table}")
+        counts[table] = cur.fetchone()["n"]
+    return counts
+
+
+def scanned_partitions(cur, sql: str, params: dict) -> dict:
+    """{parent table: partitions kept} from the plan."""
+    cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    plan = cur.fetchone()["QUERY PLAN"][0]["Plan"]
+
+    seen = set()
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        rel = node.get("Relation Name")
+        if rel:
+            seen.add(rel)
+        stack.extend(node.get("Plans", []))
+
+    kept = {}
+    for table in TABLES:
+        parts = [r for r in seen if r.startswith(table + "_gw") or r == table + "_default"]
+        if parts:
+            kept[table] = len(parts)
+    return kept
+
+
+def time_query(cur, sql: str, params: dict, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+def run(n_teams: int, runs: int, keep: bool = False):
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT to_regprocedure('archive_season(text)') IS NOT NULL AS ok")
+                if not cur.fetchone()["ok"]:
+                    raise SystemExit("archive_season() not found - apply db/migrations/005_gameweek_partitions.sql")
+                cur.execute("SELECT to_regnamespace('archive') IS NOT NULL AS ok")
+                had_archive = cur.fetchone()["ok"]
+                build_schemas(cur)
+
+        t0 = time.perf_counter()
+        with conn:
+            with conn.cursor() as cur:
+                counts = fill(cur, n_teams)
+        fill_s = time.perf_counter() - t0
+
+        params = {
+            "gw": GW,
+            "streak": STREAK,
+            "targets": [GW],
+            "ft_id": n_teams // 2,
+            "league_id": 1,
+        }
+        queries = []
+        with conn:
+            with conn.cursor() as cur:
+                for label, sql in QUERIES:
+                    cur.execute(f"SET LOCAL search_path TO {LIST}, public")
+                    kept = scanned_partitions(cur, sql, params)
+                    list_ms = time_query(cur, sql, params, runs)
+                    cur.execute(f"SET LOCAL search_path TO {FLAT}, public")
+                    flat_ms = time_query(cur, sql, params, runs)
+                    queries.append({"query": label, "partitions": kept, "flat_ms": flat_ms, "list_ms": list_ms})
+
+        # End of season: empty every per-GW table
+        with conn:
+            with conn.cursor() as cur:
+                t0 = time.perf_counter()
+                deleted = 0
+                for table in TABLES:
+                    cur.execute(f"DELETE FROM {FLAT}.{table}")
+                    deleted += cur.rowcount
+                delete_s = time.perf_counter() - t0
+
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SET LOCAL search_path TO {LIST}, public")
+                t0 = time.perf_counter()
+                cur.execute("CALL archive_season(%s)", (SEASON,))
+                archive_s = time.perf_counter() - t0
+                cur.execute(
+                    """
+                    SELECT COUNT(*) AS n FROM pg_tables
+                    WHERE schemaname = 'archive' AND tablename LIKE %s
+                      AND NOT tablename = ANY(%s)
+                    """,
+                    (f"%\\_{SEASON}", [f"{t}_{SEASON}" for t in SEASON_TABLES]),
+                )
+                archived = cur.fetchone()["n"]
+
+        with conn:
+            with conn.cursor() as cur:
+                if not keep:
+                    cur.execute(
+                        """
+                        SELECT format('%%I.%%I', schemaname, tablename) AS rel FROM pg_tables
+                        WHERE schemaname = 'archive' AND tablename LIKE %s
+                        """,
+                        (f"%\\_{SEASON}",),
+                    )
+                    for r in cur.fetchall():
+                        cur.execute(f"DROP TABLE {r['rel']}")
+                    if not had_archive:
+                        cur.execute("DROP SCHEMA IF EXISTS archive")
+                    cur.execute(f"DROP SCHEMA IF EXISTS {FLAT} CASCADE")
+                    cur.execute(f"DROP SCHEMA IF EXISTS {LIST} CASCADE")
+    finally:
+        conn.close()
+
+    return {
+        "counts": counts,
+        "fill_s": fill_s,
+        "queries": queries,
+        "delete_s": delete_s,
+        "deleted_rows": deleted,
+        "archive_s": archive_s,
+        "archived_partitions": archived,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--teams", type=int, default=10_000)
+    ap.add_argument("--runs", type=int, default=10)
+    ap.add_argument("--keep", action="store_true", help="keep the scratch schemas and archived partitions")
+    args = ap.parse_args()
+
+    r = run(args.teams, args.runs, args.keep)
+
+    print("\nrows: " + ", ".join(f"{t} {n:,}" for t, n in r["counts"].items()) + f"  (filled in {r['fill_s']:.1f} s)")
+    print(f"\n{'query':<24} {'partitions scanned':<62} {'flat ms':>9} {'list ms':>9}")
+    for q in r["queries"]:
+        parts = ", ".join(f"{t} {n}/39" for t, n in q["partitions"].items()) or "-"
+        print(f"{q['query']:<24} {parts:<62} {q['flat_ms']:>9.2f} {q['list_ms']:>9.2f}")
+
+    print(
+        f"\nend of season  flat: DELETE {r['deleted_rows']:,} rows in {r['delete_s']:.2f} s "
+        f"({r['deleted_rows']:,} dead tuples left for VACUUM)"
+    )
+    print(
+        f"               list: archive_season() moved {r['archived_partitions']} partitions "
+        f"in {r['archive_s']:.2f} s (0 dead tuples)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Benchmark /players search on a large synthetic player table.
+
+Builds a scratch copy of `player` (same columns + indexes) in its own schema,
+fills it with --players rows, then times the search SQL used by the API
+against the pre-index version of the same query, plus typo-tolerant
+(fuzzy=true) lookups against the in-memory name index.
+
+The live `player` table is never touched; the scratch schema is dropped at
+the end unless --keep is given.
+
+Usage:
+    python bench_player_search.py                    # 100k players
+    python bench_player_search.py --players 20000 --runs 50
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from db import get_conn  # noqa: E402
+from player_search import FuzzyPlayerIndex, build_player_query  # noqa: E402
+
+SCHEMA = "bench_player_search"
+
+# Names are built from onset/vowel/coda syllables so substring and bigram
+# hit-rates look like a real player table rather than a handful of
+# repeated surnames.
+SYLLABLES = [
+    onset + vowel + coda
+    for onset in ["", "b", "d", "f", "g", "h", "k", "l", "m", "n", "p", "r", "s", "t", "v", "z", "br", "st"]
+    for vowel in ["a", "e", "i", "o", "u", "aa", "ei"]
+    for coda in ["", "n", "r", "s", "l", "nd"]
+]
+
+SCENARIOS = [
+    ("browse", {}),
+    ("team+position", {"team_code": "ars", "position": "mid"}),
+    ("q substring", {"q": "aland"}),
+    ("q short prefix", {"q": "sa"}),
+    ("q rare", {"q": "stein"}),
+    ("q+team+position", {"q": "ha", "team_code": "MCI", "position": "FWD"}),
+]
+
+
+def legacy_player_query(team_code=None, position=None, q=None, limit=500):
+    """The /players SQL before the search columns/indexes existed."""
+    where, params = [], []
+    if team_code:
+        where.append("UPPER(team_code) = %s")
+        params.append(team_code.upper().strip())
+    if position:
+        where.append("UPPER(TRIM(position)) = %s")
+        params.append(position.upper().strip())
+    if q:
+        where.append("(LOWER(first_name) LIKE %s OR LOWER(last_name) LIKE %s)")
+        q_like = f"%{q.lower()}%"
+        params.extend([q_like, q_like])
+    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+    sql = f"""
+        SELECT id, team_code, first_name, last_name, position, cost
+        FROM player
+        {where_sql}
+        ORDER BY cost DESC, team_code, position, last_name, first_name
+        LIMIT %s
+    """
+    return sql, params + [limit]
+
+
+def build_table(cur, n_players: int) -> None:
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"CREATE TABLE {SCHEMA}.player (LIKE public.player INCLUDING ALL)")
+
+    # (team_code, shirt_no) uniqueness cannot hold for 100k players over 20 clubs
+    cur.execute(
+        """
+        SELECT conname FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'u'
+        """,
+        (f"{SCHEMA}.player",),
+    )
+    for r in cur.fetchall():
+        cur.execute(f'ALTER TABLE {SCHEMA}.player DROP CONSTRAINT "{r["conname"]}"')
+
+    cur.execute("SELECT setseed(0.42)")
+    cur.execute(
+        f"""
+        INSERT INTO {SCHEMA}.player (team_code, first_name, last_name, position, shirt_no, cost)
+        SELECT
+            (ARRAY['ARS','MCI','AVL','CHE','CRY','MUN','TOT','NEW','LIV','SUN',
+                   'WHU','BHA','BRE','FUL','BOU','NFO','EVE','WOL','LEE','BUR'])[1 + floor(random() * 20)::int],
+            initcap(s[1 + floor(random() * n)::int] || s[1 + floor(random() * n)::int]),
+            initcap(s[1 + floor(random() * n)::int] || s[1 + floor(random() * n)::int]
+                    || s[1 + floor(random() * n)::int]),
+            (ARRAY['GK','DEF','DEF','DEF','MID','MID','MID','FWD'])[1 + floor(random() * 8)::int],
+            1 + i %% 99,
+            round((4.0 + random() * 10.0)::numeric, 1)
+        FROM generate_series(1, %s) AS i,
+             (SELECT %s::text[] AS s, %s AS n) AS syl
+        """,
+        (n_players, SYLLABLES, len(SYLLABLES)),
+    )
+    cur.execute(f"ANALYZE {SCHEMA}.player")
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    """Swap two neighbouring letters or drop one, like a hurried search box."""
+    chars = list(name.lower())
+    i = rng.randrange(len(chars) - 1)
+    if rng.random() < 0.5:
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    else:
+        del chars[i]
+    return "".join(chars)
+
+
+def bench_fuzzy(cur, runs: int):
+    cur.execute("SELECT id, team_code, first_name, last_name, position, cost FROM player")
+    rows = [dict(r) for r in cur.fetchall()]
+    t0 = time.perf_counter()
+    index = FuzzyPlayerIndex(rows)
+    build_ms = (time.perf_counter() - t0) * 1000.0
+
+    rng = random.Random(42)
+    queries = [misspell(r["last_name"], rng) for r in rng.sample(rows, runs)]
+    samples, hits = [], 0
+    for q in queries:
+        t0 = time.perf_counter()
+        found = index.search(q, limit=50)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+        hits += bool(found)
+    samples.sort()
+    return {
+        "scenario": "fuzzy last name",
+        "variant": "memory",
+        "rows": hits,
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+        "max_ms": round(samples[-1], 3),
+        "indexes": [f"built in {build_ms:.0f} ms"],
+    }
+
+
+def time_query(cur, sql, params, runs: int):
+    samples = []
+    rows = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples.sort()
+    return {
+        "rows": len(rows),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+def plan_indexes(cur, sql, params):
+    """Names of the indexes the planner picked (empty = sequential scan)."""
+    cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    plan = cur.fetchone()
+    plan = plan["QUERY PLAN"] if isinstance(plan, dict) else plan[0]
+    found = []
+
+    def walk(node):
+        if "Index Name" in node:
+            found.append(node["Index Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return found
+
+
+def run(n_players: int, runs: int, keep: bool = False):
+    conn = get_conn()
+    results = []
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                print(f"Building {SCHEMA}.player with {n_players} rows ...")
+                t0 = time.perf_counter()
+                build_table(cur, n_players)
+                print(f"  built in {time.perf_counter() - t0:.1f}s")
+
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SET search_path TO {SCHEMA}, public")
+                for name, kwargs in SCENARIOS:
+                    for variant, builder in (("legacy", legacy_player_query), ("indexed", build_player_query)):
+                        sql, params = builder(limit=500, **kwargs)
+                        stats = time_query(cur, sql, params, runs)
+                        stats.update({
+                            "scenario": name,
+                            "variant": variant,
+                            "indexes": plan_indexes(cur, sql, params),
+                        })
+                        results.append(stats)
+                results.append(bench_fuzzy(cur, runs))
+                cur.execute("RESET search_path")
+
+        if not keep:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    finally:
+        conn.close()
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--players", type=int, default=100_000)
+    ap.add_argument("--runs", type=int, default=100)
+    ap.add_argument("--keep", action="store_true", help="keep the scratch schema")
+    args = ap.parse_args()
+
+    results = run(args.players, args.runs, args.keep)
+
+    print(f"\n{'scenario':<18} {'variant':<8} {'rows':>5} {'p50 ms':>8} {'p95 ms':>8}  indexes")
+    for r in results:
+        print(
+            f"{r['scenario']:<18} {r['variant']:<8} {r['rows']:>5} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}  {', '.join(r['indexes']) or 'seq scan'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
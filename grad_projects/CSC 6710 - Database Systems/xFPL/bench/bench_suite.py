@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite over a generated season (run generate_season.py first).
+
+Times the main API paths in-process (FastAPI TestClient) against whatever
+season is in the database:
+- reads: /standings, /leagues/{id}/table, /ai/recommendations and
+  /players?q= (prefix and fuzzy). Cached routes are timed cold (response
+  cache emptied before every request) and warm.
+- writes: create_fantasy_team (POST /fantasy-teams) for --repeat new
+  managers, then one make_transfer (POST /transfers) for each of their
+  teams. These managers are deleted again afterwards.
+- simulate: POST /simulate for the next --simulate unsimulated gameweeks,
+  with the time of each phase. This advances the season; use
+  --simulate 0 to leave it as generated.
+- startup: in fresh processes, --startup-runs times each, the time to
+  `import main` and the time from launching uvicorn to the first 200 from
+  GET /first-unsimulated-gw.
+
+Each run is written to results/suite-<timestamp>.json (scale of the
+season, git commit, per-case p50/p95/mean/max ms and error counts), so runs
+can be compared over time; --compare prints the p50 change against an
+earlier file.
+
+Usage:
+    python bench_suite.py
+    python bench_suite.py --repeat 50 --simulate 0 --compare results/suite-20260101-120000.json
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(BENCH_DIR, "..", "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main as api  # noqa: E402
+import metrics  # noqa: E402
+from bench_team_onboarding import pick_transfer, random_squads  # noqa: E402
+from db import get_conn  # noqa: E402
+from generate_season import load_players  # noqa: E402
+from response_cache import response_cache  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+USER_PREFIX = "bench_suite_"
+IMPORT_MAIN = "import time; t0 = time.perf_counter(); import main; print((time.perf_counter() - t0) * 1000.0)"
+FIRST_RESPONSE_TIMEOUT = 60.0
+
+SCALE_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM app_user)            AS users,
+        (SELECT COUNT(*) FROM fantasy_team)        AS fantasy_teams,
+        (SELECT COUNT(*) FROM fantasy_league)      AS leagues,
+        (SELECT COUNT(*) FROM fantasy_league_team) AS league_teams,
+        (SELECT COUNT(*) FROM fantasy_lineup)      AS lineups,
+        (SELECT COUNT(*) FROM transfer)            AS transfers,
+        (SELECT COUNT(*) FROM player)              AS players,
+        (SELECT COUNT(*) FROM gameweek WHERE status = 'simulated') AS simulated_gws
+"""
+
+
+def summarize(name, samples, errors, **extra):
+    samples = sorted(samples)
+    return {
+        "case": name,
+        "n": len(samples),
+        "errors": errors,
+        "p50_ms": round(statistics.median(samples), 3) if samples else None,
+        "p95_ms": round(samples[max(0, int(len(samples) * 0.95) - 1)], 3) if samples else None,
+        "mean_ms": round(statistics.fmean(samples), 3) if samples else None,
+        "max_ms": round(samples[-1], 3) if samples else None,
+        **extra,
+    }
+
+
+def measure(name, request, n, cold=False):
+    """Time request(i) for i in range(n); cold empties the response cache first."""
+    samples, errors = [], 0
+    for i in range(n):
+        if cold:
+            response_cache.clear()
+        t0 = time.perf_counter()
+        resp = request(i)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+        errors += resp.status_code >= 400
+    return summarize(name, samples, errors)
+
+
+def season_state(cur):
+    cur.execute(SCALE_SQL)
+    scale = dict(cur.fetchone())
+    cur.execute(
+        "SELECT code FROM gameweek WHERE status = 'simulated' ORDER BY game_no DESC LIMIT 1"
+    )
+    last = cur.fetchone()
+    cur.execute("SELECT code FROM gameweek WHERE status = 'pending' ORDER BY game_no")
+    pending = [r["code"] for r in cur.fetchall()]
+    if last is None or not pending:
+        raise SystemExit("Needs a season with simulated and unsimulated gameweeks (generate_season.py).")
+    cur.execute("SELECT DISTINCT league_id FROM fantasy_league_team ORDER BY league_id")
+    leagues = [r["league_id"] for r in cur.fetchall()]
+    cur.execute("SELECT ft_id FROM fantasy_lineup WHERE gw_code = %s ORDER BY ft_id", (pending[0],))
+    teams = [r["ft_id"] for r in cur.fetchall()]
+    cur.execute("SELECT LOWER(last_name) AS name FROM player ORDER BY id")
+    names = [r["name"] for r in cur.fetchall()]
+    return scale, last["code"], pending, leagues, teams, names
+
+
+def read_cases(client, last_gw, next_gw, leagues, teams, names, n, rng):
+    surnames = rng.sample(names, min(n, len(names)))
+    terms = [s[:4] for s in surnames]
+    typos = [s[1] + s[0] + s[2:] if len(s) > 2 else s for s in surnames]  # swapped letters
+    team_sample = rng.sample(teams, min(n, len(teams)))
+    cases = [
+        ("GET /standings/{gw}", lambda i: client.get(f"/standings/{last_gw}"), True),
+        ("GET /leagues/{id}/table/{gw}",
+         lambda i: client.get(f"/leagues/{leagues[i % len(leagues)]}/table/{last_gw}"), True),
+        ("GET /ai/recommendations/{ft}/{gw}",
+         lambda i: client.get(f"/ai/recommendations/{team_sample[i % len(team_sample)]}/{next_gw}"), False),
+        ("GET /players?q=", lambda i: client.get("/players", params={"q": terms[i % len(terms)]}), False),
+        ("GET /players?q=&fuzzy=true",
+         lambda i: client.get("/players", params={"q": typos[i % len(typos)], "fuzzy": "true"}), False),
+    ]
+    results = []
+    for name, request, cached in cases:
+        request(0)  # warm up the connection path and module caches
+        results.append(measure(f"{name} cold" if cached else name, request, n, cold=True))
+        if cached:
+            for i in range(n):
+                request(i)  # every key cached
+            results.append(measure(f"{name} warm", request, n))
+    return results
+
+
+def write_cases(client, conn, gw_code, n, rng):
+    with conn.cursor() as cur:
+        players, by_position = load_players(cur)
+        cur.execute(
+            """
+            INSERT INTO app_user (username, email)
+            SELECT %(prefix)s || i, %(prefix)s || i || '@example.com'
+            FROM generate_series(1, %(n)s) AS i
+            RETURNING id
+            """,
+            {"prefix": USER_PREFIX, "n": n},
+        )
+        user_ids = [r["id"] for r in cur.fetchall()]
+    conn.commit()
+
+    squads = random_squads(players, n, rng)
+    created = []
+
+    def create(i):
+        ids, captain, vice = squads[i]
+        resp = client.post("/fantasy-teams", json={
+            "user_id": user_ids[i], "name": f"Bench Suite {i}", "gw_code": gw_code,
+            "player_ids": ids, "captain_id": captain, "vice_captain_id": vice,
+        })
+        if resp.status_code == 200:
+            created.append((resp.json()["fantasy_team"]["id"], ids))
+        return resp
+
+    swaps = []
+
+    def transfer(i):
+        ft_id, (player_out, player_in) = swaps[i]
+        return client.post("/transfers", json={
+            "ft_id": ft_id, "gw_code": gw_code, "player_out_id": player_out, "player_in_id": player_in,
+        })
+
+    try:
+        results = [measure("POST /fantasy-teams", create, n)]
+        for ft_id, ids in created:
+            swap = pick_transfer(ids, players, by_position, rng, tries=200)
+            if swap is not None:
+                swaps.append((ft_id, swap))
+        results.append(measure("POST /transfers", transfer, len(swaps)))
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM app_user WHERE username LIKE %s", (USER_PREFIX + "%",))
+            cur.execute("SELECT bump_data_version('fantasy_team', %s)", (f"gw:{gw_code}",))
+        conn.commit()
+    return results
+
+
+def simulate_cases(client, pending, k):
+    results = []
+    for gw_code in pending[:k]:
+        before = metrics.SIMULATE_PHASE_SECONDS.totals()
+        t0 = time.perf_counter()
+        resp = client.post(f"/simulate/{gw_code}")
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        after = metrics.SIMULATE_PHASE_SECONDS.totals()
+        phases = {
+            labels[0]: round((total - before.get(labels, (0, 0.0))[1]) * 1000.0, 3)
+            for labels, (_, total) in after.items()
+        }
+        results.append(summarize(
+            f"POST /simulate/{{gw}} {gw_code}", [elapsed], int(resp.status_code >= 400), phases_ms=phases,
+        ))
+    return results
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def first_response_ms():
+    """Launch uvicorn and poll until the API answers; ms from launch."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/first-unsimulated-gw"
+    t0 = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - t0 < FIRST_RESPONSE_TIMEOUT:
+            try:
+                with urllib.request.urlopen(url, timeout=5) as resp:
+                    if resp.status == 200:
+                        return (time.perf_counter() - t0) * 1000.0
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            if server.poll() is not None:
+                return None
+            time.sleep(0.005)
+        return None
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def startup_cases(runs):
+    """Cold start in fresh processes: import main, and launch to first response."""
+    imports, errors = [], 0
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-c", IMPORT_MAIN], cwd=BACKEND_DIR, capture_output=True, text=True)
+        if proc.returncode:
+            errors += 1
+        else:
+            imports.append(float(proc.stdout.split()[-1]))
+    results = [summarize("startup: import main", imports, errors)]
+    firsts = [first_response_ms() for _ in range(runs)]
+    results.append(summarize(
+        "startup: launch to first response", [ms for ms in firsts if ms is not None], firsts.count(None),
+    ))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(run, previous=None):
+    before = {c["case"]: c for c in previous["cases"]} if previous else {}
+    print(f"\n{'case':<44} {'n':>5} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}"
+          + (f" {'p50 vs prev':>12}" if previous else ""))
+    for c in run["cases"]:
+        line = (f"{c['case']:<44} {c['n']:>5} {c['errors']:>4} {c['p50_ms'] or 0:>9.3f} "
+                f"{c['p95_ms'] or 0:>9.3f} {c['mean_ms'] or 0:>9.3f}")
+        prev = before.get(c["case"])
+        if prev and prev["p50_ms"] and c["p50_ms"]:
+            line += f" {(c['p50_ms'] / prev['p50_ms'] - 1) * 100:>+11.1f}%"
+        print(line)
+        if c.get("phases_ms"):
+            print("    " + ", ".join(f"{p} {ms:.1f}" for p, ms in c["phases_ms"].items()))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20, help="requests per case")
+    ap.add_argument("--simulate", type=int, default=1, help="gameweeks to simulate (advances the season)")
+    ap.add_argument("--startup-runs", type=int, default=5, help="fresh processes per startup case (0: skip)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", default=RESULTS_DIR, help="directory for the JSON results")
+    ap.add_argument("--compare", help="earlier results file to compare p50s against")
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    conn = get_conn()
+    client = TestClient(api.app)
+    try:
+        with conn.cursor() as cur:
+            scale, last_gw, pending, leagues, teams, names = season_state(cur)
+        conn.commit()
+
+        with client:
+            cases = read_cases(client, last_gw, pending[0], leagues, teams, names, args.repeat, rng)
+            cases += write_cases(client, conn, pending[0], args.repeat, rng)
+            cases += simulate_cases(client, pending, args.simulate)
+    finally:
+        conn.close()
+    if args.startup_runs:
+        cases += startup_cases(args.startup_runs)
+
+    run = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "args": vars(args),
+        "scale": scale,
+        "gameweeks": {"last_simulated": last_gw, "next": pending[0]},
+        "cases": cases,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"suite-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, "w") as f:
+        json.dump(run, f, indent=2)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_results(run, previous)
+    print(f"\nscale: {scale}\nresults: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk onboarding: create --teams fantasy teams (one manager each).
+
+Compares the pre-existing create_fantasy_team flow (existing-team check,
+player fetch, team INSERT, then the lineup INSERT) with the current one
+(in-memory validation + the single CTE in squad.py).
+
+app_user / fantasy_team / fantasy_lineup are copied into a scratch schema
+(columns, indexes, foreign keys and the lineup triggers as currently
+installed), and each team is committed on its own like an API request. The
+live tables are never touched; the scratch schema is dropped at the end
+unless --keep is given.
+
+Usage:
+    python bench_team_onboarding.py                  # 10k teams
+    python bench_team_onboarding.py --teams 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from db import get_conn  # noqa: E402
+from squad import insert_team, position_group, validate_squad  # noqa: E402
+
+SCHEMA = "bench_onboarding"
+
+FORMATION = {"GK": 1, "DEF": 4, "MID": 4, "FWD": 2}
+
+
+def legacy_create_team(cur, user_id, name, gw_code, player_ids, captain_id, vice_captain_id):
+    """The create_fantasy_team statements before the single-insert rewrite."""
+    cur.execute("SELECT id, name FROM fantasy_team WHERE user_id = %s", (user_id,))
+    if cur.fetchone():
+        raise ValueError("Manager already has a fantasy team")
+    cur.execute(
+        "SELECT id, team_code, position, cost FROM player WHERE id = ANY(%s)",
+        (player_ids,),
+    )
+    validate_squad(cur.fetchall())
+    cur.execute(
+        "INSERT INTO fantasy_team (user_id, name) VALUES (%s, %s) RETURNING id, user_id, name",
+        (user_id, name),
+    )
+    ft_id = cur.fetchone()["id"]
+    cur.execute(
+        """
+        INSERT INTO fantasy_lineup
+            (ft_id, gw_code, player_ids, captain_slot, vice_captain_slot)
+        VALUES (%s, %s, %s, %s, %s)
+        """,
+        (ft_id, gw_code, player_ids,
+         player_ids.index(captain_id) + 1, player_ids.index(vice_captain_id) + 1),
+    )
+
+
+def single_create_team(players, cur, user_id, name, gw_code, player_ids, captain_id, vice_captain_id):
+    validate_squad([players[pid] for pid in player_ids])
+    insert_team(cur, user_id, name, gw_code, player_ids, captain_id, vice_captain_id)
+
+
+def random_squads(players, n, rng):
+    """n valid XIs (1-4-4-2, budget and club limits respected)."""
+    by_pos = defaultdict(list)
+    for p in players.values():
+        by_pos[position_group(p["position"])].append(p)
+
+    squads = []
+    while len(squads) < n:
+        xi = []
+        for pos, count in FORMATION.items():
+            xi += rng.sample(by_pos[pos], count)
+        try:
+            validate_squad(xi)
+        except ValueError:
+            continue
+        ids = [p["id"] for p in xi]
+        captain, vice = rng.sample(ids, 2)
+        squads.append((ids, captain, vice))
+    return squads
+
+
+def pick_transfer(lineup, players, by_position, rng, tries=20):
+    """A (player_out_id, player_in_id) swap that make_transfer accepts, or None."""
+    ids = set(lineup)
+    cost = sum(float(players[pid]["cost"]) for pid in lineup)
+    clubs = defaultdict(int)
+    for pid in lineup:
+        clubs[players[pid]["team_code"]] += 1
+    for _ in range(tries):
+        out = players[rng.choice(lineup)]
+        cand = rng.choice(by_position[out["position"]])
+        if cand["id"] in ids:
+            continue
+        if cost - float(out["cost"]) + float(cand["cost"]) > 100.0:
+            continue
+        if cand["team_code"] != out["team_code"] and clubs[cand["team_code"]] >= 2:
+            continue
+        return out["id"], cand["id"]
+    return None
+
+
+def build_schema(cur) -> None:
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    for table in ("app_user", "fantasy_team", "fantasy_lineup"):
+        cur.execute(f"CREATE TABLE {SCHEMA}.{table} (LIKE public.{table} INCLUDING ALL)")
+
+    cur.execute(
+        f"""
+        ALTER TABLE {SCHEMA}.fantasy_team
+            ADD FOREIGN KEY (user_id) REFERENCES {SCHEMA}.app_user(id) ON DELETE CASCADE;
+        ALTER TABLE {SCHEMA}.fantasy_lineup
+            ADD FOREIGN KEY (ft_id) REFERENCES {SCHEMA}.fantasy_team(id) ON DELETE CASCADE,
+            ADD FOREIGN KEY (gw_code) REFERENCES public.gameweek(code);
+        """
+    )
+
+    # Same lineup triggers as the live table; their functions resolve
+    # fantasy_lineup through search_path, i.e. to the scratch copy.
+    cur.execute(
+        """
+        SELECT pg_get_triggerdef(oid) AS ddl
+        FROM pg_trigger
+        WHERE tgrelid = 'public.fantasy_lineup'::regclass AND NOT tgisinternal
+        """
+    )
+    for r in cur.fetchall():
+        cur.execute(r["ddl"].replace(" ON public.fantasy_lineup ", f" ON {SCHEMA}.fantasy_lineup "))
+
+
+def run_variant(conn, label, create, squads, gw_code):
+    with conn.cursor() as cur:
+        cur.execute(
+            f"TRUNCATE {SCHEMA}.fantasy_lineup, {SCHEMA}.fantasy_team, {SCHEMA}.app_user "
+            "RESTART IDENTITY CASCADE"
+        )
+        cur.execute(
+            f"""
+            INSERT INTO {SCHEMA}.app_user (username, email)
+            SELECT 'bench_onboard_' || i, 'bench_onboard_' || i || '@example.com'
+            FROM generate_series(1, %s) AS i
+            RETURNING id
+            """,
+            (len(squads),),
+        )
+        user_ids = [r["id"] for r in cur.fetchall()]
+    conn.commit()
+
+    samples = []
+    with conn.cursor() as cur:
+        t_all = time.perf_counter()
+        for i, (user_id, (ids, captain, vice)) in enumerate(zip(user_ids, squads)):
+            t0 = time.perf_counter()
+            create(cur, user_id, f"Bench {i}", gw_code, ids, captain, vice)
+            conn.commit()
+            samples.append((time.perf_counter() - t0) * 1000.0)
+        elapsed = time.perf_counter() - t_all
+
+    samples.sort()
+    return {
+        "variant": label,
+        "teams": len(squads),
+        "total_s": round(elapsed, 2),
+        "teams_per_s": round(len(squads) / elapsed, 1),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+def run(n_teams: int, seed: int = 42, keep: bool = False):
+    conn = get_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT id, team_code, position, cost FROM player")
+                players = {r["id"]: r for r in cur.fetchall()}
+                cur.execute("SELECT code FROM gameweek ORDER BY game_no LIMIT 1")
+                gw_code = cur.fetchone()["code"]
+                build_schema(cur)
+
+        squads = random_squads(players, n_teams, random.Random(seed))
+
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SET search_path TO {SCHEMA}, public")
+        results = [
+            run_variant(conn, "legacy", legacy_create_team, squads, gw_code),
+            run_variant(
+                conn, "single",
+                lambda *args: single_create_team(players, *args),
+                squads, gw_code,
+            ),
+        ]
+
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("RESET search_path")
+                if not keep:
+                    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    finally:
+        conn.close()
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--teams", type=int, default=10_000)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--keep", action="store_true", help="keep the scratch schema")
+    args = ap.parse_args()
+
+    results = run(args.teams, args.seed, args.keep)
+
+    print(f"\n{'variant':<8} {'teams':>6} {'total s':>8} {'teams/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for r in results:
+        print(
+            f"{r['variant']:<8} {r['teams']:>6} {r['total_s']:>8.2f} {r['teams_per_s']:>8.1f} "
+            f"{r['p50_ms']:>8.3f} {r['p95_ms']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Fill a local database with a synthetic season at a chosen scale.
+
+Writes to the LIVE tables of the backend/.env database: run it against a
+local copy only. On top of the loaded reference data (teams, players,
+gameweeks, matches) it creates
+- --users managers, each with one fantasy team: a random valid XI
+  (formation, budget and club limits of create_fantasy_team) inserted with
+  the same statement as POST /fantasy-teams,
+- --leagues leagues of --league-size teams each, with round-robin fixtures
+  from the first gameweek,
+- then plays --gameweeks gameweeks: each GW a --transfer-rate share of the
+  teams makes one to three transfers, and the GW is simulated.
+
+Leagues, transfers and simulations go through the API in-process (FastAPI
+TestClient), so every rule and side effect is the real one. Fantasy data
+already in the database is refused unless --reset is given, which empties
+users, teams, leagues and all simulated results first.
+
+Usage:
+    python generate_season.py --reset                        # 1k teams, 10 GWs
+    python generate_season.py --reset --users 20000 --leagues 500 --gameweeks 38
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main as api  # noqa: E402
+from bench_team_onboarding import pick_transfer, random_squads  # noqa: E402
+from db import get_conn  # noqa: E402
+from squad import insert_team  # noqa: E402
+
+USER_PREFIX = "season_"
+TEAM_BATCH = 500
+
+
+def reset_season(cur) -> None:
+    """Empty the fantasy data and every simulated result (reference data stays)."""
+    cur.execute("TRUNCATE app_user, fantasy_league CASCADE")
+    cur.execute("TRUNCATE player_points, epl_table_snapshot")
+    cur.execute("UPDATE match SET home_goals = NULL, away_goals = NULL")
+    cur.execute("SELECT refresh_gameweek_status()")
+    cur.execute("SELECT bump_data_version('global')")
+
+
+def load_players(cur):
+    cur.execute("SELECT id, team_code, position, cost FROM player")
+    players = {r["id"]: r for r in cur.fetchall()}
+    by_position = defaultdict(list)
+    for p in players.values():
+        by_position[p["position"]].append(p)
+    return players, by_position
+
+
+def create_teams(conn, players, n_users, gw_code, rng):
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO app_user (username, email)
+            SELECT %(prefix)s || i, %(prefix)s || i || '@example.com'
+            FROM generate_series(1, %(n)s) AS i
+            RETURNING id
+            """,
+            {"prefix": USER_PREFIX, "n": n_users},
+        )
+        user_ids = [r["id"] for r in cur.fetchall()]
+        conn.commit()
+
+        ft_ids = []
+        for i, (user_id, (ids, captain, vice)) in enumerate(
+            zip(user_ids, random_squads(players, n_users, rng)), 1
+        ):
+            ft_ids.append(insert_team(cur, user_id, f"Season FC {i}", gw_code, ids, captain, vice)["id"])
+            if i % TEAM_BATCH == 0:
+                conn.commit()
+        conn.commit()
+    return ft_ids
+
+
+def create_leagues(client, ft_ids, n_leagues, size, start_gw, rng):
+    for i in range(1, n_leagues + 1):
+        league = client.post("/leagues", json={"name": f"Season League {i}"}).json()
+        for ft_id in rng.sample(ft_ids, min(size, len(ft_ids))):
+            client.post(f"/leagues/{league['id']}/add-team", json={"ft_id": ft_id}).raise_for_status()
+        client.post(
+            f"/leagues/{league['id']}/fixtures/generate", params={"start_gw": start_gw}
+        ).raise_for_status()
+
+
+def play_gameweek(client, conn, gw_code, ft_ids, players, by_position, rate, rng):
+    """Transfers for a share of the teams, then simulate. Returns (made, rejected)."""
+    movers = rng.sample(ft_ids, int(len(ft_ids) * rate))
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT ft_id, player_ids FROM fantasy_lineup WHERE gw_code = %s AND ft_id = ANY(%s)",
+            (gw_code, movers),
+        )
+        lineups = {r["ft_id"]: list(r["player_ids"]) for r in cur.fetchall()}
+    conn.commit()
+
+    made = rejected = 0
+    for ft_id, lineup in lineups.items():
+        for _ in range(rng.randint(1, 3)):
+            swap = pick_transfer(lineup, players, by_position, rng)
+            if swap is None:
+                break
+            resp = client.post("/transfers", json={
+                "ft_id": ft_id, "gw_code": gw_code, "player_out_id": swap[0], "player_in_id": swap[1],
+            })
+            if resp.status_code != 200:
+                rejected += 1
+                break
+            lineup[lineup.index(swap[0])] = swap[1]
+            made += 1
+
+    client.post(f"/simulate/{gw_code}").raise_for_status()
+    return made, rejected
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    conn = get_conn()
+    client = TestClient(api.app)
+    timings = {}
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) AS n FROM fantasy_team")
+            if cur.fetchone()["n"] and not args.reset:
+                raise SystemExit("Fantasy data already present; use --reset to replace it.")
+            if args.reset:
+                reset_season(cur)
+            players, by_position = load_players(cur)
+            cur.execute("SELECT code FROM gameweek ORDER BY game_no")
+            gameweeks = [r["code"] for r in cur.fetchall()]
+        conn.commit()
+
+        with client:
+            t0 = time.perf_counter()
+            ft_ids = create_teams(conn, players, args.users, gameweeks[0], rng)
+            timings["teams"] = time.perf_counter() - t0
+            print(f"{len(ft_ids)} teams in {timings['teams']:.1f} s")
+
+            t0 = time.perf_counter()
+            create_leagues(client, ft_ids, args.leagues, args.league_size, gameweeks[0], rng)
+            timings["leagues"] = time.perf_counter() - t0
+            print(f"{args.leagues} leagues in {timings['leagues']:.1f} s")
+
+            for gw_code in gameweeks[:args.gameweeks]:
+                t0 = time.perf_counter()
+                made, rejected = play_gameweek(
+                    client, conn, gw_code, ft_ids, players, by_position, args.transfer_rate, rng
+                )
+                timings[gw_code] = time.perf_counter() - t0
+                print(f"{gw_code}: {made} transfers ({rejected} rejected), simulated, {timings[gw_code]:.1f} s")
+    finally:
+        conn.close()
+    return timings
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=1000, help="managers, one fantasy team each")
+    ap.add_argument("--leagues", type=int, default=20)
+    ap.add_argument("--league-size", type=int, default=10, help="teams per league")
+    ap.add_argument("--gameweeks", type=int, default=10, help="gameweeks to play and simulate")
+    ap.add_argument("--transfer-rate", type=float, default=0.3, help="share of teams transferring each GW")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--reset", action="store_true", help="empty existing fantasy data and results first")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    run(args)
+    print(f"season generated in {time.perf_counter() - t0:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
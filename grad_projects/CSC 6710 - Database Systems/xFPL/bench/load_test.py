@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Load test: concurrent scripted user sessions against a running API.
+
+Start the API the way it is deployed (e.g. `uvicorn main:app --workers 4`
+in backend/, on a local Postgres loaded by generate_season.py), then run
+this against it. Each of --users virtual users repeats one journey, over
+HTTP, until --duration runs out:
+
+    sign up -> browse players -> search a name -> create a team for the
+    next gameweek -> 1-3 transfers -> change captain -> dashboard -> standings
+
+Meanwhile an admin thread simulates the next gameweek every
+--simulate-every seconds (0 turns it off), so sessions also run against a
+moving gameweek: writes that race a simulation get the same 400s a real
+user would, reported separately from server errors.
+
+Reports throughput, p50/p95/p99 latency and 4xx / 5xx rates per route, and
+writes them to results/load-<timestamp>.json. Managers created by the run
+(usernames load_<run>_...) stay in the database; generate_season.py
+--reset clears them.
+
+Usage:
+    python load_test.py --url http://127.0.0.1:8000 --users 20 --duration 60
+    python load_test.py --users 50 --duration 300 --simulate-every 30
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import requests
+
+from bench_team_onboarding import pick_transfer, random_squads
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+
+class Recorder:
+    """Latency and outcome of every request, by route template."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(lambda: defaultdict(int))
+        self.journeys = 0
+
+    def add(self, route, seconds, outcome):
+        with self._lock:
+            self.latencies[route].append(seconds * 1000.0)
+            self.outcomes[route][outcome] += 1
+
+    def journey_done(self):
+        with self._lock:
+            self.journeys += 1
+
+    def report(self, elapsed):
+        routes = []
+        for route in sorted(self.latencies):
+            samples = sorted(self.latencies[route])
+            outcomes = dict(self.outcomes[route])
+            n = len(samples)
+            routes.append({
+                "route": route,
+                "requests": n,
+                "rps": round(n / elapsed, 2),
+                "p50_ms": round(statistics.median(samples), 3),
+                "p95_ms": round(_percentile(samples, 95), 3),
+                "p99_ms": round(_percentile(samples, 99), 3),
+                "client_error_rate": round(outcomes.get("4xx", 0) / n, 4),
+                "server_error_rate": round((outcomes.get("5xx", 0) + outcomes.get("failed", 0)) / n, 4),
+                "outcomes": outcomes,
+            })
+        total = sum(r["requests"] for r in routes)
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": total,
+            "rps": round(total / elapsed, 2),
+            "journeys": self.journeys,
+            "routes": routes,
+        }
+
+
+def _percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+class Client:
+    """One session; every call is recorded under its route template."""
+
+    def __init__(self, base_url, recorder, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def call(self, method, route, path, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            resp = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            self.recorder.add(f"{method} {route}", time.perf_counter() - t0, "failed")
+            return None
+        outcome = "ok" if resp.status_code < 400 else ("4xx" if resp.status_code < 500 else "5xx")
+        self.recorder.add(f"{method} {route}", time.perf_counter() - t0, outcome)
+        return resp if resp.status_code < 400 else None
+
+
+def journey(client, run_id, n, players, by_position, rng):
+    """One user session; stops at the first failed step."""
+    resp = client.call("POST", "/users", "/users", json={
+        "username": f"load_{run_id}_{n}", "email": f"load_{run_id}_{n}@example.com",
+    })
+    if resp is None:
+        return
+    user_id = resp.json()["id"]
+
+    resp = client.call("GET", "/first-unsimulated-gw", "/first-unsimulated-gw")
+    if resp is None or resp.json()["all_simulated"]:
+        return
+    gw_code = resp.json()["gw_code"]
+
+    client.call("GET", "/players", "/players", params={"limit": 700})
+    name = players[rng.choice(list(players))]["last_name"]
+    client.call("GET", "/players?q=", "/players", params={"q": name[:4].lower()})
+
+    ids, captain, vice = random_squads(players, 1, rng)[0]
+    resp = client.call("POST", "/fantasy-teams", "/fantasy-teams", json={
+        "user_id": user_id, "name": f"Load {run_id} {n}", "gw_code": gw_code,
+        "player_ids": ids, "captain_id": captain, "vice_captain_id": vice,
+    })
+    if resp is None:
+        return
+    ft_id = resp.json()["fantasy_team"]["id"]
+
+    for _ in range(rng.randint(1, 3)):
+        swap = pick_transfer(ids, players, by_position, rng)
+        if swap is None:
+            break
+        resp = client.call("POST", "/transfers", "/transfers", json={
+            "ft_id": ft_id, "gw_code": gw_code, "player_out_id": swap[0], "player_in_id": swap[1],
+        })
+        if resp is None:
+            break
+        ids[ids.index(swap[0])] = swap[1]
+
+    captain, vice = rng.sample(ids, 2)
+    client.call("POST", "/update-captain", "/update-captain", json={
+        "ft_id": ft_id, "gw_code": gw_code, "captain_id": captain, "vice_captain_id": vice,
+    })
+    client.call("GET", "/dashboard/{ft_id}/{gw_code}", f"/dashboard/{ft_id}/{gw_code}")
+    client.call("GET", "/standings/{gw_code}", f"/standings/{gw_code}")
+    client.recorder.journey_done()
+
+
+def virtual_user(args, recorder, run_id, vu, players, by_position, deadline):
+    rng = random.Random(args.seed * 1000 + vu)
+    client = Client(args.url, recorder, args.timeout)
+    n = 0
+    while time.monotonic() < deadline:
+        journey(client, run_id, f"{vu}_{n}", players, by_position, rng)
+        n += 1
+        if args.think_ms:
+            time.sleep(rng.uniform(0, 2 * args.think_ms) / 1000.0)
+
+
+def admin(args, recorder, deadline, stop):
+    client = Client(args.url, recorder, max(args.timeout, 300))
+    while not stop.wait(args.simulate_every) and time.monotonic() < deadline:
+        resp = client.call("GET", "/first-unsimulated-gw", "/first-unsimulated-gw")
+        if resp is not None and not resp.json()["all_simulated"]:
+            gw_code = resp.json()["gw_code"]
+            client.call("POST", "/simulate/{gw_code}", f"/simulate/{gw_code}")
+
+
+def load_players(base_url):
+    rows = requests.get(base_url.rstrip("/") + "/players", params={"limit": 1000}, timeout=30).json()
+    players = {r["id"]: r for r in rows}
+    by_position = defaultdict(list)
+    for p in rows:
+        by_position[p["position"]].append(p)
+    return players, by_position
+
+
+def print_report(report):
+    print(f"\n{'route':<34} {'reqs':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'4xx':>6} {'5xx':>6}")
+    for r in report["routes"]:
+        print(
+            f"{r['route']:<34} {r['requests']:>6} {r['rps']:>7.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+            f"{r['p99_ms']:>8.1f} {r['client_error_rate']:>6.1%} {r['server_error_rate']:>6.1%}"
+        )
+    print(
+        f"\n{report['requests']} requests in {report['elapsed_s']} s: {report['rps']} req/s, "
+        f"{report['journeys']} journeys completed"
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    ap.add_argument("--duration", type=float, default=60, help="seconds")
+    ap.add_argument("--simulate-every", type=float, default=20, help="seconds between admin simulates (0: off)")
+    ap.add_argument("--think-ms", type=float, default=0, help="mean pause between journeys")
+    ap.add_argument("--timeout", type=float, default=30, help="per-request timeout (s)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", default=RESULTS_DIR, help="directory for the JSON results")
+    args = ap.parse_args()
+
+    players, by_position = load_players(args.url)
+    run_id = uuid.uuid4().hex[:8]
+    recorder = Recorder()
+    stop = threading.Event()
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    start = time.monotonic()
+    deadline = start + args.duration
+
+    threads = [
+        threading.Thread(target=virtual_user, args=(args, recorder, run_id, vu, players, by_position, deadline))
+        for vu in range(args.users)
+    ]
+    if args.simulate_every > 0:
+        threads.append(threading.Thread(target=admin, args=(args, recorder, deadline, stop)))
+    for t in threads:
+        t.start()
+    for t in threads[:args.users]:
+        t.join()
+    stop.set()
+    for t in threads[args.users:]:
+        t.join()
+
+    report = recorder.report(time.monotonic() - start)
+    report.update({
+        "started_at": started_at,
+        "run_id": run_id,
+        "args": vars(args),
+    })
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"load-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"results: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,25 +4,37 @@ Fetch FPL data
 
 Tables produced:
 - team.csv            -> team(code, name)
-- player.csv          -> player(team_code, first_name, last_name, position, shirt_no, cost)
+- player.csv          -> player(fpl_id, team_code, first_name, last_name, position, shirt_no, cost)
 - gameweek.csv        -> gameweek(code, game_no, start_time, end_time)
 - match.csv           -> match(gw_code, hometeam_code, awayteam_code, gametime, home_goals, away_goals)
 
 
 - app_user.csv        -> app_user(username, email)                [stub]
 - fantasy_team.csv    -> fantasy_team(user_id, name)              [stub]
-- fantasy_lineup.csv  -> fantasy_lineup(ft_id, gw_code, player_id, slot, captain, vice_captain) [stub]
+- fantasy_lineup.csv  -> fantasy_lineup(ft_id, gw_code, player_ids, captain_slot, vice_captain_slot) [stub]
 - player_points.csv   -> player_points(player_id, gw_code, points) [stub]
 
+With --load the tables go straight into the database instead (no files):
+each DataFrame is COPYed from an in-memory buffer into a staging table and
+merged like load_schema_data.py does, all in one transaction.
+
+With --format parquet each table is written as <table>.parquet with an
+explicit schema (see columnar.py) instead of CSV.
+
 Usage:
   python fetch_schema_data.py --out data --mode live --season 2526
   python fetch_schema_data.py --out data_prev --mode archive --season 2425
+  python fetch_schema_data.py --out data --mode live --season 2526 --format parquet
+  python fetch_schema_data.py --mode live --season 2526 --load
 """
 import argparse
 from collections import defaultdict
+import io
 import pathlib
+import time
 import pandas as pd
 import requests
+import columnar
 
 BOOTSTRAP = "https://fantasy.premierleague.com/api/bootstrap-static/"
 FIXTURES  = "https://fantasy.premierleague.com/api/fixtures/"
@@ -48,7 +60,9 @@ def fetch_json(url):
 # -------------------------
 # LIVE (current season)
 # -------------------------
-def live_fetch(outdir: pathlib.Path, season_code: str):
+def live_fetch(season_code: str) -> dict:
+    """Tables as DataFrames: {"team": ..., "player": ..., "gameweek": ..., "match": ...}."""
+    frames = {}
     boot = fetch_json(BOOTSTRAP)
     fixtures = fetch_json(FIXTURES)
 
@@ -56,7 +70,7 @@ def live_fetch(outdir: pathlib.Path, season_code: str):
     t = pd.DataFrame(boot["teams"])
     t["code3"] = t["short_name"].astype(str).str[:3].str.upper()
     team = pd.DataFrame({"code": t["code3"], "name": t["name"]}).drop_duplicates("code")
-    team.to_csv(outdir / "team.csv", index=False)
+    frames["team"] = team
     id_to_code = dict(zip(t["id"], t["code3"]))
 
     # player.csv
@@ -67,6 +81,7 @@ def live_fetch(outdir: pathlib.Path, season_code: str):
         num = counters[tid]
         shirts.append(num if num <= 99 else (num % 99 or 99))
     player = pd.DataFrame({
+        "fpl_id": p["id"],
         "team_code": p["team"].map(id_to_code),
         "first_name": p["first_name"],
         "last_name": p["second_name"],
@@ -74,7 +89,7 @@ def live_fetch(outdir: pathlib.Path, season_code: str):
         "shirt_no": shirts,
         "cost": (p["now_cost"]/10.0).round(2)
     }).dropna(subset=["team_code","position"])
-    player.to_csv(outdir / "player.csv", index=False)
+    frames["player"] = player
 
     # gameweek.csv
     fx = pd.DataFrame(fixtures)
@@ -86,7 +101,7 @@ def live_fetch(outdir: pathlib.Path, season_code: str):
     gameweek = bounds[["code","game_no","min","max"]].rename(columns={"min":"start_time","max":"end_time"})
     gameweek["start_time"] = gameweek["start_time"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
     gameweek["end_time"]   = gameweek["end_time"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
-    gameweek.to_csv(outdir / "gameweek.csv", index=False)
+    frames["gameweek"] = gameweek
 
     # match.csv
     m = fx.copy()
@@ -101,7 +116,8 @@ def live_fetch(outdir: pathlib.Path, season_code: str):
     # NEW: enforce integer dtype for goals (so CSV has 0,1,2 not 0.0,1.0)
     for col in ["home_goals", "away_goals"]:
         match[col] = match[col].astype("Int64")
-    match.to_csv(outdir / "match.csv", index=False)
+    frames["match"] = match
+    return frames
 
 # -------------------------
 # ARCHIVE (Vaastav repo)
@@ -116,7 +132,9 @@ def archive_urls(season_code):
         "merged_gw":   f"{base}/gws/merged_gw.csv"
     }
 
-def archive_fetch(outdir: pathlib.Path, season_code: str):
+def archive_fetch(season_code: str) -> dict:
+    """Same tables as live_fetch, from the archive CSVs."""
+    frames = {}
     urls = archive_urls(season_code)
 
     # teams
@@ -137,7 +155,7 @@ def archive_fetch(outdir: pathlib.Path, season_code: str):
         code_series = (teams_df[short] if short in teams_df.columns else teams_df[name_col]).astype(str)
         code3 = code_series.str[:3].str.upper()
         team = pd.DataFrame({"code": code3, "name": teams_df[name_col].astype(str)}).drop_duplicates("code")
-        team.to_csv(outdir / "team.csv", index=False)
+        frames["team"] = team
         if id_col:
             id_to_code = dict(zip(teams_df[id_col], code3))
         name_to_code = dict(zip(teams_df[name_col].astype(str), code3))
@@ -149,7 +167,7 @@ def archive_fetch(outdir: pathlib.Path, season_code: str):
         tmp = pr[[name_col]].drop_duplicates().rename(columns={name_col:"name"})
         tmp["code"] = tmp["name"].astype(str).str[:3].str.upper()
         team = tmp[["code","name"]]
-        team.to_csv(outdir / "team.csv", index=False)
+        frames["team"] = team
         name_to_code = dict(zip(team["name"], team["code"]))
 
     # players (filter out staff/managers)
@@ -200,6 +218,7 @@ def archive_fetch(outdir: pathlib.Path, season_code: str):
         n = counters[cd]; shirts.append(n if n <= 99 else (n % 99 or 99))
 
     player = pd.DataFrame({
+        "fpl_id":     pr_players["id"],
         "team_code": codes,
         "first_name": pr_players.get("first_name", pd.Series([""]*len(pr_players))),
         "last_name":  pr_players.get("second_name", pd.Series([""]*len(pr_players))),
@@ -207,7 +226,7 @@ def archive_fetch(outdir: pathlib.Path, season_code: str):
         "shirt_no":   shirts,
         "cost":       (pr_players.get("now_cost", pd.Series([0]*len(pr_players))) / 10.0).round(2)
     }).dropna(subset=["team_code","position"])
-    player.to_csv(outdir / "player.csv", index=False)
+    frames["player"] = player
 
     # gameweeks & matches
     try:
@@ -225,7 +244,7 @@ def archive_fetch(outdir: pathlib.Path, season_code: str):
             gameweek = bounds[["code","game_no","min","max"]].rename(columns={"min":"start_time","max":"end_time"})
             gameweek["start_time"] = gameweek["start_time"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
             gameweek["end_time"]   = gameweek["end_time"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
-            gameweek.to_csv(outdir / "gameweek.csv", index=False)
+            frames["gameweek"] = gameweek
 
         # matches
         def col(*opts):
@@ -261,7 +280,7 @@ def archive_fetch(outdir: pathlib.Path, season_code: str):
             mat["gw_code"] = pd.NA
         match = mat[["gw_code","hometeam_code","awayteam_code","gametime","home_goals","away_goals"]]\
                 .dropna(subset=["hometeam_code","awayteam_code"])
-        match.to_csv(outdir / "match.csv", index=False)
+        frames["match"] = match
     else:
         # fallback GW bounds from merged_gw
         mgw = pd.read_csv(urls["merged_gw"])
@@ -278,30 +297,72 @@ def archive_fetch(outdir: pathlib.Path, season_code: str):
         out = bounds[["code","game_no","min","max"]].rename(columns={"min":"start_time","max":"end_time"})
         out["start_time"] = out["start_time"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
         out["end_time"]   = out["end_time"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
-        out.to_csv(outdir / "gameweek.csv", index=False)
+        frames["gameweek"] = out
         # empty matches
-        pd.DataFrame(columns=["gw_code","hometeam_code","awayteam_code","gametime","home_goals","away_goals"]).to_csv(outdir / "match.csv", index=False)
+        frames["match"] = pd.DataFrame(columns=["gw_code","hometeam_code","awayteam_code","gametime","home_goals","away_goals"])
+    return frames
+
+def write_csvs(frames: dict, outdir: pathlib.Path):
+    for table, df in frames.items():
+        df.to_csv(outdir / f"{table}.csv", index=False)
+
+def write_parquet(frames: dict, outdir: pathlib.Path):
+    columnar.require()
+    for table, df in frames.items():
+        columnar.write_table(table, df, outdir / f"{table}.parquet")
+
+def load_frames(frames: dict, fetch_s: float):
+    """COPY every DataFrame from memory into the database, merged in one transaction."""
+    import psycopg2
+    from load_schema_data import LEVELS, TABLES, dsn, finish_load, print_stats, stage_and_merge
+    t0 = time.perf_counter()
+    stats = []
+    conn = psycopg2.connect(dsn())
+    try:
+        with conn, conn.cursor() as cur:
+            for level in LEVELS:
+                for table in level:
+                    if table not in frames:
+                        print(f"SKIP {table} (not fetched)"); continue
+                    if columnar.pa is not None:
+                        # Typed per the table's schema (no 1.0 goals, exact costs)
+                        buf = columnar.csv_buffer(columnar.to_table(table, frames[table]))
+                    else:
+                        buf = io.StringIO()
+                        frames[table][TABLES[table][1]].to_csv(buf, index=False)
+                        buf.seek(0)
+                    stats.append(stage_and_merge(cur, table, buf))
+            finish_load(cur, any(s["inserted"] or s["updated"] for s in stats))
+    finally:
+        conn.close()
+    print(f"Fetched in {fetch_s:.2f} s")
+    print_stats(stats, time.perf_counter() - t0)
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--out", default="data")
     ap.add_argument("--mode", choices=["live","archive"], default="live")
     ap.add_argument("--season", default="2526", help="2425 for 2024/25, 2526 for 2025/26")
+    ap.add_argument("--format", choices=["csv","parquet"], default="csv", help="parquet: typed columnar files (needs pyarrow)")
+    ap.add_argument("--load", action="store_true", help="load into the database (backend/.env) instead of writing CSVs")
     args = ap.parse_args()
-    outdir = pathlib.Path(args.out); outdir.mkdir(parents=True, exist_ok=True)
 
-    if args.mode == "live":
-        live_fetch(outdir, args.season)
-    else:
-        archive_fetch(outdir, args.season)
+    t0 = time.perf_counter()
+    frames = live_fetch(args.season) if args.mode == "live" else archive_fetch(args.season)
+    if args.load:
+        load_frames(frames, time.perf_counter() - t0)
+        return
+
+    outdir = pathlib.Path(args.out); outdir.mkdir(parents=True, exist_ok=True)
+    (write_parquet if args.format == "parquet" else write_csvs)(frames, outdir)
 
     # # stubs so loaders don't fail if you want to seed later
     # pd.DataFrame(columns=["username","email"]).to_csv(outdir / "app_user.csv", index=False)
     # pd.DataFrame(columns=["user_id","name"]).to_csv(outdir / "fantasy_team.csv", index=False)
-    # pd.DataFrame(columns=["ft_id","gw_code","player_id","slot","captain","vice_captain"]).to_csv(outdir / "fantasy_lineup.csv", index=False)
+    # pd.DataFrame(columns=["ft_id","gw_code","player_ids","captain_slot","vice_captain_slot"]).to_csv(outdir / "fantasy_lineup.csv", index=False)
     # pd.DataFrame(columns=["player_id","gw_code","points"]).to_csv(outdir / "player_points.csv", index=False)
 
-    print("Done. Wrote CSVs to", outdir.resolve())
+    print(f"Done. Wrote {args.format.upper()} files to", outdir.resolve())
 
 if __name__ == "__main__":
     main()
@@ -1,40 +1,72 @@
 #!/usr/bin/env python3
 """
-Load CSVs 
+Load CSVs
 
 Expected CSVs in --data:
 - team.csv(code,name)
-- player.csv(team_code,first_name,last_name,position,shirt_no,cost)
+- player.csv(fpl_id,team_code,first_name,last_name,position,shirt_no,cost)
 - gameweek.csv(code,game_no,start_time,end_time)
 - match.csv(gw_code,hometeam_code,awayteam_code,gametime,home_goals,away_goals)
 
 
 - app_user.csv(username,email)                       [optional]
 - fantasy_team.csv(user_id,name)                     [optional]
-- fantasy_lineup.csv(ft_id,gw_code,player_id,slot,captain,vice_captain) [optional]
+- fantasy_lineup.csv(ft_id,gw_code,player_ids,captain_slot,vice_captain_slot) [optional]
 - player_points.csv(player_id,gw_code,points)        [optional]
 
+Incremental: each CSV is COPYed into a temporary staging table and merged
+into the live table on its natural key (team and gameweek code, the
+player's FPL id, match home + away team). New rows are inserted, rows
+whose values changed (prices, results, kick-off times) are updated, and
+identical rows are not touched, so reloading mid-season keeps ids and
+fantasy data. A player who changed club is updated in place: same id, new
+team_code, still in the lineups that picked them. Rows missing from the
+CSVs are left alone. When match results change, the EPL table snapshots
+from the earliest affected gameweek on are dropped in the same
+transaction (/epl-table falls back to adding up the matches).
+
+A <table>.parquet written by fetch_schema_data.py --format parquet is
+loaded instead of the CSV when present (needs pyarrow).
+
+Tables load in parallel, one connection each, level by level: team and
+gameweek first, then player and match (which reference them). Each table
+commits on its own; a failed run can simply be repeated.
+
 Usage:
     python load_schema_data.py --data data       # --season 2526
     python load_schema_data.py --data data_prev  # --season 2425
+    python load_schema_data.py --data data --jobs 1   # one table at a time
 """
-import argparse, os, sys
+import argparse, os, sys, time
+from concurrent.futures import ThreadPoolExecutor
 import psycopg2
 from psycopg2 import sql
 from dotenv import load_dotenv
 import os
+import columnar
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "../backend/.env"))
 
-ORDER = [
-    ("public.team", "team.csv", ["code","name"]),
-    ("public.player", "player.csv", ["team_code","first_name","last_name","position","shirt_no","cost"]),
-    ("public.gameweek", "gameweek.csv", ["code","game_no","start_time","end_time"]),
-    ("public.match", "match.csv", ["gw_code","hometeam_code","awayteam_code","gametime","home_goals","away_goals"]),
-    # ("public.app_user", "app_user.csv", ["username","email"]),
-    # ("public.fantasy_team", "fantasy_team.csv", ["user_id","name"]),
-    # ("public.player_points", "player_points.csv", ["player_id","gw_code","points"]),
-    # ("public.fantasy_lineup", "fantasy_lineup.csv", ["ft_id","gw_code","player_id","slot","captain","vice_captain"]),
-]
+# (table, csv, columns, natural key)
+TABLES = {
+    "team":     ("team.csv", ["code","name"], ["code"]),
+    "gameweek": ("gameweek.csv", ["code","game_no","start_time","end_time"], ["code"]),
+    "player":   ("player.csv", ["fpl_id","team_code","first_name","last_name","position","shirt_no","cost"], ["fpl_id"]),
+    "match":    ("match.csv", ["gw_code","hometeam_code","awayteam_code","gametime","home_goals","away_goals"], ["hometeam_code","awayteam_code"]),
+    # ("app_user", "app_user.csv", ["username","email"]),
+    # ("fantasy_team", "fantasy_team.csv", ["user_id","name"]),
+    # ("player_points", "player_points.csv", ["player_id","gw_code","points"]),
+    # ("fantasy_lineup", "fantasy_lineup.csv", ["ft_id","gw_code","player_ids","captain_slot","vice_captain_slot"]),
+}
+
+# Rows loaded before their table had its key column (player.fpl_id, migration
+# 011) are matched on these columns once and given their key
+ADOPT = {"player": ["team_code", "first_name", "last_name"]}
+
+# Column whose values merge() reports for the rows it wrote (old and new value)
+TRACK = {"match": "gw_code"}
+
+# Tables in a level only reference tables of earlier levels
+LEVELS = [["team", "gameweek"], ["player", "match"]]
 
 def dsn():
     host = os.environ.get("DB_HOST")
@@ -47,34 +79,166 @@ def dsn():
         print("Missing DB_HOST/DB_PASSWORD", file=sys.stderr); sys.exit(2)
     return f"host={host} port={port} dbname={db} user={user} password={pw} sslmode={ssl}"
 
-def copy_csv(cur, table, path, cols):
-    with open(path, "r", encoding="utf-8") as f:
-        cur.copy_expert(
-            sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT CSV, HEADER TRUE)").format(
-                sql.SQL(table), sql.SQL(",").join(map(sql.Identifier, cols))
-            ),
-            f
+def create_stage(cur, table, cols):
+    """Empty temp table with the live table's column types, no constraints; dropped on commit."""
+    stage = sql.Identifier(f"stage_{table}")
+    cur.execute(sql.SQL("CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM public.{} WITH NO DATA").format(
+        stage, sql.SQL(",").join(map(sql.Identifier, cols)), sql.Identifier(table)
+    ))
+    return stage
+
+def copy_csv(cur, table, f, cols):
+    cur.copy_expert(
+        sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT CSV, HEADER TRUE)").format(
+            table, sql.SQL(",").join(map(sql.Identifier, cols))
+        ),
+        f
+    )
+
+def adopt(cur, table, stage, key, match):
+    """Fill a NULL key from staging where `match` pairs exactly one live row with one staged row."""
+    ident = lambda names: sql.SQL(",").join(map(sql.Identifier, names))
+    cur.execute(sql.SQL("""
+        WITH pairs AS (
+            SELECT t.id, s.{key},
+                   COUNT(*) OVER (PARTITION BY t.id) AS n_live,
+                   COUNT(*) OVER (PARTITION BY s.{key}) AS n_staged
+            FROM public.{table} t JOIN {stage} s USING ({match})
+            WHERE t.{key} IS NULL
+              AND NOT EXISTS (SELECT 1 FROM public.{table} k WHERE k.{key} = s.{key})
+        )
+        UPDATE public.{table} t SET {key} = pairs.{key}
+        FROM pairs WHERE t.id = pairs.id AND n_live = 1 AND n_staged = 1
+    """).format(table=sql.Identifier(table), stage=stage, key=sql.Identifier(key), match=ident(match)))
+
+def merge(cur, table, stage, cols, key, track=None):
+    """
+    Upsert stage into table; returns (inserted, updated, touched). Identical rows are skipped.
+    touched: the distinct values of column `track` on the rows written, before and after.
+    """
+    rest = [c for c in cols if c not in key]
+    ident = lambda names: sql.SQL(",").join(map(sql.Identifier, names))
+    # The outer SELECT still sees the table as it was before the INSERT,
+    # which gives the old value of an updated row
+    touched = sql.SQL("ARRAY[]::text[]")
+    if track:
+        touched = sql.SQL("""ARRAY(
+            SELECT m.{track} FROM merged m
+            UNION SELECT o.{track} FROM public.{table} o JOIN merged m USING ({key})
+        )""").format(track=sql.Identifier(track), table=sql.Identifier(table), key=ident(key))
+    returning = key + ([track] if track else [])
+    cur.execute(sql.SQL("""
+        WITH merged AS (
+            INSERT INTO public.{table} AS t ({cols})
+            SELECT {cols} FROM {stage}
+            ON CONFLICT ({key}) DO UPDATE SET ({rest}) = ROW({excluded})
+            WHERE ({current}) IS DISTINCT FROM ({excluded})
+            RETURNING (xmax = 0) AS inserted, {returning}
         )
+        SELECT COUNT(*) FILTER (WHERE inserted) AS inserted,
+               COUNT(*) FILTER (WHERE NOT inserted) AS updated,
+               {touched}
+        FROM merged
+    """).format(
+        table=sql.Identifier(table), cols=ident(cols), stage=stage, key=ident(key), rest=ident(rest),
+        current=sql.SQL(",").join(sql.SQL("t.{}").format(sql.Identifier(c)) for c in rest),
+        excluded=sql.SQL(",").join(sql.SQL("EXCLUDED.{}").format(sql.Identifier(c)) for c in rest),
+        returning=sql.SQL(",").join(sql.SQL("t.{}").format(sql.Identifier(c)) for c in returning),
+        touched=touched,
+    ))
+    return cur.fetchone()
+
+def drop_epl_tables(cur, gw_codes):
+    """
+    Changed results invalidate the EPL table from the earliest of gw_codes on:
+    each snapshot builds on the one before it. /epl-table adds up the matches
+    until simulate writes the gameweek again.
+    """
+    cur.execute("""
+        DELETE FROM epl_table_snapshot
+        WHERE gw_code IN (
+            SELECT code FROM gameweek
+            WHERE game_no >= (SELECT MIN(game_no) FROM gameweek WHERE code = ANY(%s::bpchar[]))
+        )
+    """, (gw_codes,))
+    if cur.rowcount:
+        print(f"Dropped {cur.rowcount} EPL table rows from {min(gw_codes)} on (results changed)")
+
+def stage_and_merge(cur, table, f):
+    """COPY CSV text from file object f into staging and merge it into table; returns its stats."""
+    _, cols, key = TABLES[table]
+    t0 = time.perf_counter()
+    stage = create_stage(cur, table, cols)
+    copy_csv(cur, stage, f, cols)
+    staged = cur.rowcount
+    t1 = time.perf_counter()
+    if table in ADOPT:
+        adopt(cur, table, stage, key[0], ADOPT[table])
+    inserted, updated, touched = merge(cur, table, stage, cols, key, TRACK.get(table))
+    if table == "match" and touched:
+        # Same transaction as the new results
+        drop_epl_tables(cur, touched)
+    t2 = time.perf_counter()
+    return {"table": table, "staged": staged, "inserted": inserted, "updated": updated,
+            "unchanged": staged - inserted - updated, "copy_s": t1 - t0, "merge_s": t2 - t1}
+
+def open_source(table, data_dir):
+    """<table>.parquet (as CSV bytes) if present, else the CSV file; None if neither."""
+    parquet = os.path.join(data_dir, f"{table}.parquet")
+    if os.path.exists(parquet):
+        columnar.require()
+        return columnar.csv_buffer(columnar.read_table(parquet))
+    path = os.path.join(data_dir, TABLES[table][0])
+    if not os.path.exists(path) or os.stat(path).st_size == 0:
+        return None
+    return open(path, "r", encoding="utf-8")
+
+def load_table(table, data_dir):
+    """Stage and merge one table's file on its own connection; returns its stats (None if skipped)."""
+    f = open_source(table, data_dir)
+    if f is None:
+        print(f"SKIP {table} (missing/empty {TABLES[table][0]})"); return None
+    conn = psycopg2.connect(dsn())
+    try:
+        with conn, conn.cursor() as cur, f:
+            return stage_and_merge(cur, table, f)
+    finally:
+        conn.close()
+
+def finish_load(cur, changed):
+    # Recount gameweek.status from the loaded results
+    cur.execute("SELECT refresh_gameweek_status()")
+    # Invalidate every ETag / cached response; running API workers are notified on commit.
+    # A reload that changed nothing keeps the caches.
+    if changed:
+        cur.execute("SELECT bump_data_version('global')")
+
+def print_stats(stats, elapsed):
+    print(f"\n{'table':<10} {'staged':>8} {'inserted':>9} {'updated':>8} {'unchanged':>10} {'copy ms':>9} {'merge ms':>9}")
+    for s in stats:
+        print(f"{s['table']:<10} {s['staged']:>8} {s['inserted']:>9} {s['updated']:>8} {s['unchanged']:>10} "
+              f"{s['copy_s'] * 1000:>9.1f} {s['merge_s'] * 1000:>9.1f}")
+    print(f"Load complete in {elapsed:.2f} s")
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--data", default="data")
+    ap.add_argument("--jobs", type=int, default=4, help="tables loaded at once (1: one after another)")
     args = ap.parse_args()
-    conn = psycopg2.connect(dsn()); conn.autocommit = False
+    t0 = time.perf_counter()
+    stats = []
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        for level in LEVELS:
+            # Every table of a level has committed before the next level starts
+            futures = [pool.submit(load_table, table, args.data) for table in level]
+            stats += [s for s in (f.result() for f in futures) if s is not None]
+    conn = psycopg2.connect(dsn())
     try:
-        with conn.cursor() as cur:
-            cur.execute("SET CONSTRAINTS ALL DEFERRED;")
-            for table, fname, cols in ORDER:
-                path = os.path.join(args.data, fname)
-                if not os.path.exists(path) or os.stat(path).st_size == 0:
-                    print(f"SKIP {table} (missing/empty {fname})"); continue
-                print(f"Loading {table} from {fname} ...")
-                copy_csv(cur, table, path, cols)
-        conn.commit(); print("Load complete")
-    except Exception:
-        conn.rollback(); raise
+        with conn, conn.cursor() as cur:
+            finish_load(cur, any(s["inserted"] or s["updated"] for s in stats))
     finally:
         conn.close()
+    print_stats(stats, time.perf_counter() - t0)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,33 @@
+-- ============================================================================
+-- MIGRATION 001: Indexed player search
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql:
+-- - player.search_name (normalized "first last", lower-case)
+-- - trigram + prefix indexes for name search
+-- - filter + sort indexes for team / position browsing
+--
+-- Safe to run more than once.
+-- ============================================================================
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE player
+    ADD COLUMN IF NOT EXISTS search_name TEXT
+    GENERATED ALWAYS AS (LOWER(first_name || ' ' || last_name)) STORED;
+
+DROP INDEX IF EXISTS idx_player_team;
+DROP INDEX IF EXISTS idx_player_position;
+
+CREATE INDEX idx_player_team ON player(team_code, position, cost DESC);
+CREATE INDEX idx_player_position ON player(position, cost DESC);
+CREATE INDEX IF NOT EXISTS idx_player_cost ON player(cost DESC);
+CREATE INDEX IF NOT EXISTS idx_player_search_trgm ON player USING GIN (search_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_player_search_prefix ON player(search_name text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_player_last_name_prefix ON player(LOWER(last_name) text_pattern_ops);
+
+ANALYZE player;
+
+COMMIT;
@@ -0,0 +1,49 @@
+-- ============================================================================
+-- MIGRATION 002: Standings snapshot for paginated /standings
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql:
+-- - standings_snapshot: cumulative points per team for every scored GW
+-- - (gw_code, total_points DESC, ft_id) index for keyset pages
+--
+-- Backfills every gameweek that already has player points, using the same
+-- totals as v_fantasy_standings. Afterwards simulate keeps it up to date.
+--
+-- Safe to run more than once.
+-- ============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS standings_snapshot (
+    gw_code      CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
+    ft_id        BIGINT NOT NULL REFERENCES fantasy_team(id) ON UPDATE CASCADE ON DELETE CASCADE,
+    gw_points    INT NOT NULL DEFAULT 0,
+    total_points INT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (gw_code, ft_id)
+);
+
+COMMENT ON TABLE standings_snapshot IS 'Cumulative fantasy points up to each scored gameweek (player points + chemistry bonus)';
+CREATE INDEX IF NOT EXISTS idx_standings_snapshot_rank ON standings_snapshot(gw_code, total_points DESC, ft_id);
+-- ON DELETE CASCADE from fantasy_team
+CREATE INDEX IF NOT EXISTS idx_standings_snapshot_ft ON standings_snapshot(ft_id);
+
+DELETE FROM standings_snapshot;
+
+INSERT INTO standings_snapshot (gw_code, ft_id, gw_points, total_points)
+SELECT c.gw_code, c.ft_id, c.gw_points, c.total_points
+FROM (
+    SELECT
+        g.code AS gw_code,
+        ft.id AS ft_id,
+        COALESCE(v.gw_total_points, 0) AS gw_points,
+        SUM(COALESCE(v.gw_total_points, 0)) OVER (PARTITION BY ft.id ORDER BY g.game_no) AS total_points
+    FROM fantasy_team ft
+    CROSS JOIN gameweek g
+    LEFT JOIN v_fantasy_standings v ON v.ft_id = ft.id AND v.gw_code = g.code
+) c
+WHERE EXISTS (SELECT 1 FROM player_points pp WHERE pp.gw_code = c.gw_code);
+
+ANALYZE standings_snapshot;
+
+COMMIT;
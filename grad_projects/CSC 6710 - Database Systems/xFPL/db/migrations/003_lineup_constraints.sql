@@ -0,0 +1,56 @@
+-- ============================================================================
+-- MIGRATION 003: Declarative lineup constraints
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql:
+-- - drops the FOR EACH ROW plpgsql triggers on fantasy_lineup
+--   (check_lineup_limit, check_single_captain, check_single_vice_captain)
+-- - one captain / one vice-captain per lineup via partial unique indexes
+--
+-- The starter limit needs nothing extra: slot is CHECKed to 1-15 and
+-- (ft_id, gw_code, slot) is the primary key.
+--
+-- The old captain triggers silently cleared a previous captain; any
+-- duplicates that slipped in anyway are resolved to the lowest slot before
+-- the indexes are built. Safe to run more than once.
+-- ============================================================================
+
+BEGIN;
+
+DROP TRIGGER IF EXISTS trg_check_lineup_limit ON fantasy_lineup;
+DROP TRIGGER IF EXISTS trg_single_captain ON fantasy_lineup;
+DROP TRIGGER IF EXISTS trg_single_vice_captain ON fantasy_lineup;
+DROP FUNCTION IF EXISTS check_lineup_limit();
+DROP FUNCTION IF EXISTS check_single_captain();
+DROP FUNCTION IF EXISTS check_single_vice_captain();
+
+UPDATE fantasy_lineup fl
+SET captain = FALSE
+FROM (
+    SELECT ft_id, gw_code, MIN(slot) AS keep_slot
+    FROM fantasy_lineup
+    WHERE captain
+    GROUP BY ft_id, gw_code
+    HAVING COUNT(*) > 1
+) d
+WHERE fl.ft_id = d.ft_id AND fl.gw_code = d.gw_code
+  AND fl.captain AND fl.slot <> d.keep_slot;
+
+UPDATE fantasy_lineup fl
+SET vice_captain = FALSE
+FROM (
+    SELECT ft_id, gw_code, MIN(slot) AS keep_slot
+    FROM fantasy_lineup
+    WHERE vice_captain
+    GROUP BY ft_id, gw_code
+    HAVING COUNT(*) > 1
+) d
+WHERE fl.ft_id = d.ft_id AND fl.gw_code = d.gw_code
+  AND fl.vice_captain AND fl.slot <> d.keep_slot;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_lineup_captain
+    ON fantasy_lineup(ft_id, gw_code) WHERE captain;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_lineup_vice_captain
+    ON fantasy_lineup(ft_id, gw_code) WHERE vice_captain;
+
+COMMIT;
@@ -0,0 +1,141 @@
+-- ============================================================================
+-- MIGRATION 004: One fantasy_lineup row per team per gameweek
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql:
+-- - fantasy_lineup(ft_id, gw_code, player_id, slot, captain, vice_captain),
+--   11 rows per lineup, becomes
+--   fantasy_lineup(ft_id, gw_code, player_ids[], captain_slot, vice_captain_slot)
+-- - the lineup rules become row CHECKs (SECTION 6 of the schema); the
+--   partial captain indexes from migration 003 go away with the old table
+-- - v_lineup_slot gives the old one-row-per-slot shape back for reads
+-- - v_fantasy_standings / v_fantasy_team_total_points are rebuilt on it
+--
+-- Slots are renumbered 1..n in their old order, so gaps (if any) close up;
+-- a captain/vice flag on a bench slot is dropped.
+--
+-- Safe to run more than once: the conversion is skipped when the table
+-- already has player_ids.
+-- ============================================================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION lineup_players_distinct(ids BIGINT[])
+RETURNS BOOLEAN AS $$
+    SELECT COUNT(DISTINCT id) = cardinality(ids) FROM unnest(ids) AS id
+$$ LANGUAGE sql IMMUTABLE;
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'fantasy_lineup'
+          AND column_name = 'slot'
+    ) THEN
+        CREATE TABLE fantasy_lineup_compact (
+            ft_id               BIGINT NOT NULL REFERENCES fantasy_team(id) ON UPDATE CASCADE ON DELETE CASCADE,
+            gw_code             CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
+            player_ids          BIGINT[] NOT NULL,
+            captain_slot        SMALLINT,
+            vice_captain_slot   SMALLINT,
+
+            PRIMARY KEY (ft_id, gw_code)
+        );
+
+        INSERT INTO fantasy_lineup_compact (ft_id, gw_code, player_ids, captain_slot, vice_captain_slot)
+        SELECT
+            l.ft_id,
+            l.gw_code,
+            l.player_ids,
+            c.slot,
+            CASE WHEN v.slot IS DISTINCT FROM c.slot THEN v.slot END
+        FROM (
+            SELECT
+                ft_id,
+                gw_code,
+                array_agg(player_id ORDER BY slot) AS player_ids,
+                MIN(player_id) FILTER (WHERE captain AND slot <= 11) AS captain_id,
+                MIN(player_id) FILTER (WHERE vice_captain AND slot <= 11) AS vice_captain_id
+            FROM fantasy_lineup
+            GROUP BY ft_id, gw_code
+        ) l
+        CROSS JOIN LATERAL (SELECT array_position(l.player_ids, l.captain_id)::SMALLINT AS slot) c
+        CROSS JOIN LATERAL (SELECT array_position(l.player_ids, l.vice_captain_id)::SMALLINT AS slot) v;
+
+        -- Takes v_fantasy_standings / v_fantasy_team_total_points with it
+        DROP TABLE fantasy_lineup CASCADE;
+
+        ALTER TABLE fantasy_lineup_compact RENAME TO fantasy_lineup;
+        ALTER INDEX fantasy_lineup_compact_pkey RENAME TO fantasy_lineup_pkey;
+        ALTER TABLE fantasy_lineup RENAME CONSTRAINT fantasy_lineup_compact_ft_id_fkey TO fantasy_lineup_ft_id_fkey;
+        ALTER TABLE fantasy_lineup RENAME CONSTRAINT fantasy_lineup_compact_gw_code_fkey TO fantasy_lineup_gw_code_fkey;
+
+        ALTER TABLE fantasy_lineup
+            ADD CONSTRAINT chk_lineup_distinct CHECK (lineup_players_distinct(player_ids)),
+            ADD CONSTRAINT chk_lineup_size CHECK (cardinality(player_ids) BETWEEN 1 AND 15),
+            ADD CONSTRAINT chk_lineup_captain CHECK (captain_slot BETWEEN 1 AND LEAST(11, cardinality(player_ids))),
+            ADD CONSTRAINT chk_lineup_vice_captain CHECK (vice_captain_slot BETWEEN 1 AND LEAST(11, cardinality(player_ids))),
+            ADD CONSTRAINT chk_lineup_captain_vice CHECK (captain_slot <> vice_captain_slot);
+
+        CREATE INDEX idx_lineup_gw ON fantasy_lineup(gw_code);
+    END IF;
+END $$;
+
+COMMENT ON TABLE fantasy_lineup IS 'Player selections for each fantasy team per gameweek (one row per lineup)';
+
+CREATE OR REPLACE VIEW v_lineup_slot AS
+SELECT
+    fl.ft_id,
+    fl.gw_code,
+    s.slot::SMALLINT AS slot,
+    s.player_id,
+    COALESCE(s.slot = fl.captain_slot, FALSE) AS captain,
+    COALESCE(s.slot = fl.vice_captain_slot, FALSE) AS vice_captain
+FROM fantasy_lineup fl
+CROSS JOIN LATERAL unnest(fl.player_ids) WITH ORDINALITY AS s(player_id, slot);
+
+COMMENT ON VIEW v_lineup_slot IS 'One row per lineup slot (unnested fantasy_lineup.player_ids)';
+
+CREATE OR REPLACE VIEW v_fantasy_standings AS
+SELECT
+    ft.id AS ft_id,
+    ft.name AS team_name,
+    u.username,
+    fl.gw_code,
+    COALESCE(SUM(pp.points), 0) AS gw_player_points,
+    COALESCE(MAX(cb.points), 0) AS gw_bonus_points,
+    COALESCE(SUM(pp.points), 0) + COALESCE(MAX(cb.points), 0) AS gw_total_points
+FROM fantasy_team ft
+LEFT JOIN app_user u ON u.id = ft.user_id
+LEFT JOIN v_lineup_slot fl ON fl.ft_id = ft.id AND fl.slot BETWEEN 1 AND 11
+LEFT JOIN player_points pp ON pp.player_id = fl.player_id AND pp.gw_code = fl.gw_code
+LEFT JOIN chemistry_bonus cb ON cb.ft_id = ft.id AND cb.gw_code = fl.gw_code
+WHERE fl.gw_code IS NOT NULL
+GROUP BY ft.id, ft.name, u.username, fl.gw_code;
+
+COMMENT ON VIEW v_fantasy_standings IS 'Fantasy points per team per gameweek (player points + chemistry bonus)';
+
+CREATE OR REPLACE VIEW v_fantasy_team_total_points AS
+SELECT
+    ft.id AS ft_id,
+    ft.name AS team_name,
+    u.username,
+    COALESCE(SUM(pp.points), 0) AS total_player_points,
+    COALESCE((
+        SELECT SUM(points) FROM chemistry_bonus WHERE ft_id = ft.id
+    ), 0) AS total_bonus_points,
+    COALESCE(SUM(pp.points), 0) + COALESCE((
+        SELECT SUM(points) FROM chemistry_bonus WHERE ft_id = ft.id
+    ), 0) AS total_points
+FROM fantasy_team ft
+LEFT JOIN app_user u ON u.id = ft.user_id
+LEFT JOIN v_lineup_slot fl ON fl.ft_id = ft.id AND fl.slot BETWEEN 1 AND 11
+LEFT JOIN player_points pp ON pp.player_id = fl.player_id AND pp.gw_code = fl.gw_code
+GROUP BY ft.id, ft.name, u.username;
+
+COMMENT ON VIEW v_fantasy_team_total_points IS 'Cumulative fantasy points for all time';
+
+ANALYZE fantasy_lineup;
+
+COMMIT;
@@ -0,0 +1,258 @@
+-- ============================================================================
+-- MIGRATION 005: Partition the per-gameweek tables by gw_code
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql (SECTION 8):
+-- - fantasy_lineup, player_points, chemistry_bonus and fantasy_fixture are
+--   rebuilt as LIST-partitioned tables, one partition per gameweek plus a
+--   DEFAULT partition, and their rows copied across
+-- - fantasy_fixture's primary key becomes (id, gw_code); ids are kept
+-- - idx_lineup_gw, idx_player_points_gw and idx_chemistry_ft_gw go away
+--   (the partition itself is the gameweek filter / the primary key covers it)
+-- - adds create_gameweek_partitions() and the archive_season() procedure
+--   (migration 013 extends archive_season() to transfer, standings_snapshot,
+--   epl_table_snapshot and match)
+-- - v_lineup_slot / v_fantasy_standings / v_fantasy_team_total_points are
+--   recreated on the new tables
+--
+-- Each table is converted in one go (rename, create, copy, drop) under the
+-- migration's transaction. Safe to run more than once: a table that is
+-- already partitioned is skipped.
+-- ============================================================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION create_gameweek_partitions(parent REGCLASS, last_game_no INT DEFAULT 38)
+RETURNS VOID AS $$
+DECLARE
+    nsp  TEXT;
+    base TEXT;
+    n    INT;
+BEGIN
+    SELECT n.nspname, c.relname INTO nsp, base
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.oid = parent;
+
+    FOR n IN 1..last_game_no LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I.%I PARTITION OF %s FOR VALUES IN (%L)',
+            nsp, base || '_gw' || lpad(n::TEXT, 2, '0'), parent, 'GW' || lpad(n::TEXT, 2, '0')
+        );
+    END LOOP;
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %I.%I PARTITION OF %s DEFAULT', nsp, base || '_default', parent);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE PROCEDURE archive_season(season TEXT)
+LANGUAGE plpgsql AS $$
+DECLARE
+    parent REGCLASS;
+    part   RECORD;
+    fk     RECORD;
+BEGIN
+    CREATE SCHEMA IF NOT EXISTS archive;
+
+    FOREACH parent IN ARRAY
+        ARRAY['fantasy_lineup', 'player_points', 'chemistry_bonus', 'fantasy_fixture']::REGCLASS[]
+    LOOP
+        FOR part IN
+            SELECT c.oid::REGCLASS AS rel, c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = parent
+        LOOP
+            EXECUTE format('ALTER TABLE %s DETACH PARTITION %s', parent, part.rel);
+            FOR fk IN
+                SELECT conname FROM pg_constraint WHERE conrelid = part.rel AND contype = 'f'
+            LOOP
+                EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', part.rel, fk.conname);
+            END LOOP;
+            EXECUTE format('ALTER TABLE %s SET SCHEMA archive', part.rel);
+            EXECUTE format('ALTER TABLE %s RENAME TO %I', part.rel, part.relname || '_' || season);
+        END LOOP;
+
+        PERFORM create_gameweek_partitions(parent);
+    END LOOP;
+END;
+$$;
+
+DO $$
+DECLARE
+    t   TEXT;
+    obj RECORD;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['fantasy_lineup', 'player_points', 'chemistry_bonus', 'fantasy_fixture'] LOOP
+        CONTINUE WHEN NOT EXISTS (
+            SELECT 1 FROM pg_class
+            WHERE oid = to_regclass(t) AND relkind = 'r'
+        );
+
+        -- Free the constraint / index names for the new table
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', t, t || '_unpartitioned');
+        FOR obj IN
+            SELECT conname FROM pg_constraint
+            WHERE conrelid = to_regclass(t || '_unpartitioned') AND contype IN ('p', 'u', 'f', 'c')
+        LOOP
+            EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', t || '_unpartitioned', obj.conname);
+        END LOOP;
+        FOR obj IN
+            SELECT indexrelid::REGCLASS AS idx FROM pg_index
+            WHERE indrelid = to_regclass(t || '_unpartitioned')
+        LOOP
+            EXECUTE format('DROP INDEX %s', obj.idx);
+        END LOOP;
+    END LOOP;
+
+    IF to_regclass('fantasy_lineup_unpartitioned') IS NOT NULL THEN
+        CREATE TABLE fantasy_lineup (
+            ft_id               BIGINT NOT NULL REFERENCES fantasy_team(id) ON UPDATE CASCADE ON DELETE CASCADE,
+            gw_code             CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
+            player_ids          BIGINT[] NOT NULL,
+            captain_slot        SMALLINT,
+            vice_captain_slot   SMALLINT,
+
+            PRIMARY KEY (ft_id, gw_code),
+            CONSTRAINT chk_lineup_distinct CHECK (lineup_players_distinct(player_ids)),
+            CONSTRAINT chk_lineup_size CHECK (cardinality(player_ids) BETWEEN 1 AND 15),
+            CONSTRAINT chk_lineup_captain CHECK (captain_slot BETWEEN 1 AND LEAST(11, cardinality(player_ids))),
+            CONSTRAINT chk_lineup_vice_captain CHECK (vice_captain_slot BETWEEN 1 AND LEAST(11, cardinality(player_ids))),
+            CONSTRAINT chk_lineup_captain_vice CHECK (captain_slot <> vice_captain_slot)
+        ) PARTITION BY LIST (gw_code);
+        PERFORM create_gameweek_partitions('fantasy_lineup');
+
+        INSERT INTO fantasy_lineup (ft_id, gw_code, player_ids, captain_slot, vice_captain_slot)
+        SELECT ft_id, gw_code, player_ids, captain_slot, vice_captain_slot
+        FROM fantasy_lineup_unpartitioned;
+
+        -- Takes the v_lineup_slot views with it
+        DROP TABLE fantasy_lineup_unpartitioned CASCADE;
+    END IF;
+
+    IF to_regclass('player_points_unpartitioned') IS NOT NULL THEN
+        CREATE TABLE player_points (
+            player_id   BIGINT NOT NULL REFERENCES player(id) ON UPDATE CASCADE ON DELETE CASCADE,
+            gw_code     CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
+            points      INT NOT NULL DEFAULT 0,
+
+            PRIMARY KEY (player_id, gw_code)
+        ) PARTITION BY LIST (gw_code);
+        PERFORM create_gameweek_partitions('player_points');
+
+        INSERT INTO player_points (player_id, gw_code, points)
+        SELECT player_id, gw_code, points FROM player_points_unpartitioned;
+
+        DROP TABLE player_points_unpartitioned CASCADE;
+    END IF;
+
+    IF to_regclass('chemistry_bonus_unpartitioned') IS NOT NULL THEN
+        CREATE TABLE chemistry_bonus (
+            ft_id       BIGINT NOT NULL REFERENCES fantasy_team(id) ON UPDATE CASCADE ON DELETE CASCADE,
+            gw_code     CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
+            points      INT NOT NULL DEFAULT 0,
+
+            PRIMARY KEY (ft_id, gw_code)
+        ) PARTITION BY LIST (gw_code);
+        PERFORM create_gameweek_partitions('chemistry_bonus');
+
+        INSERT INTO chemistry_bonus (ft_id, gw_code, points)
+        SELECT ft_id, gw_code, points FROM chemistry_bonus_unpartitioned;
+
+        DROP TABLE chemistry_bonus_unpartitioned CASCADE;
+    END IF;
+
+    IF to_regclass('fantasy_fixture_unpartitioned') IS NOT NULL THEN
+        -- The old identity sequence still belongs to the renamed table
+        ALTER TABLE fantasy_fixture_unpartitioned ALTER COLUMN id DROP IDENTITY IF EXISTS;
+
+        CREATE TABLE fantasy_fixture (
+            id          BIGINT GENERATED ALWAYS AS IDENTITY,
+            league_id   BIGINT NOT NULL REFERENCES fantasy_league(id) ON UPDATE CASCADE ON DELETE CASCADE,
+            gw_code     CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
+            home_ft_id  BIGINT NOT NULL REFERENCES fantasy_team(id) ON UPDATE CASCADE ON DELETE CASCADE,
+            away_ft_id  BIGINT NOT NULL REFERENCES fantasy_team(id) ON UPDATE CASCADE ON DELETE CASCADE,
+
+            PRIMARY KEY (id, gw_code),
+            UNIQUE (league_id, gw_code, home_ft_id, away_ft_id)
+        ) PARTITION BY LIST (gw_code);
+        PERFORM create_gameweek_partitions('fantasy_fixture');
+
+        INSERT INTO fantasy_fixture (id, league_id, gw_code, home_ft_id, away_ft_id)
+        OVERRIDING SYSTEM VALUE
+        SELECT id, league_id, gw_code, home_ft_id, away_ft_id FROM fantasy_fixture_unpartitioned;
+
+        PERFORM setval(
+            pg_get_serial_sequence('fantasy_fixture', 'id'),
+            COALESCE((SELECT MAX(id) FROM fantasy_fixture), 0) + 1,
+            FALSE
+        );
+
+        DROP TABLE fantasy_fixture_unpartitioned CASCADE;
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_fantasy_fixture_league_gw ON fantasy_fixture(league_id, gw_code);
+DROP INDEX IF EXISTS idx_chemistry_ft_gw;
+
+COMMENT ON TABLE fantasy_lineup IS 'Player selections for each fantasy team per gameweek (one row per lineup)';
+COMMENT ON TABLE player_points IS 'Fantasy points earned by each player per gameweek';
+COMMENT ON TABLE chemistry_bonus IS '+15 bonus if 6+ players stay together for 5 consecutive gameweeks';
+
+CREATE OR REPLACE VIEW v_lineup_slot AS
+SELECT
+    fl.ft_id,
+    fl.gw_code,
+    s.slot::SMALLINT AS slot,
+    s.player_id,
+    COALESCE(s.slot = fl.captain_slot, FALSE) AS captain,
+    COALESCE(s.slot = fl.vice_captain_slot, FALSE) AS vice_captain
+FROM fantasy_lineup fl
+CROSS JOIN LATERAL unnest(fl.player_ids) WITH ORDINALITY AS s(player_id, slot);
+
+COMMENT ON VIEW v_lineup_slot IS 'One row per lineup slot (unnested fantasy_lineup.player_ids)';
+
+CREATE OR REPLACE VIEW v_fantasy_standings AS
+SELECT
+    ft.id AS ft_id,
+    ft.name AS team_name,
+    u.username,
+    fl.gw_code,
+    COALESCE(SUM(pp.points), 0) AS gw_player_points,
+    COALESCE(MAX(cb.points), 0) AS gw_bonus_points,
+    COALESCE(SUM(pp.points), 0) + COALESCE(MAX(cb.points), 0) AS gw_total_points
+FROM fantasy_team ft
+LEFT JOIN app_user u ON u.id = ft.user_id
+LEFT JOIN v_lineup_slot fl ON fl.ft_id = ft.id AND fl.slot BETWEEN 1 AND 11
+LEFT JOIN player_points pp ON pp.player_id = fl.player_id AND pp.gw_code = fl.gw_code
+LEFT JOIN chemistry_bonus cb ON cb.ft_id = ft.id AND cb.gw_code = fl.gw_code
+WHERE fl.gw_code IS NOT NULL
+GROUP BY ft.id, ft.name, u.username, fl.gw_code;
+
+COMMENT ON VIEW v_fantasy_standings IS 'Fantasy points per team per gameweek (player points + chemistry bonus)';
+
+CREATE OR REPLACE VIEW v_fantasy_team_total_points AS
+SELECT
+    ft.id AS ft_id,
+    ft.name AS team_name,
+    u.username,
+    COALESCE(SUM(pp.points), 0) AS total_player_points,
+    COALESCE((
+        SELECT SUM(points) FROM chemistry_bonus WHERE ft_id = ft.id
+    ), 0) AS total_bonus_points,
+    COALESCE(SUM(pp.points), 0) + COALESCE((
+        SELECT SUM(points) FROM chemistry_bonus WHERE ft_id = ft.id
+    ), 0) AS total_points
+FROM fantasy_team ft
+LEFT JOIN app_user u ON u.id = ft.user_id
+LEFT JOIN v_lineup_slot fl ON fl.ft_id = ft.id AND fl.slot BETWEEN 1 AND 11
+LEFT JOIN player_points pp ON pp.player_id = fl.player_id AND pp.gw_code = fl.gw_code
+GROUP BY ft.id, ft.name, u.username;
+
+COMMENT ON VIEW v_fantasy_team_total_points IS 'Cumulative fantasy points for all time';
+
+ANALYZE fantasy_lineup;
+ANALYZE player_points;
+ANALYZE chemistry_bonus;
+ANALYZE fantasy_fixture;
+
+COMMIT;
@@ -0,0 +1,38 @@
+-- ============================================================================
+-- MIGRATION 006: Data version counters for ETags / the response cache
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql (SECTION 9):
+-- - data_version(scope, version) plus the sequence all scopes draw from
+-- - bump_data_version(VARIADIC scopes), called by the API's writers and the
+--   loader (and by hand after editing data directly)
+--
+-- The 'global' scope starts at 1 so that any response cached before this
+-- migration is not mistaken for a current one. Safe to run more than once.
+-- ============================================================================
+
+BEGIN;
+
+CREATE SEQUENCE IF NOT EXISTS data_version_seq;
+
+CREATE TABLE IF NOT EXISTS data_version (
+    scope       VARCHAR(20) PRIMARY KEY,
+    version     BIGINT NOT NULL
+);
+
+COMMENT ON TABLE data_version IS 'Change counters behind the API''s ETags and response cache';
+
+CREATE OR REPLACE FUNCTION bump_data_version(VARIADIC scopes TEXT[])
+RETURNS TABLE (scope VARCHAR, version BIGINT) AS $$
+    INSERT INTO data_version AS d (scope, version)
+    SELECT s, v.version
+    FROM (SELECT DISTINCT unnest(scopes) AS s) x
+    CROSS JOIN (SELECT nextval('data_version_seq') AS version) v
+    ON CONFLICT (scope) DO UPDATE SET version = EXCLUDED.version
+    RETURNING d.scope, d.version
+$$ LANGUAGE sql;
+
+SELECT bump_data_version('global')
+WHERE NOT EXISTS (SELECT 1 FROM data_version WHERE scope = 'global');
+
+COMMIT;
@@ -0,0 +1,30 @@
+-- ============================================================================
+-- MIGRATION 007: Announce data version bumps with NOTIFY
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql (SECTION 9):
+-- bump_data_version() now also NOTIFYs channel 'data_version' with the
+-- bumped scopes and their version, so every API worker can invalidate its
+-- cache when another worker (or the loader) writes. Same signature and
+-- result as before; safe to run more than once.
+-- ============================================================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION bump_data_version(VARIADIC scopes TEXT[])
+RETURNS TABLE (scope VARCHAR, version BIGINT) AS $$
+#variable_conflict use_column
+DECLARE
+    v BIGINT := nextval('data_version_seq');
+BEGIN
+    INSERT INTO data_version (scope, version)
+    SELECT DISTINCT unnest(scopes), v
+    ON CONFLICT (scope) DO UPDATE SET version = EXCLUDED.version;
+
+    PERFORM pg_notify('data_version', json_build_object('version', v, 'scopes', scopes)::text);
+
+    RETURN QUERY SELECT DISTINCT s::VARCHAR, v FROM unnest(scopes) AS s;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMIT;
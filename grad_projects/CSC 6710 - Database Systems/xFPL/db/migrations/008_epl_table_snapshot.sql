@@ -0,0 +1,124 @@
+-- ============================================================================
+-- MIGRATION 008: EPL table snapshot for /epl-table
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql:
+-- - epl_table_snapshot: cumulative club table (P/W/D/L/GF/GA/Pts, position
+--   and previous position) per gameweek
+-- - (gw_code, position) index
+--
+-- Backfills every gameweek that already has results, using the same
+-- statement as simulate_gameweek.refresh_epl_table_snapshot (with no
+-- earlier table to continue from). Afterwards simulate keeps it up to date.
+--
+-- Safe to run more than once.
+-- ============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS epl_table_snapshot (
+    gw_code         CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
+    team_code       CHAR(3) NOT NULL REFERENCES team(code) ON UPDATE CASCADE ON DELETE CASCADE,
+    played          SMALLINT NOT NULL,
+    wins            SMALLINT NOT NULL,
+    draws           SMALLINT NOT NULL,
+    losses          SMALLINT NOT NULL,
+    gf              SMALLINT NOT NULL,
+    ga              SMALLINT NOT NULL,
+    points          SMALLINT NOT NULL,
+    position        SMALLINT NOT NULL,
+    prev_position   SMALLINT,           -- position after the previous gameweek (NULL if not ranked)
+
+    PRIMARY KEY (gw_code, team_code)
+);
+
+COMMENT ON TABLE epl_table_snapshot IS 'Cumulative Premier League table up to each gameweek with played matches';
+CREATE INDEX IF NOT EXISTS idx_epl_table_snapshot_position ON epl_table_snapshot(gw_code, position);
+
+DELETE FROM epl_table_snapshot;
+
+-- Gameweeks with at least one result, and every gameweek up to the last of them
+CREATE TEMP TABLE backfill_targets ON COMMIT DROP AS
+SELECT DISTINCT m.gw_code AS code
+FROM match m
+WHERE m.home_goals IS NOT NULL AND m.away_goals IS NOT NULL;
+
+CREATE TEMP TABLE backfill_window ON COMMIT DROP AS
+SELECT g.code
+FROM gameweek g
+WHERE g.game_no <= (
+    SELECT MAX(g2.game_no) FROM gameweek g2 JOIN backfill_targets t ON t.code = g2.code
+);
+
+WITH results AS (
+    SELECT m.gw_code, m.hometeam_code AS team_code, m.home_goals AS gf, m.away_goals AS ga
+    FROM match m
+    WHERE m.gw_code IN (SELECT code FROM backfill_window)
+      AND m.home_goals IS NOT NULL AND m.away_goals IS NOT NULL
+    UNION ALL
+    SELECT m.gw_code, m.awayteam_code, m.away_goals, m.home_goals
+    FROM match m
+    WHERE m.gw_code IN (SELECT code FROM backfill_window)
+      AND m.home_goals IS NOT NULL AND m.away_goals IS NOT NULL
+),
+delta AS (
+    SELECT
+        gw_code, team_code,
+        COUNT(*) AS played,
+        COUNT(*) FILTER (WHERE gf > ga) AS wins,
+        COUNT(*) FILTER (WHERE gf = ga) AS draws,
+        COUNT(*) FILTER (WHERE gf < ga) AS losses,
+        SUM(gf) AS gf,
+        SUM(ga) AS ga
+    FROM results
+    GROUP BY gw_code, team_code
+),
+base AS (
+    SELECT * FROM epl_table_snapshot WHERE FALSE
+),
+running AS (
+    SELECT
+        g.code AS gw_code,
+        g.game_no,
+        t.code AS team_code,
+        b.position AS base_position,
+        COALESCE(b.played, 0) + SUM(COALESCE(d.played, 0)) OVER w AS played,
+        COALESCE(b.wins, 0)   + SUM(COALESCE(d.wins, 0))   OVER w AS wins,
+        COALESCE(b.draws, 0)  + SUM(COALESCE(d.draws, 0))  OVER w AS draws,
+        COALESCE(b.losses, 0) + SUM(COALESCE(d.losses, 0)) OVER w AS losses,
+        COALESCE(b.gf, 0)     + SUM(COALESCE(d.gf, 0))     OVER w AS gf,
+        COALESCE(b.ga, 0)     + SUM(COALESCE(d.ga, 0))     OVER w AS ga
+    FROM gameweek g
+    CROSS JOIN team t
+    LEFT JOIN delta d ON d.gw_code = g.code AND d.team_code = t.code
+    LEFT JOIN base b ON b.team_code = t.code
+    WHERE g.code IN (SELECT code FROM backfill_window)
+    WINDOW w AS (PARTITION BY t.code ORDER BY g.game_no)
+),
+ranked AS (
+    SELECT
+        r.*,
+        r.wins * 3 + r.draws AS points,
+        ROW_NUMBER() OVER (
+            PARTITION BY r.gw_code
+            ORDER BY r.wins * 3 + r.draws DESC, r.gf - r.ga DESC, r.gf DESC, r.team_code
+        ) AS position
+    FROM running r
+    WHERE r.played > 0
+),
+moved AS (
+    SELECT
+        k.*,
+        COALESCE(LAG(k.position) OVER (PARTITION BY k.team_code ORDER BY k.game_no),
+                 k.base_position) AS prev_position
+    FROM ranked k
+)
+INSERT INTO epl_table_snapshot
+    (gw_code, team_code, played, wins, draws, losses, gf, ga, points, position, prev_position)
+SELECT gw_code, team_code, played, wins, draws, losses, gf, ga, points, position, prev_position
+FROM moved
+WHERE gw_code IN (SELECT code FROM backfill_targets);
+
+ANALYZE epl_table_snapshot;
+
+COMMIT;
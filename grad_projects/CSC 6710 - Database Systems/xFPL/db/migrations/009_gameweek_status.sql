@@ -0,0 +1,48 @@
+-- ============================================================================
+-- MIGRATION 009: Materialized gameweek status
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql:
+-- - gameweek.status ('pending' / 'simulating' / 'simulated'), simulated_at,
+--   matches_total and matches_played
+-- - refresh_gameweek_status(codes), called by simulate and the loader
+--
+-- Backfills every gameweek from its matches (simulated_at becomes the time
+-- of this migration for gameweeks that are already simulated).
+--
+-- Safe to run more than once.
+-- ============================================================================
+
+BEGIN;
+
+ALTER TABLE gameweek
+    ADD COLUMN IF NOT EXISTS status VARCHAR(10) NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'simulating', 'simulated')),
+    ADD COLUMN IF NOT EXISTS simulated_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS matches_total SMALLINT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS matches_played SMALLINT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION refresh_gameweek_status(codes TEXT[] DEFAULT NULL)
+RETURNS VOID AS $$
+    UPDATE gameweek g
+    SET matches_total  = c.total,
+        matches_played = c.played,
+        status = CASE WHEN c.total > 0 AND c.played = c.total THEN 'simulated' ELSE 'pending' END,
+        simulated_at = CASE WHEN c.total > 0 AND c.played = c.total
+                            THEN COALESCE(g.simulated_at, NOW()) END
+    FROM (
+        SELECT g2.code, COUNT(m.id) AS total, COUNT(m.home_goals) AS played
+        FROM gameweek g2
+        LEFT JOIN match m ON m.gw_code = g2.code
+        WHERE codes IS NULL OR g2.code = ANY(codes)
+        GROUP BY g2.code
+    ) c
+    WHERE g.code = c.code
+$$ LANGUAGE sql;
+
+SELECT refresh_gameweek_status();
+
+-- Cached /gameweek-status responses predate the new columns
+SELECT bump_data_version('global');
+
+COMMIT;
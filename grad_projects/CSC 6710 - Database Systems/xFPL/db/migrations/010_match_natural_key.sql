@@ -0,0 +1,22 @@
+-- ============================================================================
+-- MIGRATION 010: Natural key for matches
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql:
+-- - idx_match_teams becomes UNIQUE (hometeam_code, awayteam_code): each
+--   club hosts every other club once a season. load_schema_data.py merges
+--   match.csv on this key, so a fixture moved to another gameweek is
+--   updated in place instead of inserted twice.
+--
+-- Fails if the table already holds the same home/away pair twice; remove
+-- the duplicates first.
+--
+-- Safe to run more than once.
+-- ============================================================================
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_match_teams;
+CREATE UNIQUE INDEX idx_match_teams ON match(hometeam_code, awayteam_code);
+
+COMMIT;
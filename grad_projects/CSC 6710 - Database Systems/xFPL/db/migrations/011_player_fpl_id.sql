@@ -0,0 +1,27 @@
+-- ============================================================================
+-- MIGRATION 011: Stable player key
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql:
+-- - player.fpl_id (UNIQUE): the FPL element id. load_schema_data.py merges
+--   player.csv on it, so a reload never moves one player's name, position
+--   or cost onto another player's id, and a player who changes club keeps
+--   their id (and their place in fantasy lineups) with the new team_code.
+-- - UNIQUE (team_code, shirt_no) is dropped: fetch_schema_data.py numbers
+--   shirts by list position within a club, so one transfer renumbers the
+--   rest of both squads.
+--
+-- Existing rows start with fpl_id NULL. The next load adopts each one whose
+-- club + first + last name matches exactly one fetched player; re-fetch the
+-- CSVs first (player.csv now carries fpl_id).
+--
+-- Safe to run more than once.
+-- ============================================================================
+
+BEGIN;
+
+ALTER TABLE player ADD COLUMN IF NOT EXISTS fpl_id INTEGER;
+CREATE UNIQUE INDEX IF NOT EXISTS player_fpl_id_key ON player(fpl_id);
+ALTER TABLE player DROP CONSTRAINT IF EXISTS player_team_code_shirt_no_key;
+
+COMMIT;
@@ -0,0 +1,45 @@
+-- ============================================================================
+-- MIGRATION 012: Recoverable 'simulating' status
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql:
+-- - release_stale_simulations(): simulate holds a session advisory lock
+--   (hashtext('simulate'), hashtext(gw_code)) for the whole run. A gameweek
+--   left 'simulating' with nobody holding its lock (worker killed,
+--   connection lost) is recounted with refresh_gameweek_status() and its
+--   'gw:<code>' data version bumped. Every API worker calls it once a minute.
+--
+-- Also releases any gameweek stuck in 'simulating' right now.
+--
+-- Safe to run more than once.
+-- ============================================================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION release_stale_simulations()
+RETURNS SETOF TEXT AS $$
+DECLARE
+    stale TEXT[];
+BEGIN
+    SELECT array_agg(g.code::TEXT) INTO stale
+    FROM gameweek g
+    WHERE g.status = 'simulating'
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_locks l
+          WHERE l.locktype = 'advisory' AND l.granted AND l.objsubid = 2
+            AND l.database = (SELECT oid FROM pg_database WHERE datname = current_database())
+            AND l.classid = hashtext('simulate')::OID
+            AND l.objid = hashtext(g.code::TEXT)::OID
+      );
+    IF stale IS NULL THEN
+        RETURN;
+    END IF;
+    PERFORM refresh_gameweek_status(stale);
+    PERFORM bump_data_version(VARIADIC ARRAY(SELECT 'gw:' || c FROM unnest(stale) AS c));
+    RETURN QUERY SELECT unnest(stale);
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT release_stale_simulations();
+
+COMMIT;
@@ -0,0 +1,69 @@
+-- ============================================================================
+-- MIGRATION 013: archive_season() also archives the gameweek-keyed tables
+-- ============================================================================
+--
+-- Brings an existing database in line with schema_complete.sql (8.2):
+-- archive_season() used to move only the partitions of fantasy_lineup,
+-- player_points, chemistry_bonus and fantasy_fixture. Gameweek codes repeat
+-- every season, so transfer (sub_no per team and gameweek),
+-- standings_snapshot, epl_table_snapshot and match results were carried
+-- into the next season, whose refreshes built on last season's snapshots.
+-- Now those four are copied to archive.<table>_<season> and truncated, every
+-- gameweek is reset to 'pending' and the 'global' data version bumped.
+--
+-- After CALL archive_season(...), load the new season's data with
+-- load_schema_data.py.
+--
+-- Safe to run more than once.
+-- ============================================================================
+
+BEGIN;
+
+CREATE OR REPLACE PROCEDURE archive_season(season TEXT)
+LANGUAGE plpgsql AS $$
+DECLARE
+    parent REGCLASS;
+    part   RECORD;
+    fk     RECORD;
+    tbl    TEXT;
+BEGIN
+    CREATE SCHEMA IF NOT EXISTS archive;
+
+    FOREACH parent IN ARRAY
+        ARRAY['fantasy_lineup', 'player_points', 'chemistry_bonus', 'fantasy_fixture']::REGCLASS[]
+    LOOP
+        FOR part IN
+            SELECT c.oid::REGCLASS AS rel, c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = parent
+        LOOP
+            EXECUTE format('ALTER TABLE %s DETACH PARTITION %s', parent, part.rel);
+            FOR fk IN
+                SELECT conname FROM pg_constraint WHERE conrelid = part.rel AND contype = 'f'
+            LOOP
+                EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', part.rel, fk.conname);
+            END LOOP;
+            EXECUTE format('ALTER TABLE %s SET SCHEMA archive', part.rel);
+            EXECUTE format('ALTER TABLE %s RENAME TO %I', part.rel, part.relname || '_' || season);
+        END LOOP;
+
+        PERFORM create_gameweek_partitions(parent);
+    END LOOP;
+
+    -- Gameweek codes repeat every season: snapshots, transfers (sub_no) and
+    -- results keyed by them would carry into the next one. Copy, then empty.
+    -- Like the partitioned tables above, names resolve through search_path.
+    FOREACH tbl IN ARRAY ARRAY['transfer', 'standings_snapshot', 'epl_table_snapshot', 'match'] LOOP
+        EXECUTE format('CREATE TABLE archive.%I AS TABLE %I', tbl || '_' || season, tbl);
+    END LOOP;
+    TRUNCATE transfer, standings_snapshot, epl_table_snapshot, match;
+
+    -- Every gameweek back to 'pending'; cached responses are all stale
+    UPDATE gameweek SET simulated_at = NULL;
+    PERFORM refresh_gameweek_status();
+    PERFORM bump_data_version('global');
+END;
+$$;
+
+COMMIT;
@@ -19,6 +19,9 @@
 -- Start transaction
 BEGIN;
 
+-- Trigram matching for substring player search (available on Supabase)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- ============================================================================
 -- SECTION 1: DROP EXISTING OBJECTS (for clean reinstall)
 -- ============================================================================
@@ -27,26 +30,41 @@ BEGIN;
 DROP VIEW IF EXISTS v_fantasy_standings CASCADE;
 DROP VIEW IF EXISTS v_fantasy_team_points CASCADE;
 DROP VIEW IF EXISTS v_fantasy_team_total_points CASCADE;
+DROP VIEW IF EXISTS v_lineup_slot CASCADE;
 
--- Drop triggers
-DROP TRIGGER IF EXISTS trg_check_lineup_11 ON fantasy_lineup;
+-- Drop legacy lineup triggers/functions (replaced by the constraints in SECTION 6)
+DROP TRIGGER IF EXISTS trg_check_lineup_limit ON fantasy_lineup;
 DROP TRIGGER IF EXISTS trg_single_captain ON fantasy_lineup;
-DROP TRIGGER IF EXISTS trg_single_vice ON fantasy_lineup;
-
--- Drop functions
-DROP FUNCTION IF EXISTS check_lineup_11() CASCADE;
+DROP TRIGGER IF EXISTS trg_single_vice_captain ON fantasy_lineup;
+DROP FUNCTION IF EXISTS check_lineup_limit() CASCADE;
 DROP FUNCTION IF EXISTS check_single_captain() CASCADE;
-DROP FUNCTION IF EXISTS check_single_vice() CASCADE;
+DROP FUNCTION IF EXISTS check_single_vice_captain() CASCADE;
+DROP FUNCTION IF EXISTS lineup_players_distinct(BIGINT[]) CASCADE;
+
+-- Drop partition maintenance routines (SECTION 8)
+DROP PROCEDURE IF EXISTS archive_season(TEXT);
+DROP FUNCTION IF EXISTS create_gameweek_partitions(REGCLASS, INT);
+
+-- Drop gameweek status routine (2.7)
+DROP FUNCTION IF EXISTS refresh_gameweek_status(TEXT[]);
+DROP FUNCTION IF EXISTS release_stale_simulations();
+
+-- Drop data version objects (SECTION 9)
+DROP FUNCTION IF EXISTS bump_data_version(TEXT[]);
+DROP TABLE IF EXISTS data_version CASCADE;
+DROP SEQUENCE IF EXISTS data_version_seq;
 
 -- Drop tables in reverse dependency order
 DROP TABLE IF EXISTS fantasy_fixture CASCADE;
 DROP TABLE IF EXISTS fantasy_league_team CASCADE;
 DROP TABLE IF EXISTS fantasy_league CASCADE;
+DROP TABLE IF EXISTS standings_snapshot CASCADE;
 DROP TABLE IF EXISTS chemistry_bonus CASCADE;
 DROP TABLE IF EXISTS player_points CASCADE;
 DROP TABLE IF EXISTS transfer CASCADE;
 DROP TABLE IF EXISTS fantasy_lineup CASCADE;
 DROP TABLE IF EXISTS fantasy_team CASCADE;
+DROP TABLE IF EXISTS epl_table_snapshot CASCADE;
 DROP TABLE IF EXISTS match CASCADE;
 DROP TABLE IF EXISTS gameweek CASCADE;
 DROP TABLE IF EXISTS player CASCADE;
@@ -79,26 +97,40 @@ COMMENT ON TABLE team IS 'Real Premier League teams';
 -- 2.3 Players
 CREATE TABLE player (
     id          BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    fpl_id      INTEGER UNIQUE,         -- FPL element id; load_schema_data.py merges on it
     team_code   CHAR(3) NOT NULL REFERENCES team(code) ON UPDATE CASCADE ON DELETE RESTRICT,
     first_name  VARCHAR(60) NOT NULL,
     last_name   VARCHAR(60) NOT NULL,
     position    VARCHAR(4) NOT NULL CHECK (position IN ('GK', 'DEF', 'MID', 'FWD')),
     shirt_no    SMALLINT NOT NULL CHECK (shirt_no BETWEEN 1 AND 99),
     cost        NUMERIC(6,2) NOT NULL DEFAULT 5.00 CHECK (cost >= 0),
-    
-    UNIQUE (team_code, shirt_no)
+    -- Normalized name used by the /players search
+    search_name TEXT GENERATED ALWAYS AS (LOWER(first_name || ' ' || last_name)) STORED
 );
 
 COMMENT ON TABLE player IS 'Real players with their costs for fantasy selection';
-CREATE INDEX idx_player_team ON player(team_code);
-CREATE INDEX idx_player_position ON player(position);
+-- Filter + sort indexes for the player browser (ORDER BY cost DESC)
+CREATE INDEX idx_player_team ON player(team_code, position, cost DESC);
+CREATE INDEX idx_player_position ON player(position, cost DESC);
+CREATE INDEX idx_player_cost ON player(cost DESC);
+-- Name search: trigram for substrings, text_pattern_ops for short prefixes
+CREATE INDEX idx_player_search_trgm ON player USING GIN (search_name gin_trgm_ops);
+CREATE INDEX idx_player_search_prefix ON player(search_name text_pattern_ops);
+CREATE INDEX idx_player_last_name_prefix ON player(LOWER(last_name) text_pattern_ops);
 
 -- 2.4 Gameweeks
 CREATE TABLE gameweek (
     code        CHAR(4) PRIMARY KEY,    -- e.g., 'GW01', 'GW02'
     game_no     SMALLINT NOT NULL CHECK (game_no BETWEEN 1 AND 50),
     start_time  TIMESTAMPTZ,
-    end_time    TIMESTAMPTZ
+    end_time    TIMESTAMPTZ,
+
+    -- Kept in sync with match results by refresh_gameweek_status() (2.7)
+    status          VARCHAR(10) NOT NULL DEFAULT 'pending'
+                    CHECK (status IN ('pending', 'simulating', 'simulated')),
+    simulated_at    TIMESTAMPTZ,
+    matches_total   SMALLINT NOT NULL DEFAULT 0,
+    matches_played  SMALLINT NOT NULL DEFAULT 0
 );
 
 COMMENT ON TABLE gameweek IS 'Premier League gameweeks';
@@ -119,7 +151,80 @@ CREATE TABLE match (
 
 COMMENT ON TABLE match IS 'Real Premier League fixtures and results';
 CREATE INDEX idx_match_gw ON match(gw_code);
-CREATE INDEX idx_match_teams ON match(hometeam_code, awayteam_code);
+CREATE UNIQUE INDEX idx_match_teams ON match(hometeam_code, awayteam_code);  -- natural key (loader upserts on it)
+
+-- 2.6 EPL Table Snapshot (league table after each played gameweek, written by simulate)
+CREATE TABLE epl_table_snapshot (
+    gw_code         CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
+    team_code       CHAR(3) NOT NULL REFERENCES team(code) ON UPDATE CASCADE ON DELETE CASCADE,
+    played          SMALLINT NOT NULL,
+    wins            SMALLINT NOT NULL,
+    draws           SMALLINT NOT NULL,
+    losses          SMALLINT NOT NULL,
+    gf              SMALLINT NOT NULL,
+    ga              SMALLINT NOT NULL,
+    points          SMALLINT NOT NULL,
+    position        SMALLINT NOT NULL,
+    prev_position   SMALLINT,           -- position after the previous gameweek (NULL if not ranked)
+
+    PRIMARY KEY (gw_code, team_code)
+);
+
+COMMENT ON TABLE epl_table_snapshot IS 'Cumulative Premier League table up to each gameweek with played matches';
+-- Serves /epl-table: one gameweek in table order
+CREATE INDEX idx_epl_table_snapshot_position ON epl_table_snapshot(gw_code, position);
+
+-- 2.7 Gameweek status: recount the matches of `codes` (NULL = every gameweek)
+-- A gameweek is 'simulated' once all of its matches have a score. simulate
+-- sets 'simulating' while it runs and calls this when done (see
+-- release_stale_simulations below if it never gets there); so does the
+-- loader. After editing results by hand: SELECT refresh_gameweek_status();
+CREATE FUNCTION refresh_gameweek_status(codes TEXT[] DEFAULT NULL)
+RETURNS VOID AS $$
+    UPDATE gameweek g
+    SET matches_total  = c.total,
+        matches_played = c.played,
+        status = CASE WHEN c.total > 0 AND c.played = c.total THEN 'simulated' ELSE 'pending' END,
+        simulated_at = CASE WHEN c.total > 0 AND c.played = c.total
+                            THEN COALESCE(g.simulated_at, NOW()) END
+    FROM (
+        SELECT g2.code, COUNT(m.id) AS total, COUNT(m.home_goals) AS played
+        FROM gameweek g2
+        LEFT JOIN match m ON m.gw_code = g2.code
+        WHERE codes IS NULL OR g2.code = ANY(codes)
+        GROUP BY g2.code
+    ) c
+    WHERE g.code = c.code
+$$ LANGUAGE sql;
+
+-- simulate holds a session advisory lock (hashtext('simulate'),
+-- hashtext(gw_code)) for the whole run. A gameweek left 'simulating' with
+-- nobody holding its lock (worker killed, connection lost) is recounted and
+-- its 'gw:<code>' version bumped; every API worker calls this once a minute.
+-- Returns the released codes.
+CREATE FUNCTION release_stale_simulations()
+RETURNS SETOF TEXT AS $$
+DECLARE
+    stale TEXT[];
+BEGIN
+    SELECT array_agg(g.code::TEXT) INTO stale
+    FROM gameweek g
+    WHERE g.status = 'simulating'
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_locks l
+          WHERE l.locktype = 'advisory' AND l.granted AND l.objsubid = 2
+            AND l.database = (SELECT oid FROM pg_database WHERE datname = current_database())
+            AND l.classid = hashtext('simulate')::OID
+            AND l.objid = hashtext(g.code::TEXT)::OID
+      );
+    IF stale IS NULL THEN
+        RETURN;
+    END IF;
+    PERFORM refresh_gameweek_status(stale);
+    PERFORM bump_data_version(VARIADIC ARRAY(SELECT 'gw:' || c FROM unnest(stale) AS c));
+    RETURN QUERY SELECT unnest(stale);
+END;
+$$ LANGUAGE plpgsql;
 
 -- ============================================================================
 -- SECTION 3: FANTASY TABLES
@@ -139,21 +244,21 @@ CREATE TABLE fantasy_team (
 COMMENT ON TABLE fantasy_team IS 'Fantasy teams created by managers';
 
 -- 3.2 Fantasy Lineup (players selected for each gameweek)
+-- One row per team per gameweek: player_ids[slot] is the player in that slot
+-- (1-11 starters, 12-15 bench), captain / vice-captain are slot numbers.
+-- v_lineup_slot (SECTION 5) unnests it back to one row per slot.
+-- Partitioned by gameweek (SECTION 8).
 CREATE TABLE fantasy_lineup (
-    ft_id           BIGINT NOT NULL REFERENCES fantasy_team(id) ON UPDATE CASCADE ON DELETE CASCADE,
-    gw_code         CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
-    player_id       BIGINT NOT NULL REFERENCES player(id) ON UPDATE CASCADE ON DELETE RESTRICT,
-    slot            SMALLINT NOT NULL CHECK (slot BETWEEN 1 AND 15),  -- 1-11 starters, 12-15 bench
-    captain         BOOLEAN NOT NULL DEFAULT FALSE,
-    vice_captain    BOOLEAN NOT NULL DEFAULT FALSE,
-    
-    PRIMARY KEY (ft_id, gw_code, slot),
-    UNIQUE (ft_id, gw_code, player_id)  -- Player can't appear twice in same lineup
-);
+    ft_id               BIGINT NOT NULL REFERENCES fantasy_team(id) ON UPDATE CASCADE ON DELETE CASCADE,
+    gw_code             CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
+    player_ids          BIGINT[] NOT NULL,
+    captain_slot        SMALLINT,
+    vice_captain_slot   SMALLINT,
+
+    PRIMARY KEY (ft_id, gw_code)
+) PARTITION BY LIST (gw_code);
 
-COMMENT ON TABLE fantasy_lineup IS 'Player selections for each fantasy team per gameweek';
-CREATE INDEX idx_lineup_gw ON fantasy_lineup(gw_code);
-CREATE INDEX idx_lineup_player ON fantasy_lineup(player_id);
+COMMENT ON TABLE fantasy_lineup IS 'Player selections for each fantasy team per gameweek (one row per lineup)';
 
 -- 3.3 Transfers
 CREATE TABLE transfer (
@@ -170,29 +275,44 @@ CREATE TABLE transfer (
 
 COMMENT ON TABLE transfer IS 'Player transfers made by fantasy teams (max 3 per gameweek)';
 
--- 3.4 Player Points (points earned by players in each gameweek)
+-- 3.4 Player Points (points earned by players in each gameweek, partitioned by gameweek)
 CREATE TABLE player_points (
     player_id   BIGINT NOT NULL REFERENCES player(id) ON UPDATE CASCADE ON DELETE CASCADE,
     gw_code     CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
     points      INT NOT NULL DEFAULT 0,
     
     PRIMARY KEY (player_id, gw_code)
-);
+) PARTITION BY LIST (gw_code);
 
 COMMENT ON TABLE player_points IS 'Fantasy points earned by each player per gameweek';
-CREATE INDEX idx_player_points_gw ON player_points(gw_code);
 
--- 3.5 Chemistry Bonus
+-- 3.5 Chemistry Bonus (partitioned by gameweek)
 CREATE TABLE chemistry_bonus (
     ft_id       BIGINT NOT NULL REFERENCES fantasy_team(id) ON UPDATE CASCADE ON DELETE CASCADE,
     gw_code     CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
     points      INT NOT NULL DEFAULT 0,
     
     PRIMARY KEY (ft_id, gw_code)
-);
+) PARTITION BY LIST (gw_code);
 
 COMMENT ON TABLE chemistry_bonus IS '+15 bonus if 6+ players stay together for 5 consecutive gameweeks';
 
+-- 3.6 Standings Snapshot (cumulative points per team, written when a GW is scored)
+CREATE TABLE standings_snapshot (
+    gw_code      CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
+    ft_id        BIGINT NOT NULL REFERENCES fantasy_team(id) ON UPDATE CASCADE ON DELETE CASCADE,
+    gw_points    INT NOT NULL DEFAULT 0,
+    total_points INT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (gw_code, ft_id)
+);
+
+COMMENT ON TABLE standings_snapshot IS 'Cumulative fantasy points up to each scored gameweek (player points + chemistry bonus)';
+-- Serves /standings pages: ORDER BY total_points DESC, ft_id with a keyset seek
+CREATE INDEX idx_standings_snapshot_rank ON standings_snapshot(gw_code, total_points DESC, ft_id);
+-- ON DELETE CASCADE from fantasy_team
+CREATE INDEX idx_standings_snapshot_ft ON standings_snapshot(ft_id);
+
 -- ============================================================================
 -- SECTION 4: FANTASY LEAGUES (Head-to-Head competition)
 -- ============================================================================
@@ -217,16 +337,18 @@ CREATE TABLE fantasy_league_team (
 
 COMMENT ON TABLE fantasy_league_team IS 'Which fantasy teams belong to which leagues';
 
--- 4.3 League Fixtures (head-to-head matches)
+-- 4.3 League Fixtures (head-to-head matches, partitioned by gameweek)
 CREATE TABLE fantasy_fixture (
-    id          BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    id          BIGINT GENERATED ALWAYS AS IDENTITY,
     league_id   BIGINT NOT NULL REFERENCES fantasy_league(id) ON UPDATE CASCADE ON DELETE CASCADE,
     gw_code     CHAR(4) NOT NULL REFERENCES gameweek(code) ON UPDATE CASCADE ON DELETE CASCADE,
     home_ft_id  BIGINT NOT NULL REFERENCES fantasy_team(id) ON UPDATE CASCADE ON DELETE CASCADE,
     away_ft_id  BIGINT NOT NULL REFERENCES fantasy_team(id) ON UPDATE CASCADE ON DELETE CASCADE,
     
+    -- A partitioned table's keys must include gw_code
+    PRIMARY KEY (id, gw_code),
     UNIQUE (league_id, gw_code, home_ft_id, away_ft_id)
-);
+) PARTITION BY LIST (gw_code);
 
 COMMENT ON TABLE fantasy_fixture IS 'Head-to-head fantasy matchups within leagues';
 CREATE INDEX idx_fantasy_fixture_league_gw ON fantasy_fixture(league_id, gw_code);
@@ -235,7 +357,21 @@ CREATE INDEX idx_fantasy_fixture_league_gw ON fantasy_fixture(league_id, gw_code
 -- SECTION 5: VIEWS
 -- ============================================================================
 
--- 5.1 Fantasy Standings View (FIXED - no phantom +2 points)
+-- 5.1 Lineup slots (fantasy_lineup as one row per player, like the API returns it)
+CREATE OR REPLACE VIEW v_lineup_slot AS
+SELECT
+    fl.ft_id,
+    fl.gw_code,
+    s.slot::SMALLINT AS slot,
+    s.player_id,
+    COALESCE(s.slot = fl.captain_slot, FALSE) AS captain,
+    COALESCE(s.slot = fl.vice_captain_slot, FALSE) AS vice_captain
+FROM fantasy_lineup fl
+CROSS JOIN LATERAL unnest(fl.player_ids) WITH ORDINALITY AS s(player_id, slot);
+
+COMMENT ON VIEW v_lineup_slot IS 'One row per lineup slot (unnested fantasy_lineup.player_ids)';
+
+-- 5.2 Fantasy Standings View (FIXED - no phantom +2 points)
 -- This view calculates total points from player_points table only
 CREATE OR REPLACE VIEW v_fantasy_standings AS
 SELECT
@@ -248,7 +384,7 @@ SELECT
     COALESCE(SUM(pp.points), 0) + COALESCE(MAX(cb.points), 0) AS gw_total_points
 FROM fantasy_team ft
 LEFT JOIN app_user u ON u.id = ft.user_id
-LEFT JOIN fantasy_lineup fl ON fl.ft_id = ft.id AND fl.slot BETWEEN 1 AND 11
+LEFT JOIN v_lineup_slot fl ON fl.ft_id = ft.id AND fl.slot BETWEEN 1 AND 11
 LEFT JOIN player_points pp ON pp.player_id = fl.player_id AND pp.gw_code = fl.gw_code
 LEFT JOIN chemistry_bonus cb ON cb.ft_id = ft.id AND cb.gw_code = fl.gw_code
 WHERE fl.gw_code IS NOT NULL
@@ -256,7 +392,7 @@ GROUP BY ft.id, ft.name, u.username, fl.gw_code;
 
 COMMENT ON VIEW v_fantasy_standings IS 'Fantasy points per team per gameweek (player points + chemistry bonus)';
 
--- 5.2 Total Points View (cumulative)
+-- 5.3 Total Points View (cumulative)
 CREATE OR REPLACE VIEW v_fantasy_team_total_points AS
 SELECT
     ft.id AS ft_id,
@@ -271,120 +407,182 @@ SELECT
     ), 0) AS total_points
 FROM fantasy_team ft
 LEFT JOIN app_user u ON u.id = ft.user_id
-LEFT JOIN fantasy_lineup fl ON fl.ft_id = ft.id AND fl.slot BETWEEN 1 AND 11
+LEFT JOIN v_lineup_slot fl ON fl.ft_id = ft.id AND fl.slot BETWEEN 1 AND 11
 LEFT JOIN player_points pp ON pp.player_id = fl.player_id AND pp.gw_code = fl.gw_code
 GROUP BY ft.id, ft.name, u.username;
 
 COMMENT ON VIEW v_fantasy_team_total_points IS 'Cumulative fantasy points for all time';
 
 -- ============================================================================
--- SECTION 6: TRIGGERS & FUNCTIONS
+-- SECTION 6: LINEUP CONSTRAINTS
+-- ============================================================================
+--
+-- A lineup is a single row, so its rules are row CHECKs rather than
+-- triggers or cross-row indexes. One captain / one vice-captain per lineup
+-- holds by construction (they are single columns).
+--
+-- player_ids cannot carry a foreign key to player; the API only writes ids
+-- it has just read from the player table.
+
+-- 6.1 No player twice in the same lineup
+CREATE FUNCTION lineup_players_distinct(ids BIGINT[])
+RETURNS BOOLEAN AS $$
+    SELECT COUNT(DISTINCT id) = cardinality(ids) FROM unnest(ids) AS id
+$$ LANGUAGE sql IMMUTABLE;
+
+ALTER TABLE fantasy_lineup
+    ADD CONSTRAINT chk_lineup_distinct CHECK (lineup_players_distinct(player_ids)),
+    -- 6.2 At most 15 players (11 starters + bench)
+    ADD CONSTRAINT chk_lineup_size CHECK (cardinality(player_ids) BETWEEN 1 AND 15),
+    -- 6.3 Captain and vice-captain are two different starters
+    ADD CONSTRAINT chk_lineup_captain CHECK (captain_slot BETWEEN 1 AND LEAST(11, cardinality(player_ids))),
+    ADD CONSTRAINT chk_lineup_vice_captain CHECK (vice_captain_slot BETWEEN 1 AND LEAST(11, cardinality(player_ids))),
+    ADD CONSTRAINT chk_lineup_captain_vice CHECK (captain_slot <> vice_captain_slot);
+
+-- ============================================================================
+-- SECTION 7: INDEXES FOR PERFORMANCE
 -- ============================================================================
 
--- 6.1 Check max 11 starters per lineup
-CREATE OR REPLACE FUNCTION check_lineup_limit()
-RETURNS TRIGGER AS $$
+-- Additional indexes for common queries
+CREATE INDEX IF NOT EXISTS idx_fantasy_team_user ON fantasy_team(user_id);
+CREATE INDEX IF NOT EXISTS idx_transfer_ft_gw ON transfer(ft_id, gw_code);
+
+-- ============================================================================
+-- SECTION 8: GAMEWEEK PARTITIONS
+-- ============================================================================
+--
+-- fantasy_lineup, player_points, chemistry_bonus and fantasy_fixture are
+-- LIST-partitioned on gw_code: one partition per gameweek (<table>_gw01 ..
+-- <table>_gw38) plus a DEFAULT partition for any other code. A query that
+-- pins gw_code (directly or through a join on it) reads one partition, and
+-- a finished season leaves by DETACH instead of DELETE + VACUUM.
+
+-- 8.1 Create the per-gameweek partitions of a table (skips existing ones)
+CREATE FUNCTION create_gameweek_partitions(parent REGCLASS, last_game_no INT DEFAULT 38)
+RETURNS VOID AS $$
 DECLARE
-    starter_count INT;
+    nsp  TEXT;
+    base TEXT;
+    n    INT;
 BEGIN
-    -- Count current starters (slots 1-11)
-    SELECT COUNT(*) INTO starter_count
-    FROM fantasy_lineup
-    WHERE ft_id = NEW.ft_id 
-      AND gw_code = NEW.gw_code
-      AND slot BETWEEN 1 AND 11;
-    
-    -- If inserting into starter slot and already have 11, reject
-    IF TG_OP = 'INSERT' AND NEW.slot BETWEEN 1 AND 11 AND starter_count >= 11 THEN
-        RAISE EXCEPTION 'Lineup for team % in % already has 11 starters', NEW.ft_id, NEW.gw_code;
-    END IF;
-    
-    RETURN NEW;
+    SELECT n.nspname, c.relname INTO nsp, base
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.oid = parent;
+
+    FOR n IN 1..last_game_no LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I.%I PARTITION OF %s FOR VALUES IN (%L)',
+            nsp, base || '_gw' || lpad(n::TEXT, 2, '0'), parent, 'GW' || lpad(n::TEXT, 2, '0')
+        );
+    END LOOP;
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %I.%I PARTITION OF %s DEFAULT', nsp, base || '_default', parent);
 END;
 $$ LANGUAGE plpgsql;
 
-CREATE TRIGGER trg_check_lineup_limit
-BEFORE INSERT ON fantasy_lineup
-FOR EACH ROW
-EXECUTE FUNCTION check_lineup_limit();
-
--- 6.2 Enforce single captain per lineup
-CREATE OR REPLACE FUNCTION check_single_captain()
-RETURNS TRIGGER AS $$
+SELECT create_gameweek_partitions('fantasy_lineup');
+SELECT create_gameweek_partitions('player_points');
+SELECT create_gameweek_partitions('chemistry_bonus');
+SELECT create_gameweek_partitions('fantasy_fixture');
+
+-- 8.2 Archive a finished season: CALL archive_season('2025_26');
+-- Every partition of the four tables is detached, stripped of its foreign
+-- keys and moved to archive.<partition>_<season>; empty partitions take
+-- its place. transfer, standings_snapshot, epl_table_snapshot and match are
+-- copied to archive.<table>_<season> and truncated (no dead rows either),
+-- and every gameweek goes back to 'pending'. Load the new season's
+-- fixtures afterwards (load_schema_data.py).
+CREATE PROCEDURE archive_season(season TEXT)
+LANGUAGE plpgsql AS $$
 DECLARE
-    existing_captain INT;
+    parent REGCLASS;
+    part   RECORD;
+    fk     RECORD;
+    tbl    TEXT;
 BEGIN
-    IF NEW.captain = TRUE THEN
-        SELECT COUNT(*) INTO existing_captain
-        FROM fantasy_lineup
-        WHERE ft_id = NEW.ft_id 
-          AND gw_code = NEW.gw_code 
-          AND captain = TRUE
-          AND slot <> NEW.slot;
-        
-        IF existing_captain > 0 THEN
-            -- Instead of failing, clear existing captain
-            UPDATE fantasy_lineup 
-            SET captain = FALSE 
-            WHERE ft_id = NEW.ft_id 
-              AND gw_code = NEW.gw_code 
-              AND captain = TRUE
-              AND slot <> NEW.slot;
-        END IF;
-    END IF;
-    RETURN NEW;
+    CREATE SCHEMA IF NOT EXISTS archive;
+
+    FOREACH parent IN ARRAY
+        ARRAY['fantasy_lineup', 'player_points', 'chemistry_bonus', 'fantasy_fixture']::REGCLASS[]
+    LOOP
+        FOR part IN
+            SELECT c.oid::REGCLASS AS rel, c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = parent
+        LOOP
+            EXECUTE format('ALTER TABLE %s DETACH PARTITION %s', parent, part.rel);
+            FOR fk IN
+                SELECT conname FROM pg_constraint WHERE conrelid = part.rel AND contype = 'f'
+            LOOP
+                EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', part.rel, fk.conname);
+            END LOOP;
+            EXECUTE format('ALTER TABLE %s SET SCHEMA archive', part.rel);
+            EXECUTE format('ALTER TABLE %s RENAME TO %I', part.rel, part.relname || '_' || season);
+        END LOOP;
+
+        PERFORM create_gameweek_partitions(parent);
+    END LOOP;
+
+    -- Gameweek codes repeat every season: snapshots, transfers (sub_no) and
+    -- results keyed by them would carry into the next one. Copy, then empty.
+    -- Like the partitioned tables above, names resolve through search_path.
+    FOREACH tbl IN ARRAY ARRAY['transfer', 'standings_snapshot', 'epl_table_snapshot', 'match'] LOOP
+        EXECUTE format('CREATE TABLE archive.%I AS TABLE %I', tbl || '_' || season, tbl);
+    END LOOP;
+    TRUNCATE transfer, standings_snapshot, epl_table_snapshot, match;
+
+    -- Every gameweek back to 'pending'; cached responses are all stale
+    UPDATE gameweek SET simulated_at = NULL;
+    PERFORM refresh_gameweek_status();
+    PERFORM bump_data_version('global');
 END;
-$$ LANGUAGE plpgsql;
+$$;
 
-CREATE TRIGGER trg_single_captain
-BEFORE INSERT OR UPDATE ON fantasy_lineup
-FOR EACH ROW
-EXECUTE FUNCTION check_single_captain();
+-- ============================================================================
+-- SECTION 9: DATA VERSIONS (ETags / response cache)
+-- ============================================================================
+--
+-- The API caches read responses (/teams, /standings, /epl-table, ...) and
+-- tags them with an ETag built from these counters, so every write that
+-- changes what those endpoints return must bump the matching scope:
+--   'global'        team / player / gameweek / match data (the loader)
+--   'fantasy_team'  a fantasy team was created
+--   'gw:<code>'     results, points, lineups or transfers of one gameweek
+--   'league:<id>'   league membership or fixtures
+-- All scopes draw from one sequence, so a newer change always has the
+-- higher number. After editing data by hand: SELECT bump_data_version('global');
+-- Each bump also NOTIFYs channel 'data_version' with {"version", "scopes"};
+-- it is delivered on commit and every API worker LISTENs for it to
+-- invalidate its cache (backend/invalidation.py).
+
+CREATE SEQUENCE data_version_seq;
+
+CREATE TABLE data_version (
+    scope       VARCHAR(20) PRIMARY KEY,
+    version     BIGINT NOT NULL
+);
 
--- 6.3 Enforce single vice-captain per lineup
-CREATE OR REPLACE FUNCTION check_single_vice_captain()
-RETURNS TRIGGER AS $$
+COMMENT ON TABLE data_version IS 'Change counters behind the API''s ETags and response cache';
+
+CREATE FUNCTION bump_data_version(VARIADIC scopes TEXT[])
+RETURNS TABLE (scope VARCHAR, version BIGINT) AS $$
+#variable_conflict use_column
 DECLARE
-    existing_vice INT;
+    v BIGINT := nextval('data_version_seq');
 BEGIN
-    IF NEW.vice_captain = TRUE THEN
-        SELECT COUNT(*) INTO existing_vice
-        FROM fantasy_lineup
-        WHERE ft_id = NEW.ft_id 
-          AND gw_code = NEW.gw_code 
-          AND vice_captain = TRUE
-          AND slot <> NEW.slot;
-        
-        IF existing_vice > 0 THEN
-            -- Instead of failing, clear existing vice-captain
-            UPDATE fantasy_lineup 
-            SET vice_captain = FALSE 
-            WHERE ft_id = NEW.ft_id 
-              AND gw_code = NEW.gw_code 
-              AND vice_captain = TRUE
-              AND slot <> NEW.slot;
-        END IF;
-    END IF;
-    RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
+    INSERT INTO data_version (scope, version)
+    SELECT DISTINCT unnest(scopes), v
+    ON CONFLICT (scope) DO UPDATE SET version = EXCLUDED.version;
 
-CREATE TRIGGER trg_single_vice_captain
-BEFORE INSERT OR UPDATE ON fantasy_lineup
-FOR EACH ROW
-EXECUTE FUNCTION check_single_vice_captain();
+    PERFORM pg_notify('data_version', json_build_object('version', v, 'scopes', scopes)::text);
 
--- ============================================================================
--- SECTION 7: INDEXES FOR PERFORMANCE
--- ============================================================================
-
--- Additional indexes for common queries
-CREATE INDEX IF NOT EXISTS idx_fantasy_team_user ON fantasy_team(user_id);
-CREATE INDEX IF NOT EXISTS idx_transfer_ft_gw ON transfer(ft_id, gw_code);
-CREATE INDEX IF NOT EXISTS idx_chemistry_ft_gw ON chemistry_bonus(ft_id, gw_code);
+    RETURN QUERY SELECT DISTINCT s::VARCHAR, v FROM unnest(scopes) AS s;
+END;
+$$ LANGUAGE plpgsql;
 
 -- ============================================================================
--- SECTION 8: GRANT PERMISSIONS (for Supabase)
+-- SECTION 10: GRANT PERMISSIONS (for Supabase)
 -- ============================================================================
 
 -- Grant access to authenticated users (uncomment if using Supabase Auth)
@@ -409,18 +607,26 @@ BEGIN
     RAISE NOTICE '    - app_user (managers)';
     RAISE NOTICE '    - team (real clubs)';
     RAISE NOTICE '    - player (real players)';
-    RAISE NOTICE '    - gameweek (GW01-GW38)';
+    RAISE NOTICE '    - gameweek (GW01-GW38, with pending/simulating/simulated status)';
     RAISE NOTICE '    - match (real fixtures)';
+    RAISE NOTICE '    - epl_table_snapshot (league table per GW)';
     RAISE NOTICE '    - fantasy_team (user teams)';
-    RAISE NOTICE '    - fantasy_lineup (player selections)';
+    RAISE NOTICE '    - fantasy_lineup (player selections, one row per team per GW)';
     RAISE NOTICE '    - transfer (player swaps)';
     RAISE NOTICE '    - player_points (fantasy points)';
     RAISE NOTICE '    - chemistry_bonus (+15 team bonus)';
+    RAISE NOTICE '    - standings_snapshot (cumulative standings per GW)';
     RAISE NOTICE '    - fantasy_league (mini-leagues)';
     RAISE NOTICE '    - fantasy_league_team (league members)';
     RAISE NOTICE '    - fantasy_fixture (H2H matches)';
+    RAISE NOTICE '    - data_version (ETag / cache counters)';
+    RAISE NOTICE '';
+    RAISE NOTICE '  Partitioned by gameweek (GW01-GW38 + default):';
+    RAISE NOTICE '    - fantasy_lineup, player_points, chemistry_bonus, fantasy_fixture';
+    RAISE NOTICE '    - CALL archive_season(''2025_26'') detaches a finished season';
     RAISE NOTICE '';
     RAISE NOTICE '  Views created:';
+    RAISE NOTICE '    - v_lineup_slot (one row per lineup slot)';
     RAISE NOTICE '    - v_fantasy_standings (per GW points)';
     RAISE NOTICE '    - v_fantasy_team_total_points (cumulative)';
     RAISE NOTICE '';
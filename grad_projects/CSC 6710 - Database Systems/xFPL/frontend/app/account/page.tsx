@@ -4,6 +4,8 @@ import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 
 const BASE_URL = "http://localhost:8000";
+// Managers per page of the picker; more load on demand (X-Next-Cursor)
+const USERS_PAGE_SIZE = 100;
 
 type User = {
   id: number;
@@ -15,6 +17,8 @@ export default function AccountPage() {
   const router = useRouter();
 
   const [users, setUsers] = useState<User[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [currentUser, setCurrentUser] = useState<User | null>(null);
   const [newUsername, setNewUsername] = useState("");
   const [newEmail, setNewEmail] = useState("");
@@ -27,20 +31,43 @@ export default function AccountPage() {
     loadUsersAndValidateSession();
   }, []);
 
+  async function fetchUsersPage(cursor: string | null) {
+    const params = new URLSearchParams({ limit: String(USERS_PAGE_SIZE) });
+    if (cursor) params.set("cursor", cursor);
+    const res = await fetch(`${BASE_URL}/users?${params}`);
+    const data: User[] = await res.json();
+    setUsers((prev) => (cursor ? [...prev, ...data] : data));
+    setNextCursor(res.headers.get("X-Next-Cursor"));
+  }
+
+  async function loadMoreUsers() {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      await fetchUsersPage(nextCursor);
+    } catch (err) {
+      console.error(err);
+      setMessage("Could not load more accounts.");
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   async function loadUsersAndValidateSession() {
     setInitialLoading(true);
     try {
-      const res = await fetch(`${BASE_URL}/users`);
-      const data = await res.json();
-      setUsers(data);
+      await fetchUsersPage(null);
 
-      // Check if stored user still exists in database
+      // Check if stored user still exists in database (looked up by id:
+      // the picker only holds the first page)
       if (typeof window !== "undefined") {
         const stored = window.localStorage.getItem("fantasyUser");
         if (stored) {
           try {
             const parsedUser = JSON.parse(stored);
-            const userExists = data.some(
+            const res = await fetch(`${BASE_URL}/users?user_id=${parsedUser.id}`);
+            const matches: User[] = await res.json();
+            const userExists = matches.some(
               (u: User) => u.id === parsedUser.id && u.username === parsedUser.username
             );
             
@@ -242,7 +269,7 @@ export default function AccountPage() {
           {/* Existing users */}
           <section>
             <h2 style={{ fontSize: "1rem", marginBottom: "0.6rem" }}>
-              Existing Managers ({users.length})
+              Existing Managers ({users.length}{nextCursor ? "+" : ""})
             </h2>
             {users.length === 0 && (
               <p style={{ fontSize: "0.85rem", opacity: 0.8 }}>
@@ -289,6 +316,24 @@ export default function AccountPage() {
                   </div>
                 </button>
               ))}
+              {nextCursor && (
+                <button
+                  onClick={loadMoreUsers}
+                  disabled={loadingMore}
+                  style={{
+                    padding: "0.5rem 0.75rem",
+                    borderRadius: 10,
+                    border: "1px dashed rgba(148,163,184,0.35)",
+                    background: "transparent",
+                    cursor: loadingMore ? "default" : "pointer",
+                    fontSize: "0.8rem",
+                    color: "#e5e7eb",
+                    opacity: loadingMore ? 0.6 : 0.85,
+                  }}
+                >
+                  {loadingMore ? "Loading..." : "Show more managers"}
+                </button>
+              )}
             </div>
           </section>
 
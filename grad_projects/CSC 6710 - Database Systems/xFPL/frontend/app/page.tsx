@@ -372,7 +372,7 @@ export default function Home() {
 
   async function validateUser(user: CurrentUser) {
     try {
-      const res = await fetch(`${BASE_URL}/users`);
+      const res = await fetch(`${BASE_URL}/users?user_id=${user.id}`);
       const users = await res.json();
       const userExists = users.some((u: CurrentUser) => u.id === user.id);
       if (userExists) {
@@ -406,7 +406,11 @@ export default function Home() {
           firstUnsimRes.ok ? firstUnsimRes.json() : null,
         ]);
 
-        setTeams(tData);
+        // Keep the user's own team if its lookup below finished first
+        setTeams((prev) => [
+          ...prev.filter((t) => !tData.some((d: FantasyTeam) => d.id === t.id)),
+          ...tData,
+        ]);
         setGameweeks(gwData);
 
         if (firstUnsimData && firstUnsimData.gw_code) {
@@ -421,18 +425,31 @@ export default function Home() {
     })();
   }, []);
 
-  // Find user's team
+  // Find user's team (by user_id: /fantasy-teams above is only the first page)
   useEffect(() => {
-    if (currentUser && teams.length > 0) {
-      const myTeam = teams.find((t) => t.user_id === currentUser.id);
-      setUserTeam(myTeam || null);
-      if (myTeam && !selectedTeam) {
-        setSelectedTeam(myTeam.id);
-      }
-    } else {
+    if (!currentUser) {
       setUserTeam(null);
+      return;
     }
-  }, [currentUser, teams]);
+    (async () => {
+      try {
+        const res = await fetch(`${BASE_URL}/fantasy-teams?user_id=${currentUser.id}`);
+        const data = await res.json();
+        const myTeam = data.find((t: FantasyTeam) => t.user_id === currentUser.id) || null;
+        setUserTeam(myTeam);
+        if (myTeam) {
+          // Make sure the team picker can show it
+          setTeams((prev) => (prev.some((t) => t.id === myTeam.id) ? prev : [myTeam, ...prev]));
+          if (!selectedTeam) {
+            setSelectedTeam(myTeam.id);
+          }
+        }
+      } catch (err) {
+        console.error(err);
+        setUserTeam(null);
+      }
+    })();
+  }, [currentUser]);
 
   // GW status
   useEffect(() => {
@@ -477,26 +494,16 @@ export default function Home() {
       setChemistryBonus(0);
       return;
     }
-    const [lRes, pRes, cbRes] = await Promise.all([
-      fetch(`${BASE_URL}/lineup/${teamId}/${gwCode}`),
-      fetch(`${BASE_URL}/points/fantasy/${teamId}/${gwCode}`),
-      fetch(`${BASE_URL}/chemistry-bonus/${teamId}/${gwCode}`),
-    ]);
-    const [lData, pData] = await Promise.all([lRes.json(), pRes.json()]);
-    
-    // Chemistry bonus - always parse response
-    let cbData = { points: 0 };
-    try {
-      const cbJson = await cbRes.json();
-      cbData = { points: cbJson.points || 0 };
-      console.log("Chemistry bonus response:", cbJson);
-    } catch (e) {
-      console.error("Failed to parse chemistry bonus:", e);
-    }
-    
+    // Lineup, points and chemistry bonus in one round trip
+    const res = await fetch(`${BASE_URL}/dashboard/${teamId}/${gwCode}`);
+    const data = await res.json();
+    const lData = data.lineup;
+    const cbPoints = data.chemistry_bonus?.points || 0;
+
     setLineup(lData);
-    setPoints(pData.total_points ?? 0);
-    setChemistryBonus(cbData.points);
+    // Same total as /points/fantasy: starting XI points + chemistry bonus
+    setPoints((data.points?.summary?.raw_total ?? 0) + cbPoints);
+    setChemistryBonus(cbPoints);
 
     // Set current captain/vice for editing
     const cap = lData.find((p: Player) => p.captain);
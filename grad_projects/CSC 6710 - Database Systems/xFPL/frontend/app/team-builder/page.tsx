@@ -75,7 +75,7 @@ export default function TeamBuilderPage() {
     if (!currentUser) return;
     (async () => {
       try {
-        const res = await fetch(`${BASE_URL}/fantasy-teams`);
+        const res = await fetch(`${BASE_URL}/fantasy-teams?user_id=${currentUser.id}`);
         const teams = await res.json();
         const existing = teams.find((t: FantasyTeam) => t.user_id === currentUser.id);
         if (existing) {
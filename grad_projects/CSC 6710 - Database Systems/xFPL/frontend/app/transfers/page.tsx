@@ -142,7 +142,7 @@ export default function TransfersPage() {
       setLoading(true);
       try {
         const [teamsRes, gwRes, firstUnsimRes] = await Promise.all([
-          fetch(`${BASE_URL}/fantasy-teams`),
+          fetch(`${BASE_URL}/fantasy-teams?user_id=${currentUser.id}`),
           fetch(`${BASE_URL}/gameweeks`),
           fetch(`${BASE_URL}/first-unsimulated-gw`),
         ]);
@@ -180,27 +180,13 @@ export default function TransfersPage() {
     if (!selectedGw || !userTeam) return;
 
     try {
-      // Get GW status
-      const statusRes = await fetch(`${BASE_URL}/gameweek-status/${selectedGw}`);
-      const status = await statusRes.json();
-      setGwStatus(status);
-
-      // Get lineup for this GW
-      const lineupRes = await fetch(`${BASE_URL}/lineup/${userTeam.id}/${selectedGw}`);
-      const lineupData = await lineupRes.json();
-      setLineup(lineupData);
-
-      // Get transfers made and remaining
-      const [transfersRes, remainingRes] = await Promise.all([
-        fetch(`${BASE_URL}/transfers/${userTeam.id}/${selectedGw}`),
-        fetch(`${BASE_URL}/transfers/remaining/${userTeam.id}/${selectedGw}`),
-      ]);
-      const [transfersData, remainingData] = await Promise.all([
-        transfersRes.json(),
-        remainingRes.json(),
-      ]);
-      setTransfers(transfersData);
-      setTransfersRemaining(remainingData.remaining);
+      // GW status, lineup, and transfers made / remaining in one round trip
+      const dashRes = await fetch(`${BASE_URL}/dashboard/${userTeam.id}/${selectedGw}`);
+      const dash = await dashRes.json();
+      setGwStatus(dash.gameweek_status);
+      setLineup(dash.lineup);
+      setTransfers(dash.transfers);
+      setTransfersRemaining(dash.transfers_remaining.remaining);
 
       // Load all players for browsing
       const [playersRes, teamsRes] = await Promise.all([